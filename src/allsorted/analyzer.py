@@ -4,10 +4,16 @@ File analysis and duplicate detection for allsorted.
 
 import hashlib
 import logging
+import mmap
+import os
+import sqlite3
 from collections import defaultdict
-from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import suppress
+from itertools import repeat
 from pathlib import Path
-from typing import Callable, Dict, List, Optional
+from stat import S_ISLNK
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 try:
     import xxhash
@@ -16,6 +22,13 @@ try:
 except ImportError:
     XXHASH_AVAILABLE = False
 
+try:
+    from blake3 import blake3
+
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    BLAKE3_AVAILABLE = False
+
 try:
     import aiofiles
 
@@ -31,19 +44,118 @@ try:
 except ImportError:
     IMAGEHASH_AVAILABLE = False
 
+from allsorted.bktree import BKTree
 from allsorted.config import Config
+from allsorted.hash_cache import HashCache, get_default_hash_cache_path
 from allsorted.models import DuplicateSet, FileInfo
-from allsorted.utils import is_hidden
+from allsorted.utils import compile_ignore_patterns, is_hidden
 
 logger = logging.getLogger(__name__)
 
 # Image extensions for perceptual hashing
 IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp", ".heic"}
 
+# Hash constructors for each supported algorithm whose library is installed
+_HASH_FACTORIES: Dict[str, Callable[[], Any]] = {"sha256": hashlib.sha256}
+if XXHASH_AVAILABLE:
+    _HASH_FACTORIES["xxhash"] = xxhash.xxh64
+    # Same 64-bit width as XXH64 and faster on modern CPUs, but different digests, so
+    # it is a separate option rather than a change to "xxhash"
+    _HASH_FACTORIES["xxh3"] = xxhash.xxh3_64
+if BLAKE3_AVAILABLE:
+    _HASH_FACTORIES["blake3"] = blake3
+
+# Pip package providing each algorithm of an optional library
+_OPTIONAL_HASH_ALGORITHMS = {"xxhash": "xxhash", "xxh3": "xxhash", "blake3": "blake3"}
+
+
+def get_hasher_factory(algorithm: str) -> Callable[[], Any]:
+    """
+    Get the hash constructor for a configured hash algorithm.
+
+    Args:
+        algorithm: Algorithm name (sha256, xxhash, xxh3 or blake3)
+
+    Returns:
+        Callable creating a fresh hash object; sha256 if the algorithm is unknown
+        or its library is not installed
+    """
+    return _HASH_FACTORIES.get(algorithm, hashlib.sha256)
+
+
+# Smallest file hashed through a memory map instead of a read loop
+MMAP_HASH_MIN_SIZE = 1024 * 1024
+# Smallest file dropped from the page cache after hashing, so scanning large media
+# does not evict the rest of the system's cached files
+DONTNEED_HASH_MIN_SIZE = 64 * 1024 * 1024
+
+# posix_fadvise is unavailable on Windows and macOS
+FADVISE_AVAILABLE = hasattr(os, "posix_fadvise")
+
+
+def _fadvise(fd: int, advice: int) -> None:
+    """
+    Give the kernel a hint about how a whole file will be accessed.
+
+    Args:
+        fd: Open file descriptor
+        advice: One of the os.POSIX_FADV_* constants
+    """
+    # Only a hint; some filesystems reject it
+    with suppress(OSError):
+        os.posix_fadvise(fd, 0, 0, advice)
+
+
+def _digest_file(file_path: Path, hasher_factory: Callable[[], Any], block_size: int) -> str:
+    """
+    Hash a file's whole content.
+
+    Args:
+        file_path: Path to file
+        hasher_factory: Callable creating a fresh hash object
+        block_size: Block size for reading where hashlib.file_digest is unavailable
+
+    Returns:
+        Hex digest of the file content
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    # Unbuffered: reads go straight into the hashing buffer
+    with open(file_path, "rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if FADVISE_AVAILABLE:
+            # The file is read once from start to end, so read ahead aggressively
+            _fadvise(f.fileno(), os.POSIX_FADV_SEQUENTIAL)
+
+        if size >= MMAP_HASH_MIN_SIZE:
+            # Hash large files in one update straight from the page cache
+            hasher = hasher_factory()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                hasher.update(mm)
+        elif hasattr(hashlib, "file_digest"):
+            # Let hashlib run the read/update loop over one reused buffer
+            hasher = hashlib.file_digest(f, hasher_factory)
+        else:
+            hasher = hasher_factory()
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                hasher.update(block)
+
+        if FADVISE_AVAILABLE and size >= DONTNEED_HASH_MIN_SIZE:
+            _fadvise(f.fileno(), os.POSIX_FADV_DONTNEED)
+
+    return str(hasher.hexdigest())
+
 
 class FileAnalyzer:
     """Analyzes directories to identify files and duplicates."""
 
+    # Fewest files to hash before parallel_processing or use_async starts a worker pool
+    PARALLEL_HASH_MIN_FILES = 32
+
     def __init__(self, config: Config):
         """
         Initialize file analyzer.
@@ -52,6 +164,7 @@ class FileAnalyzer:
             config: Configuration instance
         """
         self.config = config
+        # Files by content hash; files left unhashed are alone under their grouping key
         self.files_by_hash: Dict[str, List[FileInfo]] = defaultdict(list)
         self.all_files: List[FileInfo] = []
         self.ignored_files: List[Path] = []
@@ -59,6 +172,12 @@ class FileAnalyzer:
         self.errors: List[tuple[Path, str]] = []
         # Track perceptual hashes for image duplicate detection
         self.perceptual_hashes: Dict[str, List[FileInfo]] = defaultdict(list)
+        # Hashes remembered across runs, opened on first use when config.hash_cache is set
+        self._hash_cache: Optional[HashCache] = None
+        self._hash_cache_opened = False
+        # Hash constructor for the configured algorithm, resolved on first use
+        self._hasher_algorithm: Optional[str] = None
+        self._hasher_factory: Callable[[], Any] = hashlib.sha256
 
     def analyze_directory(
         self,
@@ -87,19 +206,64 @@ class FileAnalyzer:
         total_files = len(file_paths)
         logger.info(f"Found {total_files} files to analyze")
 
-        # Second pass: analyze each file
-        for idx, file_path in enumerate(file_paths, 1):
-            if progress_callback:
-                progress_callback(idx, total_files)
+        # Files that cannot be duplicates are grouped by a key instead of hashing their
+        # whole content, and are left without a hash
+        unique_keys = self._find_unique_content_keys(file_paths)
+
+        # The remaining files are hashed ahead on a worker pool when enabled; results
+        # arrive in file order, so progress still advances as hashes complete
+        to_hash = [file_path for file_path, _ in file_paths if file_path not in unique_keys]
+        hash_cache = self._get_hash_cache()
+        known_hashes: Dict[Path, str] = {}
+        pool: Optional[Executor] = None
+        full_hashes: Optional[Iterator[Optional[str]]] = None
+        if self._should_hash_in_pool(len(to_hash)):
+            if hash_cache is not None:
+                # Hashes remembered from earlier runs are not recomputed by the pool
+                self._add_cached_hashes(file_paths, unique_keys, known_hashes, hash_cache)
+                to_hash = [fp for fp in to_hash if fp not in known_hashes]
+            pool = self._create_hash_pool()
+            full_hashes = pool.map(
+                self._hash_file_worker,
+                to_hash,
+                repeat(self.config.hash_algorithm),
+                repeat(self.config.hash_block_size),
+                chunksize=16,
+            )
 
-            try:
-                file_info = self._analyze_file(file_path)
-                if file_info:
-                    self.all_files.append(file_info)
-                    self.files_by_hash[file_info.hash].append(file_info)
-            except Exception as e:
-                logger.warning(f"Error analyzing {file_path}: {e}")
-                self.errors.append((file_path, str(e)))
+        try:
+            # Second pass: analyze each file
+            for idx, (file_path, entry) in enumerate(file_paths, 1):
+                if progress_callback:
+                    progress_callback(idx, total_files)
+
+                content_key = unique_keys.get(file_path)
+                file_hash = known_hashes.get(file_path)
+                pool_hash: Optional[str] = None
+                if content_key is None and file_hash is None and full_hashes is not None:
+                    try:
+                        pool_hash = file_hash = next(full_hashes)
+                    except Exception as e:
+                        logger.warning(f"Parallel hashing failed, hashing inline instead: {e}")
+                        full_hashes = None
+
+                try:
+                    if pool_hash is not None and hash_cache is not None:
+                        hash_cache.put(entry.stat(), self._effective_hash_algorithm(), pool_hash)
+                    file_info = self._analyze_file(
+                        file_path, entry, file_hash, hash_content=content_key is None
+                    )
+                    if file_info:
+                        self.all_files.append(file_info)
+                        self.files_by_hash[file_info.hash or content_key or ""].append(file_info)
+                except Exception as e:
+                    logger.warning(f"Error analyzing {file_path}: {e}")
+                    self.errors.append((file_path, str(e)))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            # Reopened on the next use, so the database is not held between scans
+            self.close()
 
         logger.info(
             f"Analysis complete. Processed {len(self.all_files)} files, "
@@ -107,89 +271,127 @@ class FileAnalyzer:
             f"errors {len(self.errors)}"
         )
 
-    def _collect_file_paths(self, root_dir: Path) -> List[Path]:
+    def _collect_file_paths(self, root_dir: Path) -> List[Tuple[Path, "os.DirEntry[str]"]]:
         """
         Collect all file paths that should be analyzed.
         Only scans current directory, but recursively scans managed (all_*) directories.
 
+        Directories are listed with os.scandir, so file types usually come from the
+        directory listing without extra stat calls, and each entry's stat result is
+        reused when the file is analyzed.
+
         Args:
             root_dir: Root directory to scan
 
         Returns:
-            List of file paths to analyze
+            List of (file path, directory entry) pairs to analyze
         """
-        file_paths: List[Path] = []
+        file_paths: List[Tuple[Path, os.DirEntry[str]]] = []
 
         # Only iterate through items in the current directory (not recursive)
-        for path in root_dir.iterdir():
-            # Handle directories
-            if path.is_dir():
-                if self._should_ignore_path(path, root_dir):
-                    logger.debug(f"Ignoring directory: {path}")
-                    continue
-
-                # If it's a managed directory (starts with all_), scan it recursively
-                if self.config.is_managed_directory(path):
-                    logger.debug(f"Scanning managed directory recursively: {path}")
-                    file_paths.extend(self._collect_from_managed_dir(path, root_dir))
-                else:
-                    # Track non-managed directories for moving to Folders
-                    self.directories.append(path)
-                    logger.debug(f"Found directory to organize: {path}")
-                continue
-
-            # Handle files
-            if path.is_file():
-                if self._should_ignore_path(path, root_dir):
-                    self.ignored_files.append(path)
-                    logger.debug(f"Ignoring file: {path}")
-                    continue
-
-                # Skip symlinks if configured
-                if path.is_symlink() and not self.config.follow_symlinks:
-                    self.ignored_files.append(path)
-                    logger.debug(f"Skipping symlink: {path}")
+        with os.scandir(root_dir) as entries:
+            for entry in entries:
+                path = Path(entry.path)
+
+                # Handle directories
+                if entry.is_dir():
+                    if self._should_ignore_path(path, root_dir):
+                        logger.debug(f"Ignoring directory: {path}")
+                        continue
+
+                    # If it's a managed directory (starts with all_), scan it recursively
+                    if self.config.is_managed_directory(path):
+                        logger.debug(f"Scanning managed directory recursively: {path}")
+                        file_paths.extend(self._collect_from_managed_dir(path, root_dir))
+                    else:
+                        # Track non-managed directories for moving to Folders
+                        self.directories.append(path)
+                        logger.debug(f"Found directory to organize: {path}")
                     continue
 
-                file_paths.append(path)
+                # Handle files
+                if entry.is_file() and self._should_collect_file(entry, path, root_dir):
+                    file_paths.append((path, entry))
 
         return file_paths
 
-    def _collect_from_managed_dir(self, managed_dir: Path, root_dir: Path) -> List[Path]:
+    def _collect_from_managed_dir(
+        self, managed_dir: Path, root_dir: Path
+    ) -> List[Tuple[Path, "os.DirEntry[str]"]]:
         """
         Recursively collect files from a managed directory.
 
+        Subdirectories that are ignored (hidden or matching an ignore pattern) are
+        skipped as a whole rather than filtering every file below them.
+
         Args:
             managed_dir: Managed directory to scan
             root_dir: Root directory (for ignore patterns)
 
         Returns:
-            List of file paths
+            List of (file path, directory entry) pairs
         """
-        file_paths: List[Path] = []
+        file_paths: List[Tuple[Path, os.DirEntry[str]]] = []
+        # Directories still to scan, popped depth-first in listing order
+        pending: List[Path] = [managed_dir]
 
-        for path in managed_dir.rglob("*"):
-            # Skip directories
-            if path.is_dir():
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = list(it)
+            except OSError as e:
+                logger.warning(f"Cannot scan directory {directory}: {e}")
                 continue
 
-            # Check if file should be ignored
-            if path.is_file():
-                if self._should_ignore_path(path, root_dir):
-                    self.ignored_files.append(path)
-                    logger.debug(f"Ignoring file in managed dir: {path}")
+            subdirectories: List[Path] = []
+            for entry in entries:
+                path = Path(entry.path)
+
+                # Symlinked directories are not descended into
+                if entry.is_dir():
+                    if entry.is_symlink():
+                        continue
+                    if self._should_ignore_path(path, root_dir):
+                        logger.debug(f"Ignoring directory in managed dir: {path}")
+                        continue
+                    subdirectories.append(path)
                     continue
 
-                # Skip symlinks if configured
-                if path.is_symlink() and not self.config.follow_symlinks:
-                    self.ignored_files.append(path)
-                    logger.debug(f"Skipping symlink in managed dir: {path}")
-                    continue
+                if entry.is_file() and self._should_collect_file(entry, path, root_dir):
+                    file_paths.append((path, entry))
 
-                file_paths.append(path)
+            pending.extend(reversed(subdirectories))
 
         return file_paths
 
+    def _should_collect_file(self, entry: "os.DirEntry[str]", path: Path, root_dir: Path) -> bool:
+        """
+        Check whether a file found while scanning should be analyzed.
+
+        Ignored files and skipped symlinks are recorded in ignored_files.
+
+        Args:
+            entry: Directory entry of the file
+            path: Path to the file
+            root_dir: Root directory (for ignore patterns)
+
+        Returns:
+            True if the file should be analyzed
+        """
+        if self._should_ignore_path(path, root_dir):
+            self.ignored_files.append(path)
+            logger.debug(f"Ignoring file: {path}")
+            return False
+
+        # Skip symlinks if configured
+        if entry.is_symlink() and not self.config.follow_symlinks:
+            self.ignored_files.append(path)
+            logger.debug(f"Skipping symlink: {path}")
+            return False
+
+        return True
+
     def _should_ignore_path(self, path: Path, root_dir: Path) -> bool:
         """
         Check if a path should be ignored based on configuration.
@@ -205,32 +407,34 @@ class FileAnalyzer:
         if self.config.ignore_hidden and is_hidden(path):
             return True
 
-        # Check ignore patterns
-        for pattern in self.config.ignore_patterns:
-            # Use Path.match() for proper glob pattern support (including **)
+        # Check ignore patterns, combined into one expression per pattern list. Relative
+        # patterns only see the path below root_dir, so the root's own location never
+        # matches them
+        relative_re, absolute_re = compile_ignore_patterns(tuple(self.config.ignore_patterns))
+        if relative_re is not None:
             try:
-                if path.match(pattern):
-                    return True
-                # Also check just the filename for simple patterns
-                if Path(path.name).match(pattern):
-                    return True
-                # Check relative path for directory patterns
                 relative_path = path.relative_to(root_dir)
-                if relative_path.match(pattern):
-                    return True
             except ValueError:
-                # If match fails, fall back to simple name comparison
-                if path.name == pattern:
-                    return True
-
-        return False
+                relative_path = Path(path.name)
+            if relative_re.search(relative_path.as_posix()) is not None:
+                return True
+        return absolute_re is not None and absolute_re.search(path.as_posix()) is not None
 
-    def _analyze_file(self, file_path: Path) -> Optional[FileInfo]:
+    def _analyze_file(
+        self,
+        file_path: Path,
+        entry: Optional["os.DirEntry[str]"] = None,
+        file_hash: Optional[str] = None,
+        hash_content: bool = True,
+    ) -> Optional[FileInfo]:
         """
         Analyze a single file.
 
         Args:
             file_path: Path to file
+            entry: Optional directory entry for the file, whose cached stat is reused
+            file_hash: Optional precomputed hash; the content is hashed if omitted
+            hash_content: Whether to hash the content; if False the file has no hash
 
         Returns:
             FileInfo instance or None if file cannot be analyzed
@@ -239,25 +443,112 @@ class FileAnalyzer:
             OSError: If file cannot be read
         """
         try:
-            stat = file_path.stat()
+            if entry is not None:
+                # Like Path.stat(), DirEntry.stat() follows symlinks
+                stat = entry.stat()
+                is_symlink = entry.is_symlink()
+            else:
+                # One lstat() answers both for regular files; only symlinks need stat()
+                stat = file_path.lstat()
+                is_symlink = S_ISLNK(stat.st_mode)
+                if is_symlink:
+                    stat = file_path.stat()
 
             # Calculate hash
-            file_hash = self._calculate_hash(file_path)
-            if file_hash is None:
-                return None
+            if file_hash is None and hash_content:
+                file_hash = self._hash_file(file_path, stat)
+                if file_hash is None:
+                    return None
 
             return FileInfo(
                 path=file_path,
                 size_bytes=stat.st_size,
                 hash=file_hash,
                 modified_time=stat.st_mtime,
-                is_symlink=file_path.is_symlink(),
+                is_symlink=is_symlink,
             )
 
         except OSError as e:
             logger.warning(f"Cannot access file {file_path}: {e}")
             raise
 
+    def _find_unique_content_keys(
+        self, file_paths: List[Tuple[Path, "os.DirEntry[str]"]]
+    ) -> Dict[Path, str]:
+        """
+        Find files whose content cannot match any other file, without hashing them in full.
+
+        Files are grouped by size, and files sharing a size by a hash of their first
+        partial_hash_size bytes. A file alone in its group cannot be a duplicate, so it
+        is grouped under its size (and partial hash) instead of a content hash and gets
+        no hash; only files still sharing a group are hashed in full. Every file is
+        hashed in full when integrity verification needs the hashes or
+        partial_hash_size is 0.
+
+        Args:
+            file_paths: (file path, directory entry) pairs being analyzed
+
+        Returns:
+            Dictionary mapping paths of files that need no full hash to their grouping
+            key, which is unique among the files and never equals a digest
+        """
+        partial_size = self.config.partial_hash_size
+        if partial_size <= 0 or self.config.verify_integrity:
+            return {}
+
+        paths_by_size: Dict[int, List[Path]] = defaultdict(list)
+        for file_path, entry in file_paths:
+            try:
+                paths_by_size[entry.stat().st_size].append(file_path)
+            except OSError:
+                # Reported when the file is analyzed
+                continue
+
+        keys: Dict[Path, str] = {}
+        for size, paths in paths_by_size.items():
+            if len(paths) == 1:
+                keys[paths[0]] = f"size:{size}"
+                continue
+
+            # Small files are hashed in full right away, as that reads no more
+            if size <= partial_size:
+                continue
+
+            paths_by_partial: Dict[str, List[Path]] = defaultdict(list)
+            for file_path in paths:
+                partial_hash = self._calculate_partial_hash(file_path, partial_size)
+                if partial_hash is not None:
+                    paths_by_partial[partial_hash].append(file_path)
+
+            for partial_hash, same_start in paths_by_partial.items():
+                if len(same_start) == 1:
+                    keys[same_start[0]] = f"size:{size}:{partial_hash}"
+
+        return keys
+
+    def _calculate_partial_hash(self, file_path: Path, length: int) -> Optional[str]:
+        """
+        Hash the first bytes of a file, to tell apart files of the same size.
+
+        Uses xxHash when available, as the result is only compared within one run.
+
+        Args:
+            file_path: Path to file
+            length: Number of leading bytes to hash
+
+        Returns:
+            Hex digest of the leading bytes or None if the file cannot be read
+        """
+        hasher = get_hasher_factory("xxh3")()
+        try:
+            with open(file_path, "rb") as f:
+                hasher.update(f.read(length))
+        except OSError as e:
+            logger.debug(f"Cannot read file {file_path} for partial hashing: {e}")
+            return None
+
+        return str(hasher.hexdigest())
+
     def analyze_single_file(self, file_path: Path) -> Optional[FileInfo]:
         """
         Analyze a single file (public API).
@@ -271,47 +562,142 @@ class FileAnalyzer:
         Returns:
             FileInfo instance or None if file cannot be analyzed
         """
-        return self._analyze_file(file_path)
+        file_info = self._analyze_file(file_path)
+        if self._hash_cache is not None:
+            self._hash_cache.commit()
+        return file_info
 
-    def _calculate_hash(self, file_path: Path) -> Optional[str]:
+    def _hash_file(self, file_path: Path, stat: os.stat_result) -> Optional[str]:
         """
-        Calculate hash of a file using configured algorithm.
-
-        Supports SHA256 (cryptographically secure) and xxHash (fast).
+        Hash a file's content, reusing a hash remembered from an earlier run.
 
         Args:
             file_path: Path to file
+            stat: Current stat result of the file
 
         Returns:
             Hex digest of hash or None if file cannot be read
         """
+        hash_cache = self._get_hash_cache()
+        if hash_cache is None:
+            return self._calculate_hash(file_path)
+
+        algorithm = self._effective_hash_algorithm()
+        file_hash = hash_cache.get(stat, algorithm)
+        if file_hash is None:
+            file_hash = self._calculate_hash(file_path)
+            if file_hash is not None:
+                hash_cache.put(stat, algorithm, file_hash)
+        return file_hash
+
+    def _add_cached_hashes(
+        self,
+        file_paths: List[Tuple[Path, "os.DirEntry[str]"]],
+        unique_keys: Dict[Path, str],
+        known_hashes: Dict[Path, str],
+        hash_cache: HashCache,
+    ) -> None:
+        """
+        Look up remembered hashes for files that need a full hash.
+
+        Args:
+            file_paths: (file path, directory entry) pairs being analyzed
+            unique_keys: Grouping keys of the files that need no hash
+            known_hashes: Hashes by path, updated with the hashes found
+            hash_cache: Cache to look the hashes up in
+        """
+        algorithm = self._effective_hash_algorithm()
+        for file_path, entry in file_paths:
+            if file_path in unique_keys:
+                continue
+            try:
+                file_hash = hash_cache.get(entry.stat(), algorithm)
+            except OSError:
+                # Reported when the file is analyzed
+                continue
+            if file_hash is not None:
+                known_hashes[file_path] = file_hash
+
+    def close(self) -> None:
+        """Commit and close the persistent hash cache, if it is open."""
+        if self._hash_cache is not None:
+            self._hash_cache.close()
+            self._hash_cache = None
+        self._hash_cache_opened = False
+
+    def _get_hash_cache(self) -> Optional[HashCache]:
+        """
+        Open the persistent hash cache on first use, if enabled.
+
+        Returns:
+            HashCache instance, or None if disabled or it cannot be opened
+        """
+        if not self.config.hash_cache:
+            return None
+
+        if not self._hash_cache_opened:
+            self._hash_cache_opened = True
+            cache_path = (
+                Path(self.config.hash_cache_path)
+                if self.config.hash_cache_path
+                else get_default_hash_cache_path()
+            )
+            try:
+                self._hash_cache = HashCache(cache_path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Cannot open hash cache {cache_path}, not caching hashes: {e}")
+
+        return self._hash_cache
+
+    def _effective_hash_algorithm(self) -> str:
+        """
+        Get the name of the hash algorithm actually used for full hashes.
+
+        Returns:
+            The configured algorithm, or sha256 when it is unknown or unavailable
+        """
         algorithm = self.config.hash_algorithm
+        return algorithm if algorithm in _HASH_FACTORIES else "sha256"
 
-        # Initialize hasher based on algorithm
-        if algorithm == "xxhash":
-            if not XXHASH_AVAILABLE:
-                logger.warning(
-                    "xxhash not available, falling back to sha256. "
-                    "Install with: pip install xxhash"
-                )
-                hasher = hashlib.sha256()
-            else:
-                hasher = xxhash.xxh64()
-        elif algorithm == "sha256":
-            hasher = hashlib.sha256()
-        else:
-            logger.warning(f"Unknown hash algorithm '{algorithm}', using sha256")
-            hasher = hashlib.sha256()
+    def _get_hasher_factory(self) -> Callable[[], Any]:
+        """
+        Get the hash constructor for the configured algorithm.
 
-        try:
-            with open(file_path, "rb") as f:
-                while True:
-                    block = f.read(self.config.hash_block_size)
-                    if not block:
-                        break
-                    hasher.update(block)
+        The constructor is looked up once per algorithm rather than for every file,
+        so an unavailable algorithm is also only reported once.
+
+        Returns:
+            Callable creating a fresh hash object
+        """
+        algorithm = self.config.hash_algorithm
+        if algorithm != self._hasher_algorithm:
+            if algorithm not in _HASH_FACTORIES:
+                if algorithm in _OPTIONAL_HASH_ALGORITHMS:
+                    logger.warning(
+                        f"{algorithm} not available, falling back to sha256. "
+                        f"Install with: pip install {_OPTIONAL_HASH_ALGORITHMS[algorithm]}"
+                    )
+                else:
+                    logger.warning(f"Unknown hash algorithm '{algorithm}', using sha256")
+            self._hasher_algorithm = algorithm
+            self._hasher_factory = get_hasher_factory(algorithm)
+        return self._hasher_factory
+
+    def _calculate_hash(self, file_path: Path) -> Optional[str]:
+        """
+        Calculate hash of a file using configured algorithm.
 
-            return hasher.hexdigest()
+        Supports SHA256 (cryptographically secure), xxHash (fast) and BLAKE3 (fast
+        and cryptographically secure).
+
+        Args:
+            file_path: Path to file
+
+        Returns:
+            Hex digest of hash or None if file cannot be read
+        """
+        try:
+            return _digest_file(file_path, self._get_hasher_factory(), self.config.hash_block_size)
 
         except OSError as e:
             logger.warning(f"Cannot read file {file_path} for hashing: {e}")
@@ -333,18 +719,7 @@ class FileAnalyzer:
             logger.debug("aiofiles not available, using sync hash calculation")
             return self._calculate_hash(file_path)
 
-        algorithm = self.config.hash_algorithm
-
-        # Initialize hasher based on algorithm
-        if algorithm == "xxhash":
-            if not XXHASH_AVAILABLE:
-                hasher = hashlib.sha256()
-            else:
-                hasher = xxhash.xxh64()
-        elif algorithm == "sha256":
-            hasher = hashlib.sha256()
-        else:
-            hasher = hashlib.sha256()
+        hasher = self._get_hasher_factory()()
 
         try:
             async with aiofiles.open(file_path, "rb") as f:
@@ -354,7 +729,7 @@ class FileAnalyzer:
                         break
                     hasher.update(block)
 
-            return hasher.hexdigest()
+            return str(hasher.hexdigest())
 
         except OSError as e:
             logger.warning(f"Cannot read file {file_path} for async hashing: {e}")
@@ -372,16 +747,15 @@ class FileAnalyzer:
         Returns:
             Dictionary mapping file paths to their hashes
         """
-        if not self.config.parallel_processing or len(file_paths) < 2:
+        if not self._should_hash_in_pool(len(file_paths)):
             # Fall back to sequential processing
             return {fp: self._calculate_hash(fp) for fp in file_paths}
 
-        max_workers = getattr(self.config, "max_workers", 4)
-        logger.info(f"Hashing {len(file_paths)} files in parallel with {max_workers} workers")
+        logger.info(f"Hashing {len(file_paths)} files in parallel")
 
         results: Dict[Path, Optional[str]] = {}
 
-        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        with self._create_hash_pool() as executor:
             # Submit all hash jobs
             future_to_path = {
                 executor.submit(
@@ -419,29 +793,41 @@ class FileAnalyzer:
         Returns:
             Hex digest of hash or None if error
         """
-        # Initialize hasher
-        if algorithm == "xxhash":
-            try:
-                import xxhash
+        try:
+            return _digest_file(file_path, get_hasher_factory(algorithm), block_size)
+        except OSError:
+            return None
 
-                hasher = xxhash.xxh64()
-            except ImportError:
-                hasher = hashlib.sha256()
-        else:
-            hasher = hashlib.sha256()
+    def _should_hash_in_pool(self, file_count: int) -> bool:
+        """
+        Check if files should be hashed on a worker pool.
 
-        try:
-            with open(file_path, "rb") as f:
-                while True:
-                    block = f.read(block_size)
-                    if not block:
-                        break
-                    hasher.update(block)
+        Args:
+            file_count: Number of files to hash
+
+        Returns:
+            True if parallel processing or async I/O is enabled and there are
+            enough files to outweigh starting the pool
+        """
+        if not (self.config.parallel_processing or self.config.use_async):
+            return False
+        return file_count >= self.PARALLEL_HASH_MIN_FILES
 
-            return hasher.hexdigest()
+    def _create_hash_pool(self) -> Executor:
+        """
+        Create the worker pool used to hash files in parallel.
 
-        except OSError:
-            return None
+        Hashing is spread over processes, or over threads when use_async marks the
+        scan as I/O-bound (e.g. network paths); hashlib releases the GIL while
+        hashing, so threads still overlap the reads.
+
+        Returns:
+            Executor with config.max_workers workers (CPU count if unset)
+        """
+        max_workers = self.config.max_workers or os.cpu_count() or 1
+        if self.config.use_async:
+            return ThreadPoolExecutor(max_workers=max_workers)
+        return ProcessPoolExecutor(max_workers=max_workers)
 
     def _calculate_perceptual_hash(self, file_path: Path) -> Optional[str]:
         """
@@ -498,7 +884,16 @@ class FileAnalyzer:
                 if phash:
                     image_hashes[phash].append(file_info)
 
-        # Find groups of similar images
+        # Index the distinct hashes so each image is only compared with nearby hashes
+        tree = BKTree()
+        hash_order: Dict[int, str] = {}
+        for phash in image_hashes:
+            value = int(phash, 16)
+            hash_order.setdefault(value, phash)
+            tree.add(value)
+        order = {phash: index for index, phash in enumerate(image_hashes)}
+
+        # Group each unprocessed hash with the unprocessed hashes within the threshold
         duplicate_sets = []
         processed_hashes: set = set()
 
@@ -506,33 +901,22 @@ class FileAnalyzer:
             if phash in processed_hashes:
                 continue
 
-            # Find all similar hashes
             similar_files = list(files)
-
-            for other_hash, other_files in image_hashes.items():
+            neighbours = sorted(
+                (hash_order[value] for value in tree.query(int(phash, 16), threshold)),
+                key=order.__getitem__,
+            )
+            for other_hash in neighbours:
                 if other_hash == phash or other_hash in processed_hashes:
                     continue
-
-                try:
-                    # Calculate hash distance
-                    hash1 = imagehash.hex_to_hash(phash)
-                    hash2 = imagehash.hex_to_hash(other_hash)
-                    distance = hash1 - hash2
-
-                    if distance <= threshold:
-                        similar_files.extend(other_files)
-                        processed_hashes.add(other_hash)
-                except Exception as e:
-                    logger.debug(f"Error comparing hashes: {e}")
+                similar_files.extend(image_hashes[other_hash])
+                processed_hashes.add(other_hash)
 
             processed_hashes.add(phash)
 
             if len(similar_files) > 1:
                 try:
-                    duplicate_set = DuplicateSet(
-                        hash=f"perceptual_{phash}",
-                        files=similar_files
-                    )
+                    duplicate_set = DuplicateSet(hash=f"perceptual_{phash}", files=similar_files)
                     duplicate_sets.append(duplicate_set)
                 except ValueError as e:
                     logger.warning(f"Error creating perceptual duplicate set: {e}")
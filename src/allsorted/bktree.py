@@ -0,0 +1,107 @@
+"""
+BK-tree index for finding similar perceptual hashes.
+
+Created by orpheus497
+"""
+
+import sys
+from typing import Dict, List, Optional
+
+if sys.version_info >= (3, 10):
+    # Counts bits in C, a single popcount instruction for 64-bit hashes
+    _popcount = int.bit_count
+else:
+
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+def hamming_distance(hash1: int, hash2: int) -> int:
+    """
+    Count the bits that differ between two hashes.
+
+    Args:
+        hash1: First hash as an integer
+        hash2: Second hash as an integer
+
+    Returns:
+        Number of differing bits
+    """
+    return _popcount(hash1 ^ hash2)
+
+
+class _Node:
+    """Tree node holding one hash and its children keyed by distance."""
+
+    __slots__ = ("value", "children")
+
+    def __init__(self, value: int):
+        self.value = value
+        self.children: Dict[int, _Node] = {}
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes under Hamming distance.
+
+    Finding every hash within a small distance of a query visits only the
+    subtrees the triangle inequality cannot rule out, instead of comparing the
+    query against every stored hash.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty tree."""
+        self._root: Optional[_Node] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int) -> None:
+        """
+        Add a hash to the tree (hashes already present are ignored).
+
+        Args:
+            value: Hash as an integer
+        """
+        if self._root is None:
+            self._root = _Node(value)
+            self._size = 1
+            return
+
+        node = self._root
+        while True:
+            distance = _popcount(value ^ node.value)
+            if distance == 0:
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _Node(value)
+                self._size += 1
+                return
+            node = child
+
+    def query(self, value: int, max_distance: int) -> List[int]:
+        """
+        Find stored hashes within a distance of a hash.
+
+        Args:
+            value: Hash to search around
+            max_distance: Largest Hamming distance to include
+
+        Returns:
+            Matching hashes, in no particular order
+        """
+        matches: List[int] = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = _popcount(value ^ node.value)
+            if distance <= max_distance:
+                matches.append(node.value)
+            # Only children at distance d from the node can hold hashes within
+            # max_distance of the query when |d - distance| <= max_distance
+            for child_distance, child in node.children.items():
+                if abs(child_distance - distance) <= max_distance:
+                    stack.append(child)
+        return matches
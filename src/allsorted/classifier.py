@@ -24,7 +24,6 @@ class FileClassifier:
             config: Configuration instance
         """
         self.config = config
-        self._classification_cache: dict[str, Tuple[str, str]] = {}
         self._magic_classifier: Optional["MagicClassifier"] = None  # type: ignore[name-defined]
 
         # Initialize magic classifier if enabled
@@ -39,9 +38,16 @@ class FileClassifier:
     def _init_magic_classifier(self) -> None:
         """Initialize the magic classifier for content-based detection."""
         try:
-            from allsorted.magic_classifier import MagicClassifier
-
-            self._magic_classifier = MagicClassifier()
+            from allsorted.magic_classifier import MagicClassifier, get_default_cache_path
+
+            cache_path = None
+            if self.config.mime_cache:
+                cache_path = (
+                    Path(self.config.mime_cache_path)
+                    if self.config.mime_cache_path
+                    else get_default_cache_path()
+                )
+            self._magic_classifier = MagicClassifier(cache_path)
             if self._magic_classifier.is_available():
                 logger.info("Magic file classification enabled")
             else:
@@ -63,10 +69,16 @@ class FileClassifier:
             from allsorted.metadata_extractor import MetadataExtractor
 
             self._metadata_extractor = MetadataExtractor()
-            if self._metadata_extractor.pil_available or self._metadata_extractor.mutagen_available:
+            extractor = self._metadata_extractor
+            if (
+                extractor.pil_available
+                or extractor.exifread_available
+                or extractor.mutagen_available
+            ):
                 logger.info(
-                    f"Metadata extraction enabled (PIL: {self._metadata_extractor.pil_available}, "
-                    f"Mutagen: {self._metadata_extractor.mutagen_available})"
+                    f"Metadata extraction enabled (PIL: {extractor.pil_available}, "
+                    f"ExifRead: {extractor.exifread_available}, "
+                    f"Mutagen: {extractor.mutagen_available})"
                 )
             else:
                 logger.warning(
@@ -123,19 +135,7 @@ class FileClassifier:
                 logger.debug(f"Magic classified {file_info.name} as {result}")
                 return result
 
-        extension = file_info.extension
-
-        # Check cache first
-        if extension in self._classification_cache:
-            return self._classification_cache[extension]
-
-        # Look up in classification rules
-        category, subcategory = self.config.get_category_for_extension(extension)
-
-        # Cache the result
-        self._classification_cache[extension] = (category, subcategory)
-
-        return (category, subcategory)
+        return self.config.get_category_for_extension(file_info.extension or ".")
 
     def _classify_by_date(self, file_info: FileInfo) -> Tuple[str, str]:
         """
@@ -150,7 +150,9 @@ class FileClassifier:
         """
         # Try to extract metadata date if available
         if self._metadata_extractor:
-            metadata = self._metadata_extractor.extract(file_info.path)
+            metadata = self._metadata_extractor.extract(
+                file_info.path, stop_tag=self._metadata_extractor.stop_tag_for_strategy("exif-date")
+            )
             # Check for EXIF date (photo date)
             if "date_original" in metadata:
                 dt = metadata["date_original"]
@@ -244,6 +246,11 @@ class FileClassifier:
         dest_dir = root_dir / category_dir / subcategory
         return dest_dir / file_info.name
 
+    def close(self) -> None:
+        """Save the magic classifier's MIME cache, if one is configured."""
+        if self._magic_classifier is not None:
+            self._magic_classifier.close()
+
     def clear_cache(self) -> None:
-        """Clear the classification cache."""
-        self._classification_cache.clear()
+        """Rebuild the extension index from the current rules."""
+        self.config.clear_extension_index()
@@ -15,7 +15,7 @@ from rich.progress import BarColumn, Progress, SpinnerColumn, TextColumn, TimeRe
 from allsorted import __version__
 from allsorted.config import Config, get_default_config_path, load_config, save_config
 from allsorted.executor import OrganizationExecutor
-from allsorted.models import ConflictResolution, OrganizationStrategy
+from allsorted.models import ConflictResolution, OrganizationPlan, OrganizationStrategy
 from allsorted.planner import OrganizationPlanner
 from allsorted.reporter import Reporter
 from allsorted.validator import OperationValidator
@@ -97,6 +97,7 @@ def organize(
 ) -> None:
     """Organize files in DIRECTORY."""
 
+    plan: Optional[OrganizationPlan] = None
     try:
         # Load configuration
         cfg = load_config(Path(config) if config else None)
@@ -155,14 +156,14 @@ def organize(
             sys.exit(1)
 
         # Show preview
-        if dry_run or len(plan.operations) > 100:
+        if dry_run or plan.total_files > 100:
             if click.confirm("\nShow detailed preview?", default=False):
                 preview = planner.generate_preview(plan, max_items=100)
                 console.print(preview)
 
         # Confirm execution if not dry-run
         if not dry_run and cfg.require_confirmation:
-            if not click.confirm(f"\nProceed with {len(plan.operations)} operations?"):
+            if not click.confirm(f"\nProceed with {plan.total_files} operations?"):
                 console.print("[yellow]Operation cancelled[/yellow]")
                 sys.exit(0)
 
@@ -178,7 +179,7 @@ def organize(
             TimeRemainingColumn(),
             console=console,
         ) as progress:
-            task = progress.add_task("Processing files...", total=len(plan.operations))
+            task = progress.add_task("Processing files...", total=plan.total_files)
 
             def exec_progress(current: int, total: int) -> None:
                 progress.update(task, completed=current, total=total)
@@ -218,6 +219,9 @@ def organize(
         if ctx.obj.get("verbose"):
             console.print_exception()
         sys.exit(1)
+    finally:
+        if plan is not None:
+            plan.close()
 
 
 @main.command()
@@ -238,6 +242,7 @@ def organize(
 def preview(directory: str, config: Optional[str], max_items: int) -> None:
     """Preview what would be organized without making changes."""
 
+    plan: Optional[OrganizationPlan] = None
     try:
         cfg = load_config(Path(config) if config else None)
         root_dir = Path(directory).resolve()
@@ -256,6 +261,9 @@ def preview(directory: str, config: Optional[str], max_items: int) -> None:
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
         sys.exit(1)
+    finally:
+        if plan is not None:
+            plan.close()
 
 
 @main.command()
@@ -301,6 +309,7 @@ def undo(log_file: str, dry_run: bool) -> None:
 def validate(directory: str, config: Optional[str]) -> None:
     """Validate a directory can be organized safely."""
 
+    plan: Optional[OrganizationPlan] = None
     try:
         cfg = load_config(Path(config) if config else None)
         root_dir = Path(directory).resolve()
@@ -328,6 +337,9 @@ def validate(directory: str, config: Optional[str]) -> None:
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
         sys.exit(1)
+    finally:
+        if plan is not None:
+            plan.close()
 
 
 @main.command()
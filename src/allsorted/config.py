@@ -4,10 +4,18 @@ Configuration management for allsorted.
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
+# Use the libyaml-backed loader and dumper when PyYAML was built with them
+try:
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper  # type: ignore[assignment]
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
 from allsorted.models import ConflictResolution, OrganizationStrategy
 
 # Default classification rules based on file extensions
@@ -129,11 +137,17 @@ class Config:
     isolate_duplicates: bool = True
 
     # Performance
-    hash_algorithm: str = "sha256"  # Options: sha256 (secure), xxhash (fast)
+    hash_algorithm: str = "sha256"  # Options: sha256, xxhash/xxh3 (fast), blake3
     hash_block_size: int = 65536  # 64KB blocks for hashing
+    partial_hash_size: int = 4096  # Leading bytes compared before full hashing (0 = off)
+    hash_cache: bool = False  # Remember file hashes across runs
+    hash_cache_path: Optional[str] = None  # Defaults to ~/.cache/allsorted/hashes.sqlite
+    mime_cache: bool = False  # Remember content-detected MIME types across runs (use_magic)
+    mime_cache_path: Optional[str] = None  # Defaults to ~/.cache/allsorted/mime.json
     parallel_processing: bool = False
     max_workers: int = 4  # Number of parallel workers
     use_async: bool = False  # Use async I/O for better performance
+    plan_spill_threshold: Optional[int] = None  # Plan operations kept in memory (None = all)
 
     # Safety
     require_confirmation: bool = False
@@ -178,6 +192,11 @@ class Config:
         }
     )
 
+    # Extension -> (category, subcategory), built from classification_rules on first lookup
+    _extension_index: Optional[Dict[str, Tuple[str, str]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Config":
         """
@@ -212,6 +231,8 @@ class Config:
         """
         result: Dict[str, Any] = {}
         for key, value in self.__dict__.items():
+            if key.startswith("_"):
+                continue
             if isinstance(value, (OrganizationStrategy, ConflictResolution)):
                 result[key] = value.value
             else:
@@ -232,12 +253,23 @@ class Config:
             extension = f".{extension}"
         extension = extension.lower()
 
+        if self._extension_index is None:
+            self._extension_index = self._build_extension_index()
+        return self._extension_index.get(extension, ("Misc", "Unsorted"))
+
+    def _build_extension_index(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Invert the classification rules into an extension lookup table.
+
+        Returns:
+            Dictionary mapping each extension to the first rule that lists it
+        """
+        index: Dict[str, Tuple[str, str]] = {}
         for category, subcategories in self.classification_rules.items():
             for subcategory, extensions in subcategories.items():
-                if extension in extensions:
-                    return (category, subcategory)
-
-        return ("Misc", "Unsorted")
+                for extension in extensions:
+                    index.setdefault(extension, (category, subcategory))
+        return index
 
     def add_classification_rule(
         self, category: str, subcategory: str, extensions: List[str]
@@ -250,9 +282,16 @@ class Config:
             subcategory: Subcategory within the category
             extensions: List of file extensions (with dots)
         """
-        if category not in self.classification_rules:
-            self.classification_rules[category] = {}
-        self.classification_rules[category][subcategory] = extensions
+        # Categories are shallow copies shared with DEFAULT_CLASSIFICATION_RULES, so
+        # replace the category's mapping rather than writing into it
+        subcategories = dict(self.classification_rules.get(category, {}))
+        subcategories[subcategory] = extensions
+        self.classification_rules[category] = subcategories
+        self.clear_extension_index()
+
+    def clear_extension_index(self) -> None:
+        """Rebuild the extension index on next lookup, e.g. after editing the rules directly."""
+        self._extension_index = None
 
     def get_all_categories(self) -> List[str]:
         """
@@ -314,7 +353,7 @@ def load_config(config_path: Optional[Path] = None) -> Config:
 
     try:
         with open(config_path) as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=_YamlLoader)
             if data is None:
                 return default_config
             return Config.from_dict(data)
@@ -340,7 +379,9 @@ def save_config(config: Config, config_path: Path) -> None:
     """
     config_path.parent.mkdir(parents=True, exist_ok=True)
     with open(config_path, "w") as f:
-        yaml.safe_dump(config.to_dict(), f, default_flow_style=False, sort_keys=False)
+        yaml.dump(
+            config.to_dict(), f, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False
+        )
 
 
 def get_default_config_path() -> Path:
@@ -9,12 +9,28 @@ Created by orpheus497
 
 import logging
 import sys
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
 
 from rich.console import Console
 
 logger = logging.getLogger(__name__)
-console = Console()
+
+# Created on first use; constructing a Console probes the terminal
+_console: Optional[Console] = None
+
+
+def _get_console() -> Console:
+    """
+    Get the shared console, creating it on first use.
+
+    Returns:
+        Rich console for user-facing output
+    """
+    global _console
+    if _console is None:
+        _console = Console()
+    return _console
 
 
 # Dependency availability flags (set on module import)
@@ -25,6 +41,7 @@ WATCHDOG_AVAILABLE = False
 IMAGEHASH_AVAILABLE = False
 AIOFILES_AVAILABLE = False
 XXHASH_AVAILABLE = False
+BLAKE3_AVAILABLE = False
 
 # Check dependencies on import
 try:
@@ -76,6 +93,13 @@ try:
 except ImportError:
     pass
 
+try:
+    import blake3  # noqa: F401
+
+    BLAKE3_AVAILABLE = True
+except ImportError:
+    pass
+
 
 def check_all_dependencies() -> Tuple[List[str], List[str]]:
     """
@@ -92,6 +116,7 @@ def check_all_dependencies() -> Tuple[List[str], List[str]]:
         "imagehash": IMAGEHASH_AVAILABLE,
         "aiofiles": AIOFILES_AVAILABLE,
         "xxhash": XXHASH_AVAILABLE,
+        "blake3": BLAKE3_AVAILABLE,
     }
 
     available = [name for name, is_available in dependencies.items() if is_available]
@@ -104,26 +129,82 @@ def print_dependency_status() -> None:
     """Print status of all optional dependencies to console."""
     available, missing = check_all_dependencies()
 
-    console.print("\n[bold cyan]Optional Dependency Status:[/bold cyan]")
+    lines = ["", "[bold cyan]Optional Dependency Status:[/bold cyan]"]
 
     if available:
-        console.print("\n[bold green]Available:[/bold green]")
-        for dep in available:
-            console.print(f"  ✓ {dep}")
+        lines.extend(["", "[bold green]Available:[/bold green]"])
+        lines.extend(f"  ✓ {dep}" for dep in available)
 
     if missing:
-        console.print("\n[bold yellow]Missing (features will be disabled):[/bold yellow]")
-        for dep in missing:
-            console.print(f"  ✗ {dep}")
+        lines.extend(["", "[bold yellow]Missing (features will be disabled):[/bold yellow]"])
+        lines.extend(f"  ✗ {dep}" for dep in missing)
+
+    lines.extend(
+        [
+            "",
+            "[dim]Install all optional dependencies with:[/dim]",
+            "[dim]  pip install allsorted\\[full][/dim]",
+            "",
+        ]
+    )
+
+    _get_console().print("\n".join(lines))
+
+
+# Feature name -> (available, dependency name, feature description)
+_FEATURE_DEPS: Dict[str, Tuple[bool, str, str]] = {
+    "magic": (
+        PYTHON_MAGIC_AVAILABLE,
+        "python-magic",
+        "Magic file classification (content-based type detection)",
+    ),
+    "metadata": (
+        PILLOW_AVAILABLE and MUTAGEN_AVAILABLE,
+        "Pillow and mutagen",
+        "Metadata extraction (EXIF, ID3 tags)",
+    ),
+    "exif": (PILLOW_AVAILABLE, "Pillow", "EXIF data extraction from images"),
+    "id3": (MUTAGEN_AVAILABLE, "mutagen", "ID3 tag extraction from audio files"),
+    "watch": (WATCHDOG_AVAILABLE, "watchdog", "File system watch mode"),
+    "perceptual": (
+        IMAGEHASH_AVAILABLE,
+        "imagehash",
+        "Perceptual duplicate detection for images",
+    ),
+    "async": (AIOFILES_AVAILABLE, "aiofiles", "Async file I/O"),
+    "xxhash": (XXHASH_AVAILABLE, "xxhash", "Fast xxHash algorithm"),
+    "blake3": (BLAKE3_AVAILABLE, "blake3", "Fast BLAKE3 algorithm"),
+}
+
+# Features whose unavailability has already been reported to the user
+_WARNED: Set[str] = set()
+
+
+@lru_cache(maxsize=None)
+def _feature_warning_message(feature: str) -> str:
+    """
+    Build the console warning for an unavailable feature.
+
+    Args:
+        feature: Feature name (must be a key of _FEATURE_DEPS)
 
-    console.print("\n[dim]Install all optional dependencies with:[/dim]")
-    console.print("[dim]  pip install allsorted[full][/dim]\n")
+    Returns:
+        Rich-markup warning message
+    """
+    _, dep_name, feature_desc = _FEATURE_DEPS[feature]
+    return (
+        f"[yellow]Warning:[/yellow] {feature_desc} requires {dep_name}.\n"
+        f"Install with: [cyan]pip install {dep_name}[/cyan]\n"
+        f"Feature will be disabled.\n"
+    )
 
 
 def warn_if_feature_unavailable(feature: str, show_warning: bool = True) -> bool:
     """
     Check if a feature is available and warn user if dependencies are missing.
 
+    The warning is shown at most once per feature.
+
     Args:
         feature: Feature name to check
         show_warning: Whether to show warning message to user
@@ -131,41 +212,15 @@ def warn_if_feature_unavailable(feature: str, show_warning: bool = True) -> bool
     Returns:
         True if feature is available, False otherwise
     """
-    feature_deps: Dict[str, Tuple[bool, str, str]] = {
-        "magic": (
-            PYTHON_MAGIC_AVAILABLE,
-            "python-magic",
-            "Magic file classification (content-based type detection)",
-        ),
-        "metadata": (
-            PILLOW_AVAILABLE and MUTAGEN_AVAILABLE,
-            "Pillow and mutagen",
-            "Metadata extraction (EXIF, ID3 tags)",
-        ),
-        "exif": (PILLOW_AVAILABLE, "Pillow", "EXIF data extraction from images"),
-        "id3": (MUTAGEN_AVAILABLE, "mutagen", "ID3 tag extraction from audio files"),
-        "watch": (WATCHDOG_AVAILABLE, "watchdog", "File system watch mode"),
-        "perceptual": (
-            IMAGEHASH_AVAILABLE,
-            "imagehash",
-            "Perceptual duplicate detection for images",
-        ),
-        "async": (AIOFILES_AVAILABLE, "aiofiles", "Async file I/O"),
-        "xxhash": (XXHASH_AVAILABLE, "xxhash", "Fast xxHash algorithm"),
-    }
-
-    if feature not in feature_deps:
+    if feature not in _FEATURE_DEPS:
         logger.warning(f"Unknown feature check: {feature}")
         return False
 
-    available, dep_name, feature_desc = feature_deps[feature]
+    available, dep_name, feature_desc = _FEATURE_DEPS[feature]
 
-    if not available and show_warning:
-        console.print(
-            f"[yellow]Warning:[/yellow] {feature_desc} requires {dep_name}.\n"
-            f"Install with: [cyan]pip install {dep_name}[/cyan]\n"
-            f"Feature will be disabled.\n"
-        )
+    if not available and show_warning and feature not in _WARNED:
+        _WARNED.add(feature)
+        _get_console().print(_feature_warning_message(feature))
         logger.warning(f"{feature_desc} unavailable - {dep_name} not installed")
 
     return available
@@ -185,7 +240,7 @@ def require_dependency(feature: str, dependency_name: str) -> None:
     available = warn_if_feature_unavailable(feature, show_warning=False)
 
     if not available:
-        console.print(
+        _get_console().print(
             f"[bold red]Error:[/bold red] {feature} requires {dependency_name}.\n"
             f"Install with: [cyan]pip install {dependency_name}[/cyan]\n"
         )
@@ -219,9 +274,12 @@ def get_missing_dependencies_for_config(config: "Config") -> List[str]:  # type:
     if config.use_async and not AIOFILES_AVAILABLE:
         missing.append("aiofiles")
 
-    if config.hash_algorithm == "xxhash" and not XXHASH_AVAILABLE:
+    if config.hash_algorithm in ("xxhash", "xxh3") and not XXHASH_AVAILABLE:
         missing.append("xxhash")
 
+    if config.hash_algorithm == "blake3" and not BLAKE3_AVAILABLE:
+        missing.append("blake3")
+
     return missing
 
 
@@ -235,12 +293,15 @@ def warn_about_config_dependencies(config: "Config") -> None:  # type: ignore[na
     missing = get_missing_dependencies_for_config(config)
 
     if missing:
-        console.print("\n[bold yellow]Configuration Warning:[/bold yellow]")
-        console.print("The following features are enabled but dependencies are missing:\n")
-        for dep in missing:
-            console.print(f"  ✗ {dep}")
-
-        console.print("\n[dim]Install missing dependencies with:[/dim]")
-        for dep in missing:
-            console.print(f"[dim]  pip install {dep}[/dim]")
-        console.print()
+        lines = [
+            "",
+            "[bold yellow]Configuration Warning:[/bold yellow]",
+            "The following features are enabled but dependencies are missing:",
+            "",
+        ]
+        lines.extend(f"  ✗ {dep}" for dep in missing)
+        lines.extend(["", "[dim]Install missing dependencies with:[/dim]"])
+        lines.extend(f"[dim]  pip install {dep}[/dim]" for dep in missing)
+        lines.append("")
+
+        _get_console().print("\n".join(lines))
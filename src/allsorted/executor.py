@@ -2,13 +2,21 @@
 Execution engine for allsorted organization plans.
 """
 
+import hashlib
 import json
 import logging
+import mmap
+import os
 import shutil
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Callable, Optional
+from typing import IO, Any, Callable, Dict, Iterable, List, Optional, Set
 
+from allsorted.analyzer import XXHASH_AVAILABLE, get_hasher_factory
 from allsorted.models import (
     ConflictResolution,
     MoveOperation,
@@ -29,6 +37,10 @@ class ExecutionError(Exception):
 class OrganizationExecutor:
     """Executes organization plans with safety and logging."""
 
+    # File operations held in memory at a time when executing in parallel, so
+    # spilled plans are streamed rather than loaded whole
+    PARALLEL_BATCH_SIZE = 10_000
+
     def __init__(self, dry_run: bool = False, log_operations: bool = True, config: Optional["Config"] = None):  # type: ignore[name-defined]
         """
         Initialize executor.
@@ -42,6 +54,17 @@ class OrganizationExecutor:
         self.log_operations = log_operations
         self.config = config
         self.operation_log_path: Optional[Path] = None
+        # Config values read on every operation, looked up once
+        self._verify_integrity = bool(getattr(config, "verify_integrity", False))
+        self._hash_algorithm: str = getattr(config, "hash_algorithm", "sha256")
+        self._use_xxhash = self._hash_algorithm in ("xxhash", "xxh3") and XXHASH_AVAILABLE
+        self._log_fp: Optional[IO[str]] = None
+        # Device id of each destination directory, used to pick the rename fast path
+        self._dev_cache: Dict[Path, int] = {}
+        # Destination directories already ensured during the current run
+        self._created_dirs: Set[Path] = set()
+        # Guards shared state when file operations run on worker threads
+        self._lock = threading.Lock()
 
     def execute_plan(
         self,
@@ -51,6 +74,9 @@ class OrganizationExecutor:
         """
         Execute an organization plan.
 
+        The plan is closed afterwards, deleting its spill file; its totals remain
+        available for reporting.
+
         Args:
             plan: Plan to execute
             progress_callback: Optional callback(current, total) for progress
@@ -60,7 +86,7 @@ class OrganizationExecutor:
         """
         logger.info(
             f"{'[DRY RUN] ' if self.dry_run else ''}Executing plan with "
-            f"{len(plan.operations)} file operations and "
+            f"{plan.total_files} file operations and "
             f"{len(plan.directory_operations)} directory operations"
         )
 
@@ -70,32 +96,53 @@ class OrganizationExecutor:
             dry_run=self.dry_run,
         )
 
-        # Setup operation log
-        if self.log_operations and not self.dry_run:
-            self._setup_operation_log(plan.root_dir)
+        # Directories may have been removed by cleanup since a previous run
+        self._created_dirs.clear()
 
         try:
-            total_ops = len(plan.operations) + len(plan.directory_operations)
+            # Setup operation log, inside the try so the finally below always closes it
+            if self.log_operations and not self.dry_run:
+                self._setup_operation_log(plan.root_dir)
+
+            total_ops = plan.total_files + len(plan.directory_operations)
             current_idx = 0
 
-            # Execute file operations first
-            for operation in plan.operations:
-                current_idx += 1
-                if progress_callback:
-                    progress_callback(current_idx, total_ops)
+            def advance() -> None:
+                nonlocal current_idx
+                with self._lock:
+                    current_idx += 1
+                    if progress_callback:
+                        progress_callback(current_idx, total_ops)
 
-                try:
-                    self._execute_operation(operation, result)
-                except Exception as e:
-                    error_msg = f"Failed to execute {operation.source}: {e}"
-                    logger.error(error_msg)
-                    result.failed_operations.append((operation, str(e)))
+            # Execute file operations first
+            max_workers = self._get_max_workers()
+            if max_workers > 1 and plan.total_files > 1:
+                logger.info(
+                    f"Executing {plan.total_files} file operations with {max_workers} workers"
+                )
+                operation_iter = plan.iter_operations()
+                batches = iter(lambda: list(islice(operation_iter, self.PARALLEL_BATCH_SIZE)), [])
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    for batch in batches:
+                        # Operations sharing a destination directory can conflict with
+                        # each other, so each directory's operations run in order on one
+                        # worker, and a batch finishes before the next one starts
+                        groups: Dict[Path, List[MoveOperation]] = defaultdict(list)
+                        for operation in batch:
+                            groups[operation.destination.parent].append(operation)
+
+                        futures = [
+                            pool.submit(self._execute_operations, operations, result, advance)
+                            for operations in groups.values()
+                        ]
+                        for future in as_completed(futures):
+                            future.result()
+            else:
+                self._execute_operations(plan.iter_operations(), result, advance)
 
             # Execute directory operations after files are moved
             for dir_operation in plan.directory_operations:
-                current_idx += 1
-                if progress_callback:
-                    progress_callback(current_idx, total_ops)
+                advance()
 
                 try:
                     self._execute_directory_operation(dir_operation, result)
@@ -108,6 +155,8 @@ class OrganizationExecutor:
                 self._cleanup_empty_directories(plan.root_dir, result)
 
         finally:
+            self._close_operation_log()
+            plan.close()
             result.completed = datetime.now()
 
         logger.info(
@@ -118,6 +167,43 @@ class OrganizationExecutor:
 
         return result
 
+    def _get_max_workers(self) -> int:
+        """
+        Get the number of worker threads to use for file operations.
+
+        Returns:
+            Worker count (1 when parallel processing is disabled)
+        """
+        config = self.config
+        if config is None or not getattr(config, "parallel_processing", False):
+            return 1
+        return max(1, getattr(config, "max_workers", 4))
+
+    def _execute_operations(
+        self,
+        operations: Iterable[MoveOperation],
+        result: OrganizationResult,
+        advance: Callable[[], None],
+    ) -> None:
+        """
+        Execute a sequence of move operations, recording failures.
+
+        Args:
+            operations: Move operations to execute in order
+            result: Result object to update
+            advance: Callback invoked before each operation to report progress
+        """
+        for operation in operations:
+            advance()
+
+            try:
+                self._execute_operation(operation, result)
+            except Exception as e:
+                error_msg = f"Failed to execute {operation.source}: {e}"
+                logger.error(error_msg)
+                with self._lock:
+                    result.failed_operations.append((operation, str(e)))
+
     def _execute_operation(self, operation: MoveOperation, result: OrganizationResult) -> None:
         """
         Execute a single move operation.
@@ -132,36 +218,42 @@ class OrganizationExecutor:
         source = operation.source
         destination = operation.destination
 
-        # Validate source exists
-        if not source.exists():
-            raise ExecutionError(f"Source file does not exist: {source}")
+        # Validate source exists; the stat result is reused to choose the move strategy
+        try:
+            source_dev = os.lstat(source).st_dev
+        except FileNotFoundError as e:
+            raise ExecutionError(f"Source file does not exist: {source}") from e
+        except OSError as e:
+            raise ExecutionError(f"Cannot access source file {source}: {e}") from e
 
         # Handle destination directory
         dest_dir = destination.parent
-        if not self.dry_run:
+        if not self.dry_run and dest_dir not in self._created_dirs:
             try:
                 ensure_dir(dest_dir)
-                if dest_dir not in result.directories_created:
-                    result.directories_created.append(dest_dir)
             except OSError as e:
                 raise ExecutionError(f"Cannot create directory {dest_dir}: {e}") from e
+            with self._lock:
+                if dest_dir not in self._created_dirs:
+                    self._created_dirs.add(dest_dir)
+                    result.directories_created.append(dest_dir)
 
         # Handle file conflicts
         final_destination = self._resolve_conflict(destination, operation.conflict_resolution)
 
         # Execute the move
         if self.dry_run:
-            logger.info(f"[DRY RUN] Would move: {source} -> {final_destination}")
+            logger.info("[DRY RUN] Would move: %s -> %s", source, final_destination)
         else:
             # Store source hash for integrity verification if enabled
             source_hash = operation.file_info.hash if operation.file_info else None
 
             try:
-                shutil.move(str(source), str(final_destination))
-                logger.info(f"Moved: {source} -> {final_destination}")
+                self._move(source, final_destination, source_dev)
+                logger.info("Moved: %s -> %s", source, final_destination)
 
                 # Verify integrity if enabled
-                if source_hash and self._should_verify_integrity():
+                if source_hash and self._verify_integrity:
                     if not self._verify_file_integrity(source_hash, final_destination):
                         # Integrity check failed - this is serious
                         logger.error(f"Integrity verification failed for {final_destination}")
@@ -178,7 +270,8 @@ class OrganizationExecutor:
 
         # Update operation with final destination
         operation.destination = final_destination
-        result.successful_operations.append(operation)
+        with self._lock:
+            result.successful_operations.append(operation)
 
     def _execute_directory_operation(self, operation, result: OrganizationResult) -> None:
         """
@@ -194,9 +287,13 @@ class OrganizationExecutor:
         source = operation.source
         destination = operation.destination
 
-        # Validate source exists
-        if not source.exists():
-            raise ExecutionError(f"Source directory does not exist: {source}")
+        # Validate source exists; the stat result is reused to choose the move strategy
+        try:
+            source_dev = os.lstat(source).st_dev
+        except FileNotFoundError as e:
+            raise ExecutionError(f"Source directory does not exist: {source}") from e
+        except OSError as e:
+            raise ExecutionError(f"Cannot access source directory {source}: {e}") from e
 
         # Handle destination directory
         dest_parent = destination.parent
@@ -211,11 +308,11 @@ class OrganizationExecutor:
 
         # Execute the move
         if self.dry_run:
-            logger.info(f"[DRY RUN] Would move directory: {source} -> {final_destination}")
+            logger.info("[DRY RUN] Would move directory: %s -> %s", source, final_destination)
         else:
             try:
-                shutil.move(str(source), str(final_destination))
-                logger.info(f"Moved directory: {source} -> {final_destination}")
+                self._move(source, final_destination, source_dev)
+                logger.info("Moved directory: %s -> %s", source, final_destination)
 
                 # Log operation for undo capability
                 if self.log_operations:
@@ -224,6 +321,33 @@ class OrganizationExecutor:
             except (OSError, shutil.Error) as e:
                 raise ExecutionError(f"Directory move failed: {e}") from e
 
+    def _move(self, source: Path, destination: Path, source_dev: int) -> None:
+        """
+        Move a file or directory, renaming in place when possible.
+
+        When source and destination directory are on the same filesystem the move
+        is a single rename (os.replace); otherwise shutil.move copies and deletes.
+
+        Args:
+            source: Path to move
+            destination: Final destination path (must not exist)
+            source_dev: Device id of the source (from lstat)
+
+        Raises:
+            OSError: If the move fails
+            shutil.Error: If shutil.move fails
+        """
+        dest_dir = destination.parent
+        dest_dev = self._dev_cache.get(dest_dir)
+        if dest_dev is None:
+            dest_dev = dest_dir.stat().st_dev
+            self._dev_cache[dest_dir] = dest_dev
+
+        if source_dev == dest_dev:
+            source.replace(destination)
+        else:
+            shutil.move(str(source), str(destination))
+
     def _resolve_conflict(self, destination: Path, resolution: ConflictResolution) -> Path:
         """
         Resolve file name conflict at destination.
@@ -238,33 +362,35 @@ class OrganizationExecutor:
         Raises:
             ExecutionError: If conflict cannot be resolved
         """
-        if not destination.exists():
-            return destination
-
-        if resolution == ConflictResolution.RENAME:
-            new_dest = get_unique_path(destination)
-            logger.info(f"Conflict resolved by renaming: {destination} -> {new_dest}")
-            return new_dest
-
-        elif resolution == ConflictResolution.SKIP:
-            raise ExecutionError(f"Destination exists and strategy is SKIP: {destination}")
-
-        elif resolution == ConflictResolution.OVERWRITE:
+        if resolution == ConflictResolution.OVERWRITE:
+            # Unlink directly rather than checking existence first; nothing is deleted in dry-run
             if not self.dry_run:
                 try:
                     destination.unlink()
                     logger.warning(f"Overwriting existing file: {destination}")
+                except FileNotFoundError:
+                    pass
                 except OSError as e:
                     raise ExecutionError(f"Cannot overwrite {destination}: {e}") from e
             return destination
 
-        elif resolution == ConflictResolution.ASK:
+        if not destination.exists():
+            return destination
+
+        if resolution == ConflictResolution.ASK:
             # In non-interactive context, default to rename
             logger.warning("ASK strategy in non-interactive mode, defaulting to RENAME")
-            return self._resolve_conflict(destination, ConflictResolution.RENAME)
+            resolution = ConflictResolution.RENAME
 
-        else:
-            raise ExecutionError(f"Unknown conflict resolution strategy: {resolution}")
+        if resolution == ConflictResolution.RENAME:
+            new_dest = get_unique_path(destination)
+            logger.info(f"Conflict resolved by renaming: {destination} -> {new_dest}")
+            return new_dest
+
+        if resolution == ConflictResolution.SKIP:
+            raise ExecutionError(f"Destination exists and strategy is SKIP: {destination}")
+
+        raise ExecutionError(f"Unknown conflict resolution strategy: {resolution}")
 
     def _cleanup_empty_directories(self, root_dir: Path, result: OrganizationResult) -> None:
         """
@@ -289,52 +415,52 @@ class OrganizationExecutor:
 
                 config = Config()
 
-        # Walk from bottom up to delete nested empty dirs first
-        for dirpath in sorted(root_dir.rglob("*"), key=lambda p: len(p.parts), reverse=True):
-            if not dirpath.is_dir():
-                continue
-
-            # Don't delete the root
-            if dirpath == root_dir:
-                continue
-
-            # Skip special directories
-            if dirpath.name.startswith("."):
-                continue
-
-            # Only clean up directories inside managed directories
-            # Check if any parent is a managed directory
-            is_in_managed = False
-            for parent in dirpath.parents:
-                if parent == root_dir:
-                    break
-                if config.is_managed_directory(parent):
-                    is_in_managed = True
-                    break
-
-            # Also check if the directory itself is a top-level managed directory
-            if dirpath.parent == root_dir and config.is_managed_directory(dirpath):
-                is_in_managed = True
-
-            if not is_in_managed:
-                continue
+        # Snapshot the top-level managed directories once; only their subtrees are walked
+        try:
+            managed_roots = [
+                p for p in root_dir.iterdir() if p.is_dir() and config.is_managed_directory(p)
+            ]
+        except OSError as e:
+            logger.debug(f"Could not list {root_dir}: {e}")
+            return
 
-            try:
-                # Check if directory is empty
-                if not any(dirpath.iterdir()):
+        removed: Set[str] = set()
+
+        for managed_root in managed_roots:
+            # os.walk(topdown=False) yields children before their parents, so nested
+            # empty directories are removed first, without sorting the whole tree by depth
+            for dirpath_str, dirnames, filenames in os.walk(
+                managed_root, topdown=False, followlinks=False
+            ):
+                # Skip special directories; the walk stays on strings to avoid a Path per entry
+                if os.path.basename(dirpath_str).startswith("."):  # noqa: PTH119
+                    continue
+
+                # The listing predates removal of this directory's own empty children
+                if filenames or any(
+                    os.path.join(dirpath_str, d) not in removed for d in dirnames  # noqa: PTH118
+                ):
+                    continue
+
+                dirpath = Path(dirpath_str)
+                try:
                     if self.dry_run:
-                        logger.info(f"[DRY RUN] Would remove empty directory: {dirpath}")
+                        logger.info("[DRY RUN] Would remove empty directory: %s", dirpath)
                     else:
                         dirpath.rmdir()
-                        logger.info(f"Removed empty directory: {dirpath}")
+                        logger.info("Removed empty directory: %s", dirpath)
                         result.directories_removed.append(dirpath)
-            except OSError as e:
-                logger.debug(f"Could not remove directory {dirpath}: {e}")
+                    removed.add(dirpath_str)
+                except OSError as e:
+                    logger.debug(f"Could not remove directory {dirpath}: {e}")
 
     def _setup_operation_log(self, root_dir: Path) -> None:
         """
         Setup operation log file for undo capability.
 
+        The log is newline-delimited JSON: a header object on the first line,
+        followed by one object per operation, appended as moves complete.
+
         Args:
             root_dir: Root directory
         """
@@ -342,21 +468,30 @@ class OrganizationExecutor:
         ensure_dir(log_dir)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.operation_log_path = log_dir / f"operations_{timestamp}.json"
+        self.operation_log_path = log_dir / f"operations_{timestamp}.jsonl"
 
-        # Initialize log file
-        log_data = {
+        header = {
             "version": "1.0",
             "timestamp": timestamp,
             "root_dir": str(root_dir),
-            "operations": [],
         }
 
-        with open(self.operation_log_path, "w") as f:
-            json.dump(log_data, f, indent=2)
+        # Line-buffered so every logged operation reaches disk even if the run is
+        # interrupted; kept open across the run and closed by _close_operation_log()
+        self._log_fp = self.operation_log_path.open("a", buffering=1)  # noqa: SIM115
+        self._log_fp.write(json.dumps(header) + "\n")
 
         logger.info(f"Operation log initialized: {self.operation_log_path}")
 
+    def _close_operation_log(self) -> None:
+        """Close the operation log file if it is open."""
+        if self._log_fp is not None:
+            try:
+                self._log_fp.close()
+            except OSError as e:
+                logger.warning(f"Could not close operation log: {e}")
+            self._log_fp = None
+
     def _log_operation(self, source: Path, destination: Path) -> None:
         """
         Log a single operation for undo capability.
@@ -365,41 +500,64 @@ class OrganizationExecutor:
             source: Source path
             destination: Destination path
         """
-        if not self.operation_log_path:
+        if self._log_fp is None:
             return
 
-        try:
-            # Read existing log
-            with open(self.operation_log_path) as f:
-                log_data = json.load(f)
-
-            # Add new operation
-            log_data["operations"].append(
-                {
-                    "timestamp": datetime.now().isoformat(),
-                    "source": str(source),
-                    "destination": str(destination),
-                }
-            )
-
-            # Write back
-            with open(self.operation_log_path, "w") as f:
-                json.dump(log_data, f, indent=2)
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "source": str(source),
+            "destination": str(destination),
+        }
 
-        except (OSError, json.JSONDecodeError) as e:
+        try:
+            with self._lock:
+                self._log_fp.write(json.dumps(entry) + "\n")
+        except OSError as e:
             logger.warning(f"Could not log operation: {e}")
 
-    def _should_verify_integrity(self) -> bool:
+    @staticmethod
+    def _read_operation_log(log_file: Path) -> List[Dict[str, Any]]:
         """
-        Check if integrity verification is enabled.
+        Read logged operations from an operation log file.
+
+        Supports the newline-delimited format as well as the older single
+        JSON document with an "operations" list.
+
+        Args:
+            log_file: Path to operations log file
 
         Returns:
-            True if integrity verification should be performed
+            List of operation entries in the order they were performed
+
+        Raises:
+            OSError: If the file cannot be read
+            json.JSONDecodeError: If the file is not valid JSON
         """
-        config = self.config
-        if config is None:
-            return False
-        return getattr(config, "verify_integrity", False)
+        with open(log_file) as f:
+            content = f.read()
+
+        try:
+            log_data = json.loads(content)
+        except json.JSONDecodeError:
+            log_data = None
+
+        if isinstance(log_data, dict):
+            # Legacy document, or a newline-delimited log holding only its header
+            return list(log_data.get("operations", []))
+
+        lines = [line for line in content.splitlines() if line.strip()]
+        entries = [json.loads(line) for line in lines]
+        # First line is the header, the rest are operations
+        return entries[1:]
+
+    def _hasher_factory(self) -> Any:
+        """
+        Create a new hasher using the same algorithm as the analyzer.
+
+        Returns:
+            Fresh hash object (sha256, xxh64, xxh3_64 or blake3)
+        """
+        return get_hasher_factory(self._hash_algorithm)()
 
     def _verify_file_integrity(self, expected_hash: str, file_path: Path) -> bool:
         """
@@ -417,35 +575,21 @@ class OrganizationExecutor:
             return False
 
         try:
-            # Recalculate hash using same algorithm
-            import hashlib
-
-            config = self.config
-            algorithm = getattr(config, "hash_algorithm", "sha256") if config else "sha256"
-
-            if algorithm == "xxhash":
-                try:
-                    import xxhash
-
-                    hasher = xxhash.xxh64()
-                except ImportError:
-                    hasher = hashlib.sha256()
-            else:
-                hasher = hashlib.sha256()
-
-            block_size = getattr(config, "hash_block_size", 65536) if config else 65536
-
             with open(file_path, "rb") as f:
-                while True:
-                    block = f.read(block_size)
-                    if not block:
-                        break
-                    hasher.update(block)
+                if self._use_xxhash or not hasattr(hashlib, "file_digest"):
+                    # No file_digest support: hash the whole file in one update over an mmap
+                    hasher = self._hasher_factory()
+                    if os.fstat(f.fileno()).st_size > 0:
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                            hasher.update(mm)
+                else:
+                    # Let hashlib run the chunked read/update loop in C
+                    hasher = hashlib.file_digest(f, self._hasher_factory)
 
             actual_hash = hasher.hexdigest()
 
             if actual_hash == expected_hash:
-                logger.debug(f"Integrity verified for {file_path}")
+                logger.debug("Integrity verified for %s", file_path)
                 return True
             else:
                 logger.error(
@@ -479,12 +623,10 @@ class OrganizationExecutor:
         logger.info(f"Undoing operations from: {log_file}")
 
         try:
-            with open(log_file) as f:
-                log_data = json.load(f)
+            operations = self._read_operation_log(log_file)
         except (OSError, json.JSONDecodeError) as e:
             raise ExecutionError(f"Cannot read operation log: {e}") from e
 
-        operations = log_data.get("operations", [])
         successful = 0
         failed = 0
 
@@ -0,0 +1,147 @@
+"""
+Persistent cache of file content hashes.
+
+Remembers the hash of each file between runs, so files that have not changed since
+they were last hashed (including files allsorted has since moved) are not read again.
+
+Created by orpheus497
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class HashCache:
+    """
+    SQLite-backed mapping from a file's identity and version to its content hash.
+
+    Files are identified by device and inode, so an entry survives the file being
+    moved or renamed within its filesystem, and versioned by size and mtime_ns; an
+    entry is only returned while both still match the file.
+    """
+
+    # Files modified more recently than this are not cached, since a write within the
+    # same mtime tick could change their content without changing their key
+    MIN_AGE_NS = 2_000_000_000
+    # Entries written between commits to disk
+    COMMIT_INTERVAL = 1000
+
+    def __init__(self, db_path: Path):
+        """
+        Open (creating if needed) a hash cache database.
+
+        Args:
+            db_path: SQLite database file
+
+        Raises:
+            OSError: If the cache directory cannot be created
+            sqlite3.Error: If the database cannot be opened
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "dev INTEGER NOT NULL, ino INTEGER NOT NULL, algorithm TEXT NOT NULL, "
+            "size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, digest TEXT NOT NULL, "
+            "PRIMARY KEY (dev, ino, algorithm))"
+        )
+        self._conn.commit()
+        # The watcher hashes on its worker thread
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def get(self, stat: os.stat_result, algorithm: str) -> Optional[str]:
+        """
+        Look up the remembered hash of a file.
+
+        Args:
+            stat: Current stat result of the file
+            algorithm: Hash algorithm the digest must come from
+
+        Returns:
+            Hex digest, or None if the file is unknown or changed since it was hashed
+        """
+        # Stat results without an inode (DirEntry.stat() on Windows) cannot be keyed
+        if not stat.st_ino:
+            return None
+
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT digest FROM hashes WHERE dev = ? AND ino = ? AND algorithm = ? "
+                    "AND size = ? AND mtime_ns = ?",
+                    (stat.st_dev, stat.st_ino, algorithm, stat.st_size, stat.st_mtime_ns),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"Hash cache lookup failed: {e}")
+            return None
+
+        return str(row[0]) if row else None
+
+    def put(self, stat: os.stat_result, algorithm: str, digest: str) -> None:
+        """
+        Remember the hash of a file, replacing any entry for an older version.
+
+        Args:
+            stat: Stat result the file had when it was hashed
+            algorithm: Hash algorithm used
+            digest: Hex digest of the file content
+        """
+        if not stat.st_ino or time.time_ns() - stat.st_mtime_ns < self.MIN_AGE_NS:
+            return
+
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        stat.st_dev,
+                        stat.st_ino,
+                        algorithm,
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                        digest,
+                    ),
+                )
+                self._pending += 1
+                if self._pending >= self.COMMIT_INTERVAL:
+                    self._conn.commit()
+                    self._pending = 0
+        except sqlite3.Error as e:
+            logger.debug(f"Hash cache update failed: {e}")
+
+    def commit(self) -> None:
+        """Write remembered hashes to disk."""
+        try:
+            with self._lock:
+                if self._pending:
+                    self._conn.commit()
+                    self._pending = 0
+        except sqlite3.Error as e:
+            logger.debug(f"Hash cache commit failed: {e}")
+
+    def close(self) -> None:
+        """Commit remembered hashes and close the database."""
+        self.commit()
+        with self._lock:
+            self._conn.close()
+
+
+def get_default_hash_cache_path() -> Path:
+    """
+    Get the default hash cache file path.
+
+    Returns:
+        Path to default cache location
+    """
+    return Path.home() / ".cache" / "allsorted" / "hashes.sqlite"
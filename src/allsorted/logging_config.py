@@ -5,17 +5,17 @@ Created by orpheus497
 """
 
 import logging
+import os
 import sys
 from pathlib import Path
-from typing import Optional
-
-from rich.logging import RichHandler
+from typing import List, Optional
 
 
 def setup_logging(
     level: str = "INFO",
     log_file: Optional[Path] = None,
     use_rich: bool = True,
+    show_locals: Optional[bool] = None,
 ) -> None:
     """
     Setup centralized logging configuration.
@@ -24,6 +24,9 @@ def setup_logging(
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional file path for file logging
         use_rich: Use Rich handler for beautiful console output
+        show_locals: Show local variables in Rich tracebacks. Defaults to the
+            ALLSORTED_RICH_LOCALS environment variable, off when unset, since
+            rendering locals can mean repr() of very large objects such as plans
     """
     # Convert string level to logging level
     numeric_level = getattr(logging, level.upper(), logging.INFO)
@@ -33,15 +36,22 @@ def setup_logging(
     file_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
     # Setup handlers
-    handlers = []
+    handlers: List[logging.Handler] = []
 
     # Console handler
+    console_handler: logging.Handler
     if use_rich:
+        from rich.logging import RichHandler
+
+        if show_locals is None:
+            rich_locals = os.environ.get("ALLSORTED_RICH_LOCALS", "")
+            show_locals = rich_locals.lower() in ("1", "true", "yes")
+
         console_handler = RichHandler(
             show_path=False,
             markup=True,
             rich_tracebacks=True,
-            tracebacks_show_locals=True,
+            tracebacks_show_locals=show_locals,
         )
         console_handler.setFormatter(logging.Formatter(console_format))
     else:
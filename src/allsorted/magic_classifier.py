@@ -8,10 +8,13 @@ Created by orpheus497
 
 Dependencies:
     - python-magic (MIT License) by Adam Hupp
+    - filetype (MIT License) by Tomas Aparicio (optional, preferred when installed)
+    - puremagic (MIT License) by Chris Griffith (optional, preferred when installed)
 """
 
+import json
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 try:
     import magic
@@ -20,6 +23,22 @@ try:
 except ImportError:
     MAGIC_AVAILABLE = False
 
+# Pure-Python signature matchers avoid a libmagic call per file; libmagic is
+# still used for anything they cannot identify (e.g. plain text)
+try:
+    import filetype
+
+    FILETYPE_AVAILABLE = True
+except ImportError:
+    FILETYPE_AVAILABLE = False
+
+try:
+    import puremagic
+
+    PUREMAGIC_AVAILABLE = True
+except ImportError:
+    PUREMAGIC_AVAILABLE = False
+
 from allsorted.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -28,10 +47,146 @@ logger = get_logger(__name__)
 class MagicClassifier:
     """Classifies files by analyzing file content using magic numbers."""
 
-    def __init__(self) -> None:
-        """Initialize magic classifier."""
+    # Bytes read from the start of each file for detection. Most signatures sit in
+    # the first few hundred bytes, but ISO 9660 images are identified at offset 32769.
+    HEAD_BYTES = 65536
+
+    # Upper bound on cached (st_dev, st_ino, st_size, st_mtime_ns) -> MIME entries
+    CACHE_MAX_ENTRIES = 100_000
+
+    # Exact MIME type -> (category, subcategory), expanded once from grouped minors
+    _MIME_TABLE: Dict[str, Tuple[str, str]] = {
+        f"{major}/{minor}": category
+        for major, minors, category in (
+            # Image files
+            ("image", ("jpeg", "jpg", "png", "gif", "bmp", "tiff", "webp"), ("Pics", "Photos")),
+            ("image", ("svg+xml", "x-eps"), ("Pics", "Vector")),
+            ("image", ("x-canon-cr2", "x-nikon-nef", "x-adobe-dng"), ("Pics", "Raw")),
+            ("image", ("x-icon",), ("Pics", "Icons")),
+            # Audio files
+            ("audio", ("x-m4b",), ("Audio", "Podcasts")),
+            # Video files
+            ("video", ("3gpp", "x-m4v"), ("Vids", "Clips")),
+            # Documents
+            ("application", ("pdf",), ("Docs", "PDFs")),
+            (
+                "application",
+                ("msword", "vnd.openxmlformats-officedocument.wordprocessingml.document"),
+                ("Docs", "Word"),
+            ),
+            (
+                "application",
+                (
+                    "vnd.ms-excel",
+                    "vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    "vnd.oasis.opendocument.spreadsheet",
+                ),
+                ("Docs", "Sheets"),
+            ),
+            (
+                "application",
+                (
+                    "vnd.ms-powerpoint",
+                    "vnd.openxmlformats-officedocument.presentationml.presentation",
+                ),
+                ("Docs", "Presentations"),
+            ),
+            ("application", ("epub+zip",), ("Docs", "Ebooks")),
+            (
+                "application",
+                ("zip", "x-rar", "x-7z-compressed", "gzip", "x-bzip2", "x-xz"),
+                ("Archives", "Compressed"),
+            ),
+            ("application", ("x-iso9660-image", "x-apple-diskimage"), ("Archives", "Disk")),
+            ("application", ("x-msdownload", "x-dosexec", "x-msi"), ("Programs", "Windows")),
+            (
+                "application",
+                ("x-debian-package", "x-rpm", "x-executable", "x-sharedlib"),
+                ("Programs", "Linux"),
+            ),
+            ("application", ("x-sqlite3",), ("Apps", "Database")),
+            ("application", ("json", "xml", "yaml"), ("Web", "Data")),
+            # Text files
+            ("text", ("html", "xml"), ("Web", "Documents")),
+            ("text", ("x-python", "x-script.python"), ("Code", "Python")),
+            ("text", ("x-shellscript", "x-sh"), ("Code", "Shell")),
+            ("text", ("x-c", "x-c++"), ("Code", "C")),
+            ("text", ("x-java-source", "x-java"), ("Code", "Java")),
+        )
+        for minor in minors
+    }
+
+    # Fallback category for MIME types not listed above, keyed by major type
+    _MAJOR_DEFAULTS: Dict[str, Tuple[str, str]] = {
+        "image": ("Pics", "Photos"),
+        "audio": ("Audio", "Music"),
+        "video": ("Vids", "Movies"),
+        "text": ("Docs", "Text"),
+    }
+
+    # Extensions trusted without reading the file. Each maps to the category its
+    # usual MIME type classifies as; anything else (no extension, .bin, .dat, .tmp,
+    # ...) is still identified from its content.
+    _EXT_FAST_PATH: Dict[str, Tuple[str, str]] = {
+        ext: category
+        for extensions, category in (
+            (
+                (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tif", ".tiff", ".webp"),
+                ("Pics", "Photos"),
+            ),
+            ((".svg", ".eps"), ("Pics", "Vector")),
+            ((".cr2", ".nef", ".dng"), ("Pics", "Raw")),
+            ((".ico",), ("Pics", "Icons")),
+            ((".mp3", ".flac", ".ogg", ".wav", ".m4a", ".aac"), ("Audio", "Music")),
+            ((".m4b",), ("Audio", "Podcasts")),
+            ((".mp4", ".mkv", ".avi", ".mov", ".webm"), ("Vids", "Movies")),
+            ((".3gp", ".m4v"), ("Vids", "Clips")),
+            ((".pdf",), ("Docs", "PDFs")),
+            ((".doc", ".docx"), ("Docs", "Word")),
+            ((".xls", ".xlsx", ".ods"), ("Docs", "Sheets")),
+            ((".ppt", ".pptx"), ("Docs", "Presentations")),
+            ((".epub",), ("Docs", "Ebooks")),
+            ((".txt", ".log", ".md"), ("Docs", "Text")),
+            ((".zip", ".rar", ".7z", ".gz", ".bz2", ".xz"), ("Archives", "Compressed")),
+            ((".iso", ".dmg"), ("Archives", "Disk")),
+            ((".exe", ".msi"), ("Programs", "Windows")),
+            ((".deb", ".rpm"), ("Programs", "Linux")),
+            ((".sqlite", ".sqlite3"), ("Apps", "Database")),
+            ((".html", ".htm"), ("Web", "Documents")),
+            ((".json", ".yaml", ".yml"), ("Web", "Data")),
+            ((".py",), ("Code", "Python")),
+            ((".sh",), ("Code", "Shell")),
+            ((".c", ".h", ".cpp", ".hpp"), ("Code", "C")),
+            ((".java",), ("Code", "Java")),
+        )
+        for ext in extensions
+    }
+
+    def __init__(self, cache_path: Optional[Path] = None) -> None:
+        """
+        Initialize magic classifier.
+
+        Args:
+            cache_path: Optional file to load MIME results from and save them to on close()
+        """
+        self._mime_cache: Dict[Tuple[int, int, int, int], Optional[str]] = {}
+        self.cache_path = cache_path
+        if cache_path is not None:
+            self.load_cache(cache_path)
+
+        # filetype checks a fixed set of leading-byte matchers and returns a single
+        # MIME type; puremagic scans a much larger signature table and may report
+        # ambiguous matches, so it is only used when filetype is not installed
+        if FILETYPE_AVAILABLE:
+            self.signature_backend: Optional[str] = "filetype"
+        elif PUREMAGIC_AVAILABLE:
+            self.signature_backend = "puremagic"
+        else:
+            self.signature_backend = None
+
         if not MAGIC_AVAILABLE:
-            logger.warning(
+            log = logger.debug if self.signature_backend else logger.warning
+            log(
                 "python-magic not available. Magic classification disabled. "
                 "Install with: pip install python-magic"
             )
@@ -46,7 +201,35 @@ class MagicClassifier:
 
     def is_available(self) -> bool:
         """Check if magic classification is available."""
-        return self.magic is not None
+        return self.magic is not None or self.signature_backend is not None
+
+    def _match_signature(self, head: bytes) -> Optional[str]:
+        """
+        Identify a MIME type with the pure-Python signature backend.
+
+        Args:
+            head: Leading bytes of the file
+
+        Returns:
+            MIME type string or None if the signature is not recognised
+        """
+        if self.signature_backend == "filetype":
+            mime_type: Optional[str] = filetype.guess_mime(head)
+            return mime_type
+        if self.signature_backend == "puremagic":
+            try:
+                matches = puremagic.magic_string(head)
+            except (puremagic.PureError, ValueError):
+                return None
+            if not matches:
+                return None
+            # Equally confident matches with different MIME types (e.g. a plain
+            # zip vs. the OOXML formats) are ambiguous, so let libmagic decide
+            best = matches[0].confidence
+            mime_types = {m.mime_type for m in matches if m.confidence == best}
+            if len(mime_types) == 1:
+                return mime_types.pop() or None
+        return None
 
     def get_mime_type(self, file_path: Path) -> Optional[str]:
         """
@@ -61,14 +244,82 @@ class MagicClassifier:
         if not self.is_available():
             return None
 
+        # Unchanged files (same inode, size and mtime) reuse the previous result
         try:
-            mime_type = self.magic.from_file(str(file_path))
+            st = file_path.stat()
+        except OSError as e:
+            logger.debug(f"Failed to detect MIME type for {file_path}: {e}")
+            return None
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        if key in self._mime_cache:
+            return self._mime_cache[key]
+
+        try:
+            with file_path.open("rb") as f:
+                head = f.read(self.HEAD_BYTES)
+            mime_type = self._match_signature(head)
+            if mime_type is None and self.magic is not None:
+                mime_type = self.magic.from_buffer(head)
             logger.debug(f"Detected MIME type for {file_path.name}: {mime_type}")
-            return mime_type
         except Exception as e:
             logger.debug(f"Failed to detect MIME type for {file_path}: {e}")
             return None
 
+        if len(self._mime_cache) >= self.CACHE_MAX_ENTRIES:
+            # Evict the oldest entry (dicts preserve insertion order)
+            del self._mime_cache[next(iter(self._mime_cache))]
+        self._mime_cache[key] = mime_type
+        return mime_type
+
+    def load_cache(self, cache_path: Path) -> None:
+        """
+        Load cached MIME results saved by a previous run.
+
+        Args:
+            cache_path: Cache file written by save_cache
+        """
+        try:
+            with cache_path.open(encoding="utf-8") as f:
+                entries = json.load(f)
+            for key, mime_type in entries.items():
+                dev, ino, size, mtime_ns = (int(part) for part in key.split(":"))
+                self._mime_cache[(dev, ino, size, mtime_ns)] = mime_type
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, AttributeError) as e:
+            logger.debug(f"Ignoring unreadable MIME cache {cache_path}: {e}")
+            return
+        logger.debug(f"Loaded {len(self._mime_cache)} cached MIME results from {cache_path}")
+
+    def save_cache(self, cache_path: Optional[Path] = None) -> None:
+        """
+        Save cached MIME results for reuse by later runs.
+
+        Args:
+            cache_path: Destination file (defaults to the path given at init)
+        """
+        cache_path = cache_path or self.cache_path
+        if cache_path is None:
+            return
+
+        entries = {":".join(map(str, key)): mime for key, mime in self._mime_cache.items()}
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            tmp_path.replace(cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to save MIME cache to {cache_path}: {e}")
+
+    def close(self) -> None:
+        """Save cached MIME results to the path given at init, if any."""
+        self.save_cache()
+
+    def clear_cache(self) -> None:
+        """Clear cached MIME results."""
+        self._mime_cache.clear()
+
     def classify_by_mime(self, mime_type: str) -> Tuple[str, str]:
         """
         Classify file into category/subcategory based on MIME type.
@@ -79,97 +330,20 @@ class MagicClassifier:
         Returns:
             Tuple of (category, subcategory)
         """
+        # Detection backends report lowercase types, so only lowercase on a miss
+        category = self._MIME_TABLE.get(mime_type)
+        if category is not None:
+            return category
+        lowered = mime_type.lower()
+        if lowered != mime_type:
+            return self.classify_by_mime(lowered)
+
         # Split MIME type into major/minor
-        parts = mime_type.lower().split("/")
-        if len(parts) != 2:
+        major, sep, minor = mime_type.partition("/")
+        if not sep or "/" in minor:
             return ("Misc", "Unsorted")
 
-        major, minor = parts
-
-        # Image files
-        if major == "image":
-            if minor in ("jpeg", "jpg", "png", "gif", "bmp", "tiff", "webp"):
-                return ("Pics", "Photos")
-            elif minor in ("svg+xml", "x-eps"):
-                return ("Pics", "Vector")
-            elif minor in ("x-canon-cr2", "x-nikon-nef", "x-adobe-dng"):
-                return ("Pics", "Raw")
-            elif minor == "x-icon":
-                return ("Pics", "Icons")
-            else:
-                return ("Pics", "Photos")
-
-        # Audio files
-        elif major == "audio":
-            if minor in ("mpeg", "mp3", "flac", "ogg", "wav", "x-wav") or minor in ("x-m4a", "mp4", "aac"):
-                return ("Audio", "Music")
-            elif minor == "x-m4b":
-                return ("Audio", "Podcasts")
-            else:
-                return ("Audio", "Music")
-
-        # Video files
-        elif major == "video":
-            if minor in ("mp4", "x-matroska", "x-msvideo", "quicktime", "webm"):
-                return ("Vids", "Movies")
-            elif minor in ("3gpp", "x-m4v"):
-                return ("Vids", "Clips")
-            else:
-                return ("Vids", "Movies")
-
-        # Documents
-        elif major == "application":
-            if minor == "pdf":
-                return ("Docs", "PDFs")
-            elif minor in ("msword", "vnd.openxmlformats-officedocument.wordprocessingml.document"):
-                return ("Docs", "Word")
-            elif minor in (
-                "vnd.ms-excel",
-                "vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                "vnd.oasis.opendocument.spreadsheet",
-            ):
-                return ("Docs", "Sheets")
-            elif minor in (
-                "vnd.ms-powerpoint",
-                "vnd.openxmlformats-officedocument.presentationml.presentation",
-            ):
-                return ("Docs", "Presentations")
-            elif minor == "epub+zip":
-                return ("Docs", "Ebooks")
-            elif minor in ("zip", "x-rar", "x-7z-compressed", "gzip", "x-bzip2", "x-xz"):
-                return ("Archives", "Compressed")
-            elif minor in ("x-iso9660-image", "x-apple-diskimage"):
-                return ("Archives", "Disk")
-            elif minor in ("x-msdownload", "x-dosexec", "x-msi"):
-                return ("Programs", "Windows")
-            elif minor in ("x-debian-package", "x-rpm") or minor in ("x-executable", "x-sharedlib"):
-                return ("Programs", "Linux")
-            elif minor == "x-sqlite3":
-                return ("Apps", "Database")
-            elif minor in ("json", "xml", "yaml"):
-                return ("Web", "Data")
-            else:
-                return ("Misc", "Unsorted")
-
-        # Text files
-        elif major == "text":
-            if minor in ("html", "xml"):
-                return ("Web", "Documents")
-            elif minor in ("x-python", "x-script.python"):
-                return ("Code", "Python")
-            elif minor in ("x-shellscript", "x-sh"):
-                return ("Code", "Shell")
-            elif minor in ("x-c", "x-c++"):
-                return ("Code", "C")
-            elif minor in ("x-java-source", "x-java"):
-                return ("Code", "Java")
-            elif minor in ("plain", "x-log", "markdown"):
-                return ("Docs", "Text")
-            else:
-                return ("Docs", "Text")
-
-        # Fallback
-        return ("Misc", "Unsorted")
+        return self._MAJOR_DEFAULTS.get(major, ("Misc", "Unsorted"))
 
     def classify_file(self, file_path: Path) -> Optional[Tuple[str, str]]:
         """
@@ -181,7 +355,21 @@ class MagicClassifier:
         Returns:
             Tuple of (category, subcategory) or None if detection fails
         """
+        category = self._EXT_FAST_PATH.get(file_path.suffix.lower())
+        if category is not None:
+            return category
+
         mime_type = self.get_mime_type(file_path)
         if mime_type:
             return self.classify_by_mime(mime_type)
         return None
+
+
+def get_default_cache_path() -> Path:
+    """
+    Get the default MIME cache file path.
+
+    Returns:
+        Path to default cache location
+    """
+    return Path.home() / ".cache" / "allsorted" / "mime.json"
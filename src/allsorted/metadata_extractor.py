@@ -8,12 +8,13 @@ Created by orpheus497
 
 Dependencies:
     - Pillow (HPND License) by Jeffrey A. Clark (Alex Clark)
+    - ExifRead (BSD-3-Clause License) by Ianaré Sévi (optional, preferred when installed)
     - mutagen (GPL-2.0 License) by Joe Wreschnig, Michael Urman
 """
 
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
 try:
     from PIL import Image
@@ -23,6 +24,15 @@ try:
 except ImportError:
     PIL_AVAILABLE = False
 
+# ExifRead parses only the EXIF segment from a raw file handle, without
+# opening the image container the way PIL does
+try:
+    import exifread
+
+    EXIFREAD_AVAILABLE = True
+except ImportError:
+    EXIFREAD_AVAILABLE = False
+
 try:
     from mutagen import File as MutagenFile
     from mutagen.easyid3 import EasyID3
@@ -38,25 +48,95 @@ from allsorted.logging_config import get_logger
 logger = get_logger(__name__)
 
 
+def _parse_exif_dt(value: str) -> Optional[datetime]:
+    """
+    Parse a fixed-format EXIF timestamp ("YYYY:MM:DD HH:MM:SS") by slicing.
+
+    Args:
+        value: EXIF date/time string
+
+    Returns:
+        Parsed datetime, or None if the value is malformed
+    """
+    try:
+        return datetime(
+            int(value[0:4]),
+            int(value[5:7]),
+            int(value[8:10]),
+            int(value[11:13]),
+            int(value[14:16]),
+            int(value[17:19]),
+        )
+    except (ValueError, IndexError, TypeError):
+        return None
+
+
 class MetadataExtractor:
     """Extracts metadata from various file types."""
 
+    # ExifRead tag names -> metadata keys
+    _EXIFREAD_TAGS = {
+        "Image DateTime": "date_taken",
+        "EXIF DateTimeOriginal": "date_original",
+        "Image Make": "camera_make",
+        "Image Model": "camera_model",
+        "Image ImageWidth": "width",
+        "Image ImageLength": "height",
+        "Image Orientation": "orientation",
+    }
+
+    # Bare EXIF tag names (as used for stop_tag) -> metadata keys
+    _STOP_TAG_KEYS = {name.split(" ", 1)[1]: key for name, key in _EXIFREAD_TAGS.items()}
+
+    # Tag each organization strategy needs; EXIF parsing can stop once it is read
+    _STRATEGY_STOP_TAGS = {
+        "exif-date": "DateTimeOriginal",
+        "camera-make": "Model",
+    }
+
+    # Last wanted tag in file order (IFD0 precedes the EXIF sub-IFD), used as the
+    # ExifRead stop tag when the caller does not ask for a specific one
+    _LAST_WANTED_TAG = "DateTimeOriginal"
+
     def __init__(self) -> None:
         """Initialize metadata extractor."""
         self.pil_available = PIL_AVAILABLE
+        self.exifread_available = EXIFREAD_AVAILABLE
         self.mutagen_available = MUTAGEN_AVAILABLE
 
-        if not self.pil_available:
+        # Numeric EXIF tag ids -> metadata keys, so the Pillow tag loop skips
+        # unwanted tags with a single int lookup instead of resolving every name
+        self._pil_tag_keys: Dict[int, str] = (
+            {
+                tag_id: self._STOP_TAG_KEYS[name]
+                for tag_id, name in TAGS.items()
+                if name in self._STOP_TAG_KEYS
+            }
+            if PIL_AVAILABLE
+            else {}
+        )
+
+        # Organization strategy -> function building the key from metadata
+        self._strategy_keys: Dict[str, Callable[[Dict[str, Any]], Optional[str]]] = {
+            "exif-date": self._key_exif_date,
+            "id3-artist": self._key_id3_artist,
+            "id3-album": self._key_id3_album,
+            "id3-genre": self._key_id3_genre,
+            "camera-make": self._key_camera_make,
+        }
+
+        if not self.pil_available and not self.exifread_available:
             logger.debug("Pillow not available. Image metadata extraction disabled.")
         if not self.mutagen_available:
             logger.debug("Mutagen not available. Audio metadata extraction disabled.")
 
-    def extract(self, file_path: Path) -> Dict[str, Any]:
+    def extract(self, file_path: Path, stop_tag: str = "UNDEF") -> Dict[str, Any]:
         """
         Extract all available metadata from a file.
 
         Args:
             file_path: Path to file
+            stop_tag: EXIF tag after which image parsing may stop (see stop_tag_for_strategy)
 
         Returns:
             Dictionary of metadata (empty if extraction fails)
@@ -65,7 +145,7 @@ class MetadataExtractor:
 
         # Try image metadata
         if extension in (".jpg", ".jpeg", ".png", ".tiff", ".webp", ".heic"):
-            return self.extract_image_metadata(file_path)
+            return self.extract_image_metadata(file_path, stop_tag)
 
         # Try audio metadata
         if extension in (".mp3", ".flac", ".m4a", ".ogg", ".wav"):
@@ -74,19 +154,37 @@ class MetadataExtractor:
         # No metadata available
         return {}
 
-    def extract_image_metadata(self, file_path: Path) -> Dict[str, Any]:
+    @classmethod
+    def stop_tag_for_strategy(cls, strategy: str) -> str:
+        """
+        Get the EXIF tag an organization strategy needs.
+
+        Args:
+            strategy: Organization strategy (exif-date, camera-make, etc.)
+
+        Returns:
+            EXIF tag name, or "UNDEF" if the strategy needs every tag
+        """
+        return cls._STRATEGY_STOP_TAGS.get(strategy, "UNDEF")
+
+    def extract_image_metadata(self, file_path: Path, stop_tag: str = "UNDEF") -> Dict[str, Any]:
         """
         Extract EXIF metadata from image files.
 
         Args:
             file_path: Path to image file
+            stop_tag: EXIF tag after which parsing may stop ("UNDEF" reads every wanted tag)
 
         Returns:
             Dictionary with keys: date_taken, camera_make, camera_model, etc.
         """
+        if self.exifread_available:
+            return self._extract_image_metadata_exifread(file_path, stop_tag)
         if not self.pil_available:
             return {}
 
+        stop_key = self._STOP_TAG_KEYS.get(stop_tag)
+
         try:
             with Image.open(file_path) as img:
                 exif_data = img.getexif()
@@ -97,35 +195,26 @@ class MetadataExtractor:
 
                 # Extract relevant EXIF tags
                 for tag_id, value in exif_data.items():
-                    tag_name = TAGS.get(tag_id, tag_id)
+                    key = self._pil_tag_keys.get(tag_id)
+                    if key is None:
+                        continue
 
                     # Date/time tags
-                    if tag_name == "DateTime":
-                        try:
-                            metadata["date_taken"] = datetime.strptime(value, "%Y:%m:%d %H:%M:%S")
-                        except ValueError:
-                            pass
-                    elif tag_name == "DateTimeOriginal":
-                        try:
-                            metadata["date_original"] = datetime.strptime(
-                                value, "%Y:%m:%d %H:%M:%S"
-                            )
-                        except ValueError:
-                            pass
+                    if key in ("date_taken", "date_original"):
+                        dt = _parse_exif_dt(value)
+                        if dt is not None:
+                            metadata[key] = dt
 
                     # Camera info
-                    elif tag_name == "Make":
-                        metadata["camera_make"] = str(value).strip()
-                    elif tag_name == "Model":
-                        metadata["camera_model"] = str(value).strip()
-
-                    # Technical details
-                    elif tag_name == "ImageWidth":
-                        metadata["width"] = int(value)
-                    elif tag_name == "ImageLength":
-                        metadata["height"] = int(value)
-                    elif tag_name == "Orientation":
-                        metadata["orientation"] = int(value)
+                    elif key in ("camera_make", "camera_model"):
+                        metadata[key] = str(value).strip()
+
+                    # Technical details (width, height, orientation)
+                    else:
+                        metadata[key] = int(value)
+
+                    if stop_key in metadata:
+                        break
 
                 logger.debug(f"Extracted image metadata from {file_path.name}: {metadata}")
                 return metadata
@@ -134,6 +223,50 @@ class MetadataExtractor:
             logger.debug(f"Failed to extract image metadata from {file_path}: {e}")
             return {}
 
+    def _extract_image_metadata_exifread(
+        self, file_path: Path, stop_tag: str = "UNDEF"
+    ) -> Dict[str, Any]:
+        """
+        Extract EXIF metadata with ExifRead, skipping MakerNotes and thumbnails.
+
+        Args:
+            file_path: Path to image file
+            stop_tag: EXIF tag after which parsing stops
+
+        Returns:
+            Dictionary with keys: date_taken, camera_make, camera_model, etc.
+        """
+        try:
+            if stop_tag == "UNDEF":
+                stop_tag = self._LAST_WANTED_TAG
+            with file_path.open("rb") as f:
+                tags = exifread.process_file(
+                    f, details=False, extract_thumbnail=False, stop_tag=stop_tag
+                )
+
+            metadata: Dict[str, Any] = {}
+            for tag_name, key in self._EXIFREAD_TAGS.items():
+                tag = tags.get(tag_name)
+                if tag is None:
+                    continue
+                values = tag.values
+
+                if key in ("date_taken", "date_original"):
+                    dt = _parse_exif_dt(str(values))
+                    if dt is not None:
+                        metadata[key] = dt
+                elif key in ("camera_make", "camera_model"):
+                    metadata[key] = str(values).strip()
+                elif values:
+                    metadata[key] = int(values[0])
+
+            logger.debug(f"Extracted image metadata from {file_path.name}: {metadata}")
+            return metadata
+
+        except Exception as e:
+            logger.debug(f"Failed to extract image metadata from {file_path}: {e}")
+            return {}
+
     def extract_audio_metadata(self, file_path: Path) -> Dict[str, Any]:
         """
         Extract ID3/metadata from audio files.
@@ -174,12 +307,15 @@ class MetadataExtractor:
                         metadata[our_tag] = str(value)
 
             # Get audio properties
-            if audio.info:
-                metadata["length_seconds"] = int(audio.info.length)
-                if hasattr(audio.info, "bitrate"):
-                    metadata["bitrate"] = int(audio.info.bitrate)
-                if hasattr(audio.info, "sample_rate"):
-                    metadata["sample_rate"] = int(audio.info.sample_rate)
+            info = audio.info
+            if info:
+                metadata["length_seconds"] = int(info.length)
+                bitrate = getattr(info, "bitrate", None)
+                if bitrate is not None:
+                    metadata["bitrate"] = int(bitrate)
+                sample_rate = getattr(info, "sample_rate", None)
+                if sample_rate is not None:
+                    metadata["sample_rate"] = int(sample_rate)
 
             logger.debug(f"Extracted audio metadata from {file_path.name}: {metadata}")
             return metadata
@@ -199,35 +335,35 @@ class MetadataExtractor:
         Returns:
             String key for organizing, or None if not available
         """
-        if strategy == "exif-date":
-            # Use photo date for organization
-            if "date_original" in metadata:
-                dt = metadata["date_original"]
-                return f"{dt.year}/{dt.month:02d}-{dt.day:02d}"
-            elif "date_taken" in metadata:
-                dt = metadata["date_taken"]
-                return f"{dt.year}/{dt.month:02d}-{dt.day:02d}"
-
-        elif strategy == "id3-artist":
-            # Use music artist for organization
-            if "artist" in metadata:
-                return str(metadata["artist"])
-            elif "album_artist" in metadata:
-                return str(metadata["album_artist"])
-
-        elif strategy == "id3-album":
-            # Use album for organization
-            if "album" in metadata:
-                return str(metadata["album"])
-
-        elif strategy == "id3-genre":
-            # Use genre for organization
-            if "genre" in metadata:
-                return str(metadata["genre"])
-
-        elif strategy == "camera-make":
-            # Use camera make for organization
-            if "camera_make" in metadata:
-                return str(metadata["camera_make"])
-
+        key_func = self._strategy_keys.get(strategy)
+        return key_func(metadata) if key_func else None
+
+    @staticmethod
+    def _key_exif_date(metadata: Dict[str, Any]) -> Optional[str]:
+        """Use photo date for organization."""
+        dt = metadata.get("date_original") or metadata.get("date_taken")
+        return f"{dt:%Y/%m-%d}" if dt else None
+
+    @staticmethod
+    def _key_id3_artist(metadata: Dict[str, Any]) -> Optional[str]:
+        """Use music artist for organization."""
+        if "artist" in metadata:
+            return str(metadata["artist"])
+        if "album_artist" in metadata:
+            return str(metadata["album_artist"])
         return None
+
+    @staticmethod
+    def _key_id3_album(metadata: Dict[str, Any]) -> Optional[str]:
+        """Use album for organization."""
+        return str(metadata["album"]) if "album" in metadata else None
+
+    @staticmethod
+    def _key_id3_genre(metadata: Dict[str, Any]) -> Optional[str]:
+        """Use genre for organization."""
+        return str(metadata["genre"]) if "genre" in metadata else None
+
+    @staticmethod
+    def _key_camera_make(metadata: Dict[str, Any]) -> Optional[str]:
+        """Use camera make for organization."""
+        return str(metadata["camera_make"]) if "camera_make" in metadata else None
@@ -2,11 +2,17 @@
 Data models for allsorted using dataclasses for type safety and validation.
 """
 
+import json
+import sys
+import tempfile
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional, Set
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Set
+
+# Per-file models drop their instance __dict__ where supported (Python 3.10+)
+_SLOTS: Dict[str, Any] = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 class ConflictResolution(Enum):
@@ -27,15 +33,29 @@ class OrganizationStrategy(Enum):
     HYBRID = "hybrid"  # Combine extension and date
 
 
-@dataclass
+@dataclass(frozen=True, eq=False, **_SLOTS)
 class FileInfo:
-    """Information about a single file."""
+    """
+    Information about a single file. Files are equal if they have the same hash.
+
+    The hash is a content digest, or None for files the analyzer could tell apart from
+    every other file by size or leading bytes without hashing them; such files are
+    only equal to themselves.
+    """
 
     path: Path
     size_bytes: int
-    hash: str
+    hash: Optional[str]
     modified_time: float
     is_symlink: bool = False
+    _extension: str = field(init=False, repr=False, compare=False)
+    _name: str = field(init=False, repr=False, compare=False)
+    _resolved_path: Optional[Path] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Cache the extension and name; extensions are interned as they repeat heavily."""
+        object.__setattr__(self, "_extension", sys.intern(self.path.suffix.lower()))
+        object.__setattr__(self, "_name", self.path.name)
 
     @property
     def size_mb(self) -> float:
@@ -50,29 +70,41 @@ class FileInfo:
     @property
     def extension(self) -> str:
         """File extension (lowercase, including dot)."""
-        return self.path.suffix.lower()
+        return self._extension
 
     @property
     def name(self) -> str:
         """File name without path."""
-        return self.path.name
+        return self._name
+
+    @property
+    def resolved_path(self) -> Path:
+        """Canonical absolute path, resolved on first access and then reused."""
+        resolved = self._resolved_path
+        if resolved is None:
+            resolved = self.path.resolve()
+            object.__setattr__(self, "_resolved_path", resolved)
+        return resolved
 
     def __eq__(self, other: object) -> bool:
         """Files are equal if they have the same hash."""
         if not isinstance(other, FileInfo):
             return NotImplemented
+        if self.hash is None or other.hash is None:
+            return self is other
         return self.hash == other.hash
 
     def __hash__(self) -> int:
         """Hash based on file content hash."""
-        return hash(self.hash)
+        return hash(self.hash) if self.hash is not None else id(self)
 
     def __repr__(self) -> str:
         """String representation."""
-        return f"FileInfo(path={self.path}, size={self.size_mb:.2f}MB, hash={self.hash[:8]}...)"
+        file_hash = f"{self.hash[:8]}..." if self.hash is not None else None
+        return f"FileInfo(path={self.path}, size={self.size_mb:.2f}MB, hash={file_hash})"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DuplicateSet:
     """A set of duplicate files (same content hash)."""
 
@@ -90,18 +122,23 @@ class DuplicateSet:
     def _select_primary(self) -> FileInfo:
         """
         Select the primary file to keep based on:
-        1. Shortest path (fewer nested directories)
+        1. Shallowest path (fewer nested directories)
         2. Oldest modification time (tie-breaker)
         """
         return min(
             self.files,
-            key=lambda f: (len(str(f.path)), f.modified_time),
+            key=lambda f: (len(f.path.parts), f.modified_time),
         )
 
     @property
     def extras(self) -> List[FileInfo]:
         """All duplicate files except the primary."""
-        return [f for f in self.files if f.path != self.primary.path] if self.primary else []
+        # The primary is normally one of the listed files, so compare by identity
+        primary = self.primary
+        extras = [f for f in self.files if f is not primary]
+        if len(extras) == len(self.files) and primary is not None:
+            extras = [f for f in self.files if f.path != primary.path]
+        return extras
 
     @property
     def count(self) -> int:
@@ -120,7 +157,7 @@ class DuplicateSet:
         return f"DuplicateSet(hash={self.hash[:8]}..., count={self.count}, primary={self.primary})"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class MoveOperation:
     """A single file move operation."""
 
@@ -140,12 +177,76 @@ class MoveOperation:
         """Whether this operation is for classification."""
         return self.reason == "classify"
 
+    @property
+    def resolved_source(self) -> Path:
+        """Resolved source path, reusing the FileInfo's resolution when it describes the source."""
+        file_info = self.file_info
+        if file_info is not None and file_info.path is self.source:
+            return file_info.resolved_path
+        return self.source.resolve()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert MoveOperation to a JSON-serializable dictionary.
+
+        Returns:
+            Dictionary representation
+        """
+        info = self.file_info
+        return {
+            "source": str(self.source),
+            "destination": str(self.destination),
+            "file_info": (
+                {
+                    "path": str(info.path),
+                    "size_bytes": info.size_bytes,
+                    "hash": info.hash,
+                    "modified_time": info.modified_time,
+                    "is_symlink": info.is_symlink,
+                }
+                if info is not None
+                else None
+            ),
+            "reason": self.reason,
+            "conflict_resolution": self.conflict_resolution.value,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MoveOperation":
+        """
+        Create MoveOperation from a dictionary produced by to_dict.
+
+        Args:
+            data: Dictionary representation
+
+        Returns:
+            MoveOperation instance
+        """
+        info = data["file_info"]
+        return cls(
+            source=Path(data["source"]),
+            destination=Path(data["destination"]),
+            file_info=(
+                FileInfo(
+                    path=Path(info["path"]),
+                    size_bytes=info["size_bytes"],
+                    hash=info["hash"],
+                    modified_time=info["modified_time"],
+                    is_symlink=info["is_symlink"],
+                )
+                if info is not None
+                else None  # type: ignore[arg-type]
+            ),
+            reason=data["reason"],
+            conflict_resolution=ConflictResolution(data["conflict_resolution"]),
+        )
+
     def __repr__(self) -> str:
         """String representation."""
         return f"MoveOperation({self.source} -> {self.destination}, reason={self.reason})"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class DirectoryMoveOperation:
     """A single directory move operation."""
 
@@ -161,7 +262,14 @@ class DirectoryMoveOperation:
 
 @dataclass
 class OrganizationPlan:
-    """Complete plan for organizing a directory."""
+    """
+    Complete plan for organizing a directory.
+
+    When spill_threshold is set, move operations added beyond that many are
+    written to a temporary newline-delimited JSON file instead of being kept in
+    `operations`; use iter_operations() to read every operation, and close() to
+    delete the file once the plan is no longer needed.
+    """
 
     root_dir: Path
     operations: List[MoveOperation] = field(default_factory=list)
@@ -170,11 +278,23 @@ class OrganizationPlan:
     skipped_files: List[Path] = field(default_factory=list)
     errors: List[str] = field(default_factory=list)
     created: datetime = field(default_factory=datetime.now)
+    spill_threshold: Optional[int] = field(default=None, compare=False)
+    _spill_file: Optional[IO[str]] = field(default=None, init=False, repr=False, compare=False)
+    _spilled_count: int = field(default=0, init=False, repr=False, compare=False)
+    # Categories of the spilled operations, which are not kept in memory to scan
+    _spilled_categories: Set[str] = field(
+        default_factory=set, init=False, repr=False, compare=False
+    )
 
     @property
     def total_files(self) -> int:
         """Total number of files to be processed."""
-        return len(self.operations)
+        return len(self.operations) + self._spilled_count
+
+    @property
+    def has_spilled_operations(self) -> bool:
+        """Whether some operations are stored in the spill file rather than in memory."""
+        return self._spilled_count > 0
 
     @property
     def total_duplicates(self) -> int:
@@ -189,7 +309,7 @@ class OrganizationPlan:
     @property
     def categories_used(self) -> Set[str]:
         """Set of categories that will be created."""
-        categories = set()
+        categories = set(self._spilled_categories)
         for op in self.operations:
             if op.destination.parent != self.root_dir:
                 categories.add(op.destination.parent.name)
@@ -197,7 +317,94 @@ class OrganizationPlan:
 
     def add_operation(self, operation: MoveOperation) -> None:
         """Add a move operation to the plan."""
-        self.operations.append(operation)
+        if self.spill_threshold is not None and len(self.operations) >= self.spill_threshold:
+            if self._spill_file is None:
+                # Outlives this call; closed by close() or when operations are replaced
+                self._spill_file = tempfile.TemporaryFile(  # noqa: SIM115
+                    mode="w+", encoding="utf-8"
+                )
+            # A partial pass of iter_operations() may have left the handle mid-file
+            self._spill_file.seek(0, 2)
+            self._spill_file.write(json.dumps(operation.to_dict()) + "\n")
+            self._spilled_count += 1
+            if operation.destination.parent != self.root_dir:
+                self._spilled_categories.add(operation.destination.parent.name)
+        else:
+            self.operations.append(operation)
+
+    def set_operations(self, operations: Iterable[MoveOperation]) -> None:
+        """
+        Replace all move operations, spilling again past spill_threshold.
+
+        The operations may be streamed from this plan's own iter_operations(); the
+        old operations are only discarded once the new ones have all been stored.
+
+        Args:
+            operations: New move operations, in order
+        """
+        replacement = OrganizationPlan(root_dir=self.root_dir, spill_threshold=self.spill_threshold)
+        for op in operations:
+            replacement.add_operation(op)
+
+        self._discard_spill()
+        self.operations = replacement.operations
+        self._spill_file = replacement._spill_file
+        self._spilled_count = replacement._spilled_count
+        self._spilled_categories = replacement._spilled_categories
+
+    def iter_operations(self) -> Iterator[MoveOperation]:
+        """
+        Iterate over every move operation, in memory first and then spilled.
+
+        Spilled operations are rebuilt from disk on every pass and are read-only:
+        changes made to them are lost unless the changed operations are passed back
+        to set_operations().
+
+        Yields:
+            MoveOperation instances in the order they were added
+
+        Raises:
+            ValueError: If the plan was closed while it had spilled operations
+        """
+        if self._spill_file is None and self._spilled_count:
+            raise ValueError("Spilled operations of a closed plan cannot be read")
+
+        yield from self.operations
+        if self._spill_file is None:
+            return
+
+        spill_file = self._spill_file
+        spill_file.flush()
+        spill_file.seek(0)
+        try:
+            for line in spill_file:
+                yield MoveOperation.from_dict(json.loads(line))
+        finally:
+            if not spill_file.closed:
+                spill_file.seek(0, 2)
+
+    def close(self) -> None:
+        """
+        Delete the spill file, if any.
+
+        Totals such as total_files still count the spilled operations, but they can
+        no longer be iterated.
+        """
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _discard_spill(self) -> None:
+        """Close and delete the spill file, if any, forgetting its operations."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        self._spilled_count = 0
+        self._spilled_categories = set()
+
+    def add_duplicate_set(self, duplicate_set: DuplicateSet) -> None:
+        """Add a duplicate set to the plan."""
+        self.duplicate_sets.append(duplicate_set)
 
     def add_directory_operation(self, operation: DirectoryMoveOperation) -> None:
         """Add a directory move operation to the plan."""
@@ -211,7 +418,7 @@ class OrganizationPlan:
         """String representation."""
         return (
             f"OrganizationPlan(root={self.root_dir}, "
-            f"operations={len(self.operations)}, "
+            f"operations={self.total_files}, "
             f"duplicates={self.total_duplicates})"
         )
 
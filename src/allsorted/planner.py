@@ -2,9 +2,13 @@
 Organization plan generation for allsorted.
 """
 
+import io
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from allsorted.analyzer import FileAnalyzer
 from allsorted.classifier import FileClassifier
@@ -25,6 +29,9 @@ logger = logging.getLogger(__name__)
 class OrganizationPlanner:
     """Generates organization plans for directories."""
 
+    # Files handed to each worker thread when classification runs in parallel
+    CLASSIFY_CHUNK_SIZE = 1024
+
     def __init__(self, config: Config):
         """
         Initialize organization planner.
@@ -35,6 +42,8 @@ class OrganizationPlanner:
         self.config = config
         self.analyzer = FileAnalyzer(config)
         self.classifier = FileClassifier(config)
+        # Resolved destination paths, shared by plan creation and optimization of a plan
+        self._resolved_cache: Dict[Path, Path] = {}
 
     def create_plan(
         self,
@@ -55,9 +64,17 @@ class OrganizationPlanner:
             ValueError: If root_dir is invalid
         """
         logger.info(f"Creating organization plan for: {root_dir}")
+        self._resolved_cache.clear()
+
+        # Resolve the root once; every path in the plan is derived from this form,
+        # so later comparisons against plan.root_dir need no further resolving
+        root_dir = root_dir.resolve()
 
         # Initialize plan
-        plan = OrganizationPlan(root_dir=root_dir.resolve())
+        plan = OrganizationPlan(
+            root_dir=root_dir,
+            spill_threshold=self.config.plan_spill_threshold,
+        )
 
         try:
             # Step 1: Analyze directory
@@ -65,26 +82,24 @@ class OrganizationPlanner:
 
             # Step 2: Get duplicate sets
             duplicate_sets = self.analyzer.get_duplicate_sets()
-            plan.duplicate_sets = duplicate_sets
+            for duplicate_set in duplicate_sets:
+                plan.add_duplicate_set(duplicate_set)
 
             # Step 3: Create operations for duplicates
             if self.config.detect_duplicates:
                 self._add_duplicate_operations(plan, duplicate_sets)
 
-            # Step 4: Create operations for unique files
+            # Steps 4-5: Create operations for unique files, then for the primary
+            # files of duplicate sets
             unique_files = self.analyzer.get_unique_files()
-            self._add_classification_operations(plan, unique_files)
-
-            # Step 5: Create operations for primary files from duplicate sets
-            if duplicate_sets:
-                primary_files = [ds.primary for ds in duplicate_sets if ds.primary]
-                self._add_classification_operations(plan, primary_files)
+            primary_files = (ds.primary for ds in duplicate_sets if ds.primary)
+            self._add_classification_operations(plan, chain(unique_files, primary_files))
 
             # Step 6: Create operations for directories
             self._add_directory_operations(plan, self.analyzer.directories)
 
             logger.info(
-                f"Plan created with {len(plan.operations)} file operations, "
+                f"Plan created with {plan.total_files} file operations, "
                 f"{len(plan.directory_operations)} directory operations, "
                 f"{plan.total_duplicates} duplicates found"
             )
@@ -93,6 +108,8 @@ class OrganizationPlanner:
             error_msg = f"Error creating plan: {e}"
             logger.error(error_msg)
             plan.add_error(error_msg)
+        finally:
+            self.classifier.close()
 
         return plan
 
@@ -109,17 +126,22 @@ class OrganizationPlanner:
         if not self.config.isolate_duplicates:
             return
 
+        # Loop invariants, looked up once rather than per file
+        get_destination_path = self.classifier.get_destination_path
+        resolve = self._resolve_cached
+        root_dir = plan.root_dir
+        conflict_resolution = self.config.conflict_resolution
+        add_operation = plan.add_operation
+
         for dup_set in duplicate_sets:
             # Add operations for extra duplicates (not the primary)
             for file_info in dup_set.extras:
-                destination = self.classifier.get_destination_path(
-                    file_info, plan.root_dir, reason="duplicate"
-                )
+                destination = get_destination_path(file_info, root_dir, reason="duplicate")
 
                 # Check if source and destination are the same
-                if file_info.path.resolve() == destination.resolve():
+                if file_info.resolved_path == resolve(destination):
                     logger.debug(
-                        f"Skipping duplicate already in correct location: {file_info.path}"
+                        "Skipping duplicate already in correct location: %s", file_info.path
                     )
                     continue
 
@@ -128,38 +150,94 @@ class OrganizationPlanner:
                     destination=destination,
                     file_info=file_info,
                     reason="duplicate",
-                    conflict_resolution=self.config.conflict_resolution,
+                    conflict_resolution=conflict_resolution,
                 )
 
-                plan.add_operation(operation)
+                add_operation(operation)
 
-    def _add_classification_operations(self, plan: OrganizationPlan, files: List[FileInfo]) -> None:
+    def _add_classification_operations(
+        self, plan: OrganizationPlan, files: Iterable[FileInfo]
+    ) -> None:
         """
         Add classification operations for files to the plan.
 
         Args:
             plan: Organization plan
-            files: List of files to classify
+            files: Files to classify
         """
-        for file_info in files:
-            destination = self.classifier.get_destination_path(
-                file_info, plan.root_dir, reason="classify"
-            )
-
-            # Check if source and destination are the same
-            if file_info.path.resolve() == destination.resolve():
-                logger.debug(f"Skipping file already in correct location: {file_info.path}")
-                continue
+        conflict_resolution = self.config.conflict_resolution
+        add_operation = plan.add_operation
 
+        # Workers only compute destinations; operations are added on this thread
+        for file_info, destination in self._classify_files(files, plan.root_dir):
             operation = MoveOperation(
                 source=file_info.path,
                 destination=destination,
                 file_info=file_info,
                 reason="classify",
-                conflict_resolution=self.config.conflict_resolution,
+                conflict_resolution=conflict_resolution,
             )
 
-            plan.add_operation(operation)
+            add_operation(operation)
+
+    def _classify_files(
+        self, files: Iterable[FileInfo], root_dir: Path
+    ) -> Iterable[Tuple[FileInfo, Path]]:
+        """
+        Compute destinations for files that need to move, in input order.
+
+        Chunks of files are classified on worker threads when parallel
+        processing is enabled.
+
+        Args:
+            files: Files to classify
+            root_dir: Root directory of the plan
+
+        Returns:
+            Iterable of (file, destination) pairs, excluding files already in place
+        """
+        max_workers = max(1, self.config.max_workers) if self.config.parallel_processing else 1
+        if max_workers == 1:
+            return self._classify_chunk(files, root_dir)
+
+        chunk_size = self.CLASSIFY_CHUNK_SIZE
+        file_iter = iter(files)
+        chunks = iter(lambda: list(islice(file_iter, chunk_size)), [])
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(lambda chunk: self._classify_chunk(chunk, root_dir), chunks))
+
+        return chain.from_iterable(results)
+
+    def _classify_chunk(
+        self, files: Iterable[FileInfo], root_dir: Path
+    ) -> List[Tuple[FileInfo, Path]]:
+        """
+        Compute destinations for a chunk of files.
+
+        Args:
+            files: Files to classify
+            root_dir: Root directory of the plan
+
+        Returns:
+            List of (file, destination) pairs, excluding files already in place
+        """
+        # Loop invariants, looked up once rather than per file
+        get_destination_path = self.classifier.get_destination_path
+        resolve = self._resolve_cached
+
+        moves = []
+        for file_info in files:
+            destination = get_destination_path(file_info, root_dir, reason="classify")
+
+            # Check if source and destination are the same
+            if file_info.resolved_path == resolve(destination):
+                logger.debug("Skipping file already in correct location: %s", file_info.path)
+                continue
+
+            moves.append((file_info, destination))
+
+        return moves
 
     def _add_directory_operations(self, plan: OrganizationPlan, directories: List[Path]) -> None:
         """
@@ -174,21 +252,30 @@ class OrganizationPlanner:
 
         folders_dir_name = self.config.get_managed_name(self.config.folders_folder)
         folders_dir = plan.root_dir / folders_dir_name
+        # Directories and folders_dir both derive from root_dir, so comparing their
+        # parts tuples is equivalent to comparing the paths
+        folders_dir_parts = folders_dir.parts
+
+        # Loop invariants, looked up once rather than per directory
+        is_managed_directory = self.config.is_managed_directory
+        special_names = frozenset([self.config.log_directory])
+        conflict_resolution = self.config.conflict_resolution
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
         for directory in directories:
             # Skip if it's a managed directory (created by allsorted)
-            if self.config.is_managed_directory(directory):
-                logger.debug(f"Skipping managed directory: {directory}")
+            if is_managed_directory(directory):
+                logger.debug("Skipping managed directory: %s", directory)
                 continue
 
             # Skip if it's already in the Folders directory
-            if directory.parent == folders_dir:
-                logger.debug(f"Skipping directory already in Folders: {directory}")
+            if directory.parts[:-1] == folders_dir_parts:
+                logger.debug("Skipping directory already in Folders: %s", directory)
                 continue
 
             # Skip special directories
-            if directory.name in [self.config.log_directory]:
-                logger.debug(f"Skipping special directory: {directory}")
+            if directory.name in special_names:
+                logger.debug("Skipping special directory: %s", directory)
                 continue
 
             destination = folders_dir / directory.name
@@ -197,11 +284,12 @@ class OrganizationPlanner:
                 source=directory,
                 destination=destination,
                 reason="organize_folder",
-                conflict_resolution=self.config.conflict_resolution,
+                conflict_resolution=conflict_resolution,
             )
 
             plan.add_directory_operation(operation)
-            logger.debug(f"Added directory operation: {directory} -> {destination}")
+            if debug_enabled:
+                logger.debug("Added directory operation: %s -> %s", directory, destination)
 
     def optimize_plan(self, plan: OrganizationPlan) -> OrganizationPlan:
         """
@@ -215,49 +303,56 @@ class OrganizationPlanner:
         """
         logger.info("Optimizing organization plan...")
 
-        # Track destination paths to detect conflicts
-        destination_map: dict[Path, List[MoveOperation]] = {}
+        # The first operation into each destination keeps it; later ones are renamed
+        # or skipped as they stream past, so a spilled plan is never loaded whole
+        seen_destinations: Set[Path] = set()
+        resolve = self._resolve_cached
 
-        optimized_operations = []
+        def optimized_operations() -> Iterator[MoveOperation]:
+            for op in plan.iter_operations():
+                dest = resolve(op.destination)
 
-        for op in plan.operations:
-            dest = op.destination.resolve()
-
-            # Skip operations where source == destination
-            if op.source.resolve() == dest:
-                logger.debug(f"Removing no-op operation: {op.source}")
-                continue
+                # Skip operations where source == destination (sources were already
+                # resolved on their FileInfo while the plan was built)
+                if op.resolved_source == dest:
+                    logger.debug("Removing no-op operation: %s", op.source)
+                    continue
 
-            # Track destinations
-            if dest not in destination_map:
-                destination_map[dest] = []
-            destination_map[dest].append(op)
+                if dest in seen_destinations:
+                    logger.warning(f"Conflict detected: more than one file wants to move to {dest}")
+                    if op.conflict_resolution == ConflictResolution.RENAME:
+                        new_dest = get_unique_path(op.destination)
+                        op.destination = new_dest
+                        logger.info("Renamed conflicting file: %s -> %s", op.source, new_dest)
+                    elif op.conflict_resolution == ConflictResolution.SKIP:
+                        plan.skipped_files.append(op.source)
+                        logger.info("Skipped conflicting file: %s", op.source)
+                        continue
+                else:
+                    seen_destinations.add(dest)
+
+                yield op
+
+        # Operations changed above are kept, spilled ones included, by storing them anew
+        plan.set_operations(optimized_operations())
+
+        logger.info(f"Plan optimized to {plan.total_files} operations")
+        return plan
 
-            optimized_operations.append(op)
+    def _resolve_cached(self, path: Path) -> Path:
+        """
+        Resolve a path, reusing the result for paths already resolved.
 
-        # Resolve conflicts
-        for dest_path, operations in destination_map.items():
-            if len(operations) > 1:
-                logger.warning(
-                    f"Conflict detected: {len(operations)} files want to move to {dest_path}"
-                )
+        Args:
+            path: Path to resolve
 
-                # Resolve based on conflict resolution strategy
-                for idx, op in enumerate(operations):
-                    if idx > 0:  # Keep first, resolve others
-                        if op.conflict_resolution == ConflictResolution.RENAME:
-                            new_dest = get_unique_path(op.destination)
-                            op.destination = new_dest
-                            logger.info(f"Renamed conflicting file: {op.source} -> {new_dest}")
-                        elif op.conflict_resolution == ConflictResolution.SKIP:
-                            optimized_operations.remove(op)
-                            plan.skipped_files.append(op.source)
-                            logger.info(f"Skipped conflicting file: {op.source}")
-
-        plan.operations = optimized_operations
-
-        logger.info(f"Plan optimized to {len(plan.operations)} operations")
-        return plan
+        Returns:
+            Resolved absolute path
+        """
+        resolved = self._resolved_cache.get(path)
+        if resolved is None:
+            resolved = self._resolved_cache[path] = path.resolve()
+        return resolved
 
     def generate_preview(self, plan: OrganizationPlan, max_items: int = 50) -> str:
         """
@@ -270,51 +365,57 @@ class OrganizationPlanner:
         Returns:
             Preview string
         """
-        lines = [
-            "=" * 80,
-            "ORGANIZATION PLAN PREVIEW",
-            "=" * 80,
-            f"Root Directory: {plan.root_dir}",
-            f"Total Files: {plan.total_files}",
-            f"Duplicate Files: {plan.total_duplicates}",
-            f"Space Recoverable: {plan.space_recoverable / (1024**3):.2f} GB",
-            f"Categories: {', '.join(sorted(plan.categories_used))}",
-            "",
-        ]
+        buf = io.StringIO()
+        write = buf.write
+        rule = "=" * 80
+
+        write(
+            f"{rule}\n"
+            "ORGANIZATION PLAN PREVIEW\n"
+            f"{rule}\n"
+            f"Root Directory: {plan.root_dir}\n"
+            f"Total Files: {plan.total_files}\n"
+            f"Duplicate Files: {plan.total_duplicates}\n"
+            f"Space Recoverable: {plan.space_recoverable / (1024**3):.2f} GB\n"
+            f"Categories: {', '.join(sorted(plan.categories_used))}\n"
+            "\n"
+        )
 
         if plan.errors:
-            lines.append("ERRORS:")
+            write("ERRORS:\n")
             for error in plan.errors:
-                lines.append(f"  ❌ {error}")
-            lines.append("")
+                write(f"  ❌ {error}\n")
+            write("\n")
+
+        # Destinations are shown relative to the root by stripping its string prefix
+        root_prefix = os.path.join(str(plan.root_dir), "")  # noqa: PTH118
+
+        def relative(path: Path) -> str:
+            text = str(path)
+            return text[len(root_prefix) :] if text.startswith(root_prefix) else text
 
-        if plan.operations:
-            lines.append(f"FILE OPERATIONS (showing first {max_items}):")
-            for idx, op in enumerate(plan.operations[:max_items], 1):
+        if plan.total_files:
+            write(f"FILE OPERATIONS (showing first {max_items}):\n")
+            for idx, op in enumerate(islice(plan.iter_operations(), max_items), 1):
                 icon = "📋" if op.is_classification else "🔁"
-                lines.append(f"{idx:3d}. {icon} {op.source.name}")
-                lines.append(f"      -> {op.destination.relative_to(plan.root_dir)}")
+                write(f"{idx:3d}. {icon} {op.source.name}\n      -> {relative(op.destination)}\n")
 
-            if len(plan.operations) > max_items:
-                lines.append(f"      ... and {len(plan.operations) - max_items} more")
+            if plan.total_files > max_items:
+                write(f"      ... and {plan.total_files - max_items} more\n")
 
         if plan.directory_operations:
-            lines.append("")
-            lines.append(f"DIRECTORY OPERATIONS (showing first {max_items}):")
+            write(f"\nDIRECTORY OPERATIONS (showing first {max_items}):\n")
             for idx, op in enumerate(plan.directory_operations[:max_items], 1):
-                lines.append(f"{idx:3d}. 📁 {op.source.name}")
-                lines.append(f"      -> {op.destination.relative_to(plan.root_dir)}")
+                write(f"{idx:3d}. 📁 {op.source.name}\n      -> {relative(op.destination)}\n")
 
             if len(plan.directory_operations) > max_items:
-                lines.append(f"      ... and {len(plan.directory_operations) - max_items} more")
+                write(f"      ... and {len(plan.directory_operations) - max_items} more\n")
 
         if plan.skipped_files:
-            lines.append("")
-            lines.append("SKIPPED FILES:")
+            write("\nSKIPPED FILES:\n")
             for skipped in plan.skipped_files[:max_items]:
-                lines.append(f"  ⊘ {skipped}")
+                write(f"  ⊘ {skipped}\n")
 
-        lines.append("")
-        lines.append("=" * 80)
+        write(f"\n{rule}")
 
-        return "\n".join(lines)
+        return buf.getvalue()
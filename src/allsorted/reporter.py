@@ -4,19 +4,71 @@ Report generation for allsorted operations.
 
 import json
 import logging
+from collections import Counter
+from collections.abc import Iterator
 from datetime import datetime
+from operator import attrgetter
 from pathlib import Path
-from typing import Optional
+from typing import IO, Any, Optional
 
 from rich.console import Console
 from rich.table import Table
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from allsorted.models import OrganizationResult
 from allsorted.utils import format_duration, format_size
 
 logger = logging.getLogger(__name__)
 
 
+def _dumps(value: Any) -> str:
+    """Serialize a JSON value compactly, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value)
+
+
+def _write_json(f: IO[str], value: Any, indent: str = "") -> None:
+    """
+    Write a value as indented JSON without serializing it all in memory first.
+
+    Dicts are written key by key. Lists and iterators are streamed one item per
+    line, with each item serialized compactly in a single call.
+
+    Args:
+        f: Text file to write to
+        value: JSON-compatible value (iterators are written as arrays)
+        indent: Indentation of the current nesting level
+    """
+    inner = indent + "  "
+    if isinstance(value, dict):
+        if not value:
+            f.write("{}")
+            return
+        separator = "\n"
+        f.write("{")
+        for key, item in value.items():
+            f.write(f"{separator}{inner}{_dumps(key)}: ")
+            _write_json(f, item, inner)
+            separator = ",\n"
+        f.write(f"\n{indent}}}")
+    elif isinstance(value, (list, Iterator)):
+        separator = "\n"
+        f.write("[")
+        for item in value:
+            f.write(f"{separator}{inner}{_dumps(item)}")
+            separator = ",\n"
+        f.write("]" if separator == "\n" else f"\n{indent}]")
+    else:
+        f.write(_dumps(value))
+
+
 class Reporter:
     """Generates reports and summaries of organization operations."""
 
@@ -72,10 +124,13 @@ class Reporter:
         # Print errors if any
         if result.failed_operations:
             self.console.print("\n[bold red]Errors:[/bold red]")
-            for op, error in result.failed_operations[:10]:  # Show first 10 errors
-                self.console.print(f"  ❌ {op.source.name}: {error}")
+            # Show the first 10 errors; filenames and messages are printed without markup
+            lines = [
+                f"  ❌ {op.source.name}: {error}" for op, error in result.failed_operations[:10]
+            ]
             if len(result.failed_operations) > 10:
-                self.console.print(f"  ... and {len(result.failed_operations) - 10} more errors")
+                lines.append(f"  ... and {len(result.failed_operations) - 10} more errors")
+            self.console.print("\n".join(lines), markup=False)
 
     def print_statistics(self, result: OrganizationResult) -> None:
         """
@@ -85,16 +140,18 @@ class Reporter:
             result: Organization result
         """
         plan = result.plan
+        operations = result.successful_operations
 
         # Calculate statistics
-        total_size = sum(op.file_info.size_bytes for op in result.successful_operations)
+        total_size = sum(map(attrgetter("file_info.size_bytes"), operations))
 
         # Count by category
-        category_counts: dict[str, int] = {}
-        for op in result.successful_operations:
-            if op.destination.parent != plan.root_dir:
-                category = op.destination.parent.name
-                category_counts[category] = category_counts.get(category, 0) + 1
+        root_dir = plan.root_dir
+        category_counts = Counter(
+            parent.name
+            for parent in map(attrgetter("destination.parent"), operations)
+            if parent != root_dir
+        )
 
         # Create statistics table
         table = Table(title="Statistics", show_header=True)
@@ -102,9 +159,8 @@ class Reporter:
         table.add_column("Files", justify="right", style="yellow")
         table.add_column("Percentage", justify="right", style="green")
 
-        total_files = len(result.successful_operations)
-        for category in sorted(category_counts.keys()):
-            count = category_counts[category]
+        total_files = len(operations)
+        for category, count in sorted(category_counts.items()):
             percentage = (count / total_files * 100) if total_files > 0 else 0
             table.add_row(category, str(count), f"{percentage:.1f}%")
 
@@ -134,6 +190,7 @@ class Reporter:
 
         plan = result.plan
 
+        # Large sections are generators, streamed to the file item by item
         report_data = {
             "version": "1.0",
             "generated_at": datetime.now().isoformat(),
@@ -150,7 +207,7 @@ class Reporter:
                 "sets_found": len(plan.duplicate_sets),
                 "total_duplicates": plan.total_duplicates,
                 "space_recoverable_bytes": plan.space_recoverable,
-                "duplicate_sets": [
+                "duplicate_sets": (
                     {
                         "hash": ds.hash,
                         "count": ds.count,
@@ -159,10 +216,10 @@ class Reporter:
                         "extras": [str(f.path) for f in ds.extras],
                     }
                     for ds in plan.duplicate_sets
-                ],
+                ),
             },
             "operations": {
-                "successful": [
+                "successful": (
                     {
                         "source": str(op.source),
                         "destination": str(op.destination),
@@ -170,15 +227,15 @@ class Reporter:
                         "size_bytes": op.file_info.size_bytes,
                     }
                     for op in result.successful_operations
-                ],
-                "failed": [
+                ),
+                "failed": (
                     {
                         "source": str(op.source),
                         "destination": str(op.destination),
                         "error": error,
                     }
                     for op, error in result.failed_operations
-                ],
+                ),
             },
             "directories": {
                 "created": [str(d) for d in result.directories_created],
@@ -188,8 +245,9 @@ class Reporter:
         }
 
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "w") as f:
-            json.dump(report_data, f, indent=2)
+        with open(output_path, "w", encoding="utf-8") as f:
+            _write_json(f, report_data)
+            f.write("\n")
 
         logger.info(f"JSON report saved: {output_path}")
 
@@ -207,72 +265,55 @@ class Reporter:
         logger.info(f"Saving text report to: {output_path}")
 
         plan = result.plan
+        rule = "=" * 80
+        divider = "-" * 80
 
-        lines = [
-            "=" * 80,
-            "ALLSORTED ORGANIZATION REPORT",
-            "=" * 80,
-            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            f"Root Directory: {plan.root_dir}",
-            f"Mode: {'DRY RUN' if result.dry_run else 'EXECUTE'}",
-            "",
-            "SUMMARY",
-            "-" * 80,
-            f"Total Operations: {plan.total_files}",
-            f"Successful: {result.files_moved}",
-            f"Failed: {result.files_failed}",
-            f"Success Rate: {result.success_rate:.1f}%",
-            f"Duration: {format_duration(result.duration_seconds)}",
-            "",
-        ]
-
-        if plan.duplicate_sets:
-            lines.extend(
-                [
-                    "DUPLICATES",
-                    "-" * 80,
-                    f"Duplicate Sets: {len(plan.duplicate_sets)}",
-                    f"Duplicate Files: {plan.total_duplicates}",
-                    f"Space Recoverable: {format_size(plan.space_recoverable)}",
-                    "",
-                ]
-            )
-
-        if result.directories_created:
-            lines.extend(
-                [
-                    "DIRECTORIES CREATED",
-                    "-" * 80,
-                ]
-            )
-            for directory in result.directories_created[:50]:
-                lines.append(f"  + {directory}")
-            if len(result.directories_created) > 50:
-                lines.append(f"  ... and {len(result.directories_created) - 50} more")
-            lines.append("")
-
-        if result.failed_operations:
-            lines.extend(
-                [
-                    "ERRORS",
-                    "-" * 80,
-                ]
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Sections are written straight to the file rather than collected first
+        with open(output_path, "w", encoding="utf-8", buffering=1 << 20) as f:
+            write = f.write
+            write(
+                f"{rule}\n"
+                "ALLSORTED ORGANIZATION REPORT\n"
+                f"{rule}\n"
+                f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+                f"Root Directory: {plan.root_dir}\n"
+                f"Mode: {'DRY RUN' if result.dry_run else 'EXECUTE'}\n"
+                "\n"
+                "SUMMARY\n"
+                f"{divider}\n"
+                f"Total Operations: {plan.total_files}\n"
+                f"Successful: {result.files_moved}\n"
+                f"Failed: {result.files_failed}\n"
+                f"Success Rate: {result.success_rate:.1f}%\n"
+                f"Duration: {format_duration(result.duration_seconds)}\n"
+                "\n"
             )
-            for op, error in result.failed_operations:
-                lines.append(f"  ❌ {op.source}")
-                lines.append(f"     Error: {error}")
-            lines.append("")
-
-        lines.extend(
-            [
-                "=" * 80,
-                "END OF REPORT",
-                "=" * 80,
-            ]
-        )
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(output_path, "w") as f:
-            f.write("\n".join(lines))
+            if plan.duplicate_sets:
+                write(
+                    "DUPLICATES\n"
+                    f"{divider}\n"
+                    f"Duplicate Sets: {len(plan.duplicate_sets)}\n"
+                    f"Duplicate Files: {plan.total_duplicates}\n"
+                    f"Space Recoverable: {format_size(plan.space_recoverable)}\n"
+                    "\n"
+                )
+
+            if result.directories_created:
+                write(f"DIRECTORIES CREATED\n{divider}\n")
+                for directory in result.directories_created[:50]:
+                    write(f"  + {directory}\n")
+                if len(result.directories_created) > 50:
+                    write(f"  ... and {len(result.directories_created) - 50} more\n")
+                write("\n")
+
+            if result.failed_operations:
+                write(f"ERRORS\n{divider}\n")
+                for op, error in result.failed_operations:
+                    write(f"  ❌ {op.source}\n     Error: {error}\n")
+                write("\n")
+
+            write(f"{rule}\nEND OF REPORT\n{rule}")
 
         logger.info(f"Text report saved: {output_path}")
@@ -2,9 +2,19 @@
 Utility functions for allsorted.
 """
 
+import fnmatch
 import os
-from pathlib import Path
-from typing import Optional
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path, PurePath
+from typing import Callable, Dict, Optional, Pattern, Tuple
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+# Line breaks and tabs become underscores; every other control character is removed
+_SANITIZE_TABLE: Dict[int, Optional[int]] = dict.fromkeys(range(32))
+_SANITIZE_TABLE.update({ord("\n"): ord("_"), ord("\r"): ord("_"), ord("\t"): ord("_")})
 
 
 def format_size(bytes_count: int) -> str:
@@ -17,11 +27,11 @@ def format_size(bytes_count: int) -> str:
     Returns:
         Formatted string (e.g., "1.5 MB", "3.2 GB")
     """
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if bytes_count < 1024.0:
-            return f"{bytes_count:.1f} {unit}"
-        bytes_count /= 1024.0
-    return f"{bytes_count:.1f} PB"
+    if bytes_count < 1024:
+        return f"{bytes_count:.1f} B"
+    # Each unit is 2**10 times the previous one, so the bit length picks the unit
+    idx = min((int(bytes_count).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{bytes_count / (1 << (idx * 10)):.1f} {_SIZE_UNITS[idx]}"
 
 
 def format_duration(seconds: float) -> str:
@@ -61,8 +71,9 @@ def safe_path_resolve(path: Path, base_dir: Optional[Path] = None) -> Path:
         ValueError: If path contains suspicious patterns or escapes base directory
     """
     try:
-        # Resolve the path fully
+        # Resolve the path fully, and the base directory once for both checks below
         resolved = path.resolve(strict=False)
+        base_resolved = base_dir.resolve() if base_dir else None
 
         # If symlink, validate the target
         if path.is_symlink():
@@ -71,15 +82,14 @@ def safe_path_resolve(path: Path, base_dir: Optional[Path] = None) -> Path:
                 target = path.readlink()
                 if target.is_absolute():
                     # Absolute symlinks must point within base_dir
-                    if base_dir and not str(target).startswith(str(base_dir.resolve())):
+                    if base_resolved and not str(target).startswith(str(base_resolved)):
                         raise ValueError(f"Symlink points outside base directory: {path}")
             except (OSError, RuntimeError) as e:
                 raise ValueError(f"Invalid symlink: {path}") from e
 
         # Validate against base directory if provided
-        if base_dir:
+        if base_resolved:
             try:
-                base_resolved = base_dir.resolve()
                 resolved.relative_to(base_resolved)
             except ValueError:
                 raise ValueError(
@@ -101,22 +111,22 @@ def sanitize_filename(filename: str) -> str:
     Returns:
         Sanitized filename safe for logging and filesystem operations
     """
-    # First, replace problematic characters
-    replacements = {
-        "\n": "_",
-        "\r": "_",
-        "\t": "_",
-        "\x00": "",
-    }
+    return filename.translate(_SANITIZE_TABLE)
 
-    sanitized = filename
-    for old, new in replacements.items():
-        sanitized = sanitized.replace(old, new)
 
-    # Then remove any remaining control characters
-    sanitized = "".join(char for char in sanitized if ord(char) >= 32 or char in ("\t",))
+# GetFileAttributesW on Windows, looked up once at import; None elsewhere
+_get_file_attributes: Optional[Callable[[str], int]] = None
+# Checked through sys.platform so type checkers skip the Windows-only ctypes.windll
+if sys.platform == "win32":
+    try:
+        import ctypes
+
+        _get_file_attributes = ctypes.windll.kernel32.GetFileAttributesW
+    except (AttributeError, OSError):
+        pass
 
-    return sanitized
+_FILE_ATTRIBUTE_HIDDEN = 2
+_INVALID_FILE_ATTRIBUTES = -1
 
 
 def is_hidden(path: Path) -> bool:
@@ -134,18 +144,57 @@ def is_hidden(path: Path) -> bool:
         return True
 
     # Windows hidden attribute
-    if os.name == "nt":
+    if _get_file_attributes is not None:
         try:
-            import ctypes
-
-            attrs = ctypes.windll.kernel32.GetFileAttributesW(str(path))
-            return bool(attrs & 2)  # FILE_ATTRIBUTE_HIDDEN = 2
-        except (AttributeError, OSError):
-            pass
+            attrs = _get_file_attributes(str(path))
+        except OSError:
+            return False
+        return attrs != _INVALID_FILE_ATTRIBUTES and bool(attrs & _FILE_ATTRIBUTE_HIDDEN)
 
     return False
 
 
+@lru_cache(maxsize=32)
+def compile_ignore_patterns(
+    patterns: Tuple[str, ...],
+) -> Tuple[Optional[Pattern[str]], Optional[Pattern[str]]]:
+    """
+    Combine glob ignore patterns into regular expressions.
+
+    Like Path.match, relative patterns match the end of a path and absolute patterns
+    the whole path, except that '*' and '**' may span directories. Relative patterns
+    are meant to be searched in paths relative to the scanned root, so that the
+    directories above it never match, and absolute patterns in absolute paths. Paths
+    are searched in '/'-separated form (Path.as_posix()).
+
+    Args:
+        patterns: Glob patterns
+
+    Returns:
+        Tuple of (expression for the relative patterns, expression for the absolute
+        patterns), each None if there are no patterns of that kind
+    """
+    relative = []
+    absolute = []
+    for pattern in patterns:
+        if os.name == "nt":
+            pattern = pattern.replace("\\", "/")
+        if PurePath(pattern).is_absolute() or pattern.startswith("/"):
+            absolute.append(f"^{fnmatch.translate(pattern)}")
+        else:
+            # The anchor already allows any number of leading directories
+            if pattern.startswith("**/"):
+                pattern = pattern[3:]
+            relative.append(f"(?:^|/){fnmatch.translate(pattern)}")
+
+    # Windows paths compare case-insensitively, as in Path.match
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    return (
+        re.compile("|".join(relative), flags) if relative else None,
+        re.compile("|".join(absolute), flags) if absolute else None,
+    )
+
+
 def ensure_dir(path: Path) -> None:
     """
     Ensure a directory exists, creating it and parents if necessary.
@@ -175,17 +224,32 @@ def get_unique_path(path: Path) -> Path:
     if not path.exists():
         return path
 
-    counter = 1
+    # Probe with plain strings; only the final answer is turned back into a Path
     stem = path.stem
     suffix = path.suffix
-    parent = path.parent
+    parent = str(path.parent)
+    join = os.path.join
+    exists = os.path.exists
+
+    def candidate(counter: int) -> str:
+        return join(parent, f"{stem}_{counter}{suffix}")
 
-    while True:
-        new_name = f"{stem}_{counter}{suffix}"
-        new_path = parent / new_name
-        if not new_path.exists():
-            return new_path
-        counter += 1
+    # Double the counter until a free name is found, then binary search below it
+    # for the first free one. Needs O(log n) stat calls when names 1..n are taken;
+    # with gaps in the numbering it may return a later free name than the lowest.
+    low, high = 1, 1
+    while exists(candidate(high)):
+        low = high + 1
+        high *= 2
+
+    while low < high:
+        mid = (low + high) // 2
+        if exists(candidate(mid)):
+            low = mid + 1
+        else:
+            high = mid
+
+    return Path(candidate(high))
 
 
 def calculate_directory_size(directory: Path) -> int:
@@ -199,15 +263,22 @@ def calculate_directory_size(directory: Path) -> int:
         Total size in bytes
     """
     total = 0
-    try:
-        for entry in directory.rglob("*"):
-            if entry.is_file():
-                try:
-                    total += entry.stat().st_size
-                except OSError:
-                    pass  # Skip files we can't access
-    except OSError:
-        pass  # Directory might be inaccessible
+    # DirEntry type checks use the directory listing itself, so only files cost a stat
+    stack = [os.fspath(directory)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass  # Skip files we can't access
+        except OSError:
+            pass  # Directory might be inaccessible
 
     return total
 
@@ -240,11 +311,30 @@ def is_same_filesystem(path1: Path, path2: Path) -> bool:
         True if on same filesystem, False otherwise
     """
     try:
-        return path1.stat().st_dev == path2.stat().st_dev
+        return _device_id(path1.absolute()) == _device_id(path2.absolute())
     except OSError:
         return False
 
 
+@lru_cache(maxsize=4096)
+def _device_id(path: Path) -> int:
+    """
+    Get the device ID of a path, stat-ing each absolute path only once.
+
+    Args:
+        path: Absolute path
+
+    Returns:
+        Device ID (st_dev) of the filesystem holding the path
+    """
+    return path.stat().st_dev
+
+
+def clear_filesystem_cache() -> None:
+    """Forget cached device IDs, e.g. after filesystems are mounted or unmounted."""
+    _device_id.cache_clear()
+
+
 def truncate_path(path: Path, max_length: int = 80) -> str:
     """
     Truncate a path string to fit within max_length by abbreviating middle parts.
@@ -3,8 +3,13 @@ Validation and safety checks for allsorted operations.
 """
 
 import logging
+import os
+import stat
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from allsorted.models import MoveOperation, OrganizationPlan
 from allsorted.utils import get_available_space
@@ -21,6 +26,9 @@ class ValidationError(Exception):
 class OperationValidator:
     """Validates operations before execution for safety."""
 
+    # Upper bound on threads checking destination directories for write permission
+    MAX_PERMISSION_WORKERS = 32
+
     def __init__(self, plan: OrganizationPlan):
         """
         Initialize validator.
@@ -31,6 +39,13 @@ class OperationValidator:
         self.plan = plan
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        # Resolved destination paths and stat results, shared by the checks of one
+        # validation run so each path is resolved and stat-ed at most once
+        self._resolved_destinations: Dict[Path, str] = {}
+        self._stat_cache: Dict[str, Optional[os.stat_result]] = {}
+        # Total size, destination directories and source directories of the
+        # plan's operations
+        self._operation_summary: Optional[Tuple[int, Set[str], Set[str]]] = None
 
     def validate_all(self) -> Tuple[bool, List[str], List[str]]:
         """
@@ -41,6 +56,9 @@ class OperationValidator:
         """
         self.errors.clear()
         self.warnings.clear()
+        self._resolved_destinations.clear()
+        self._stat_cache.clear()
+        self._operation_summary = None
 
         # Run all validation checks
         self._validate_root_directory()
@@ -55,11 +73,12 @@ class OperationValidator:
 
     def _validate_root_directory(self) -> None:
         """Validate that root directory exists and is accessible."""
-        if not self.plan.root_dir.exists():
+        root_stat = self._stat(self.plan.root_dir)
+        if root_stat is None:
             self.errors.append(f"Root directory does not exist: {self.plan.root_dir}")
             return
 
-        if not self.plan.root_dir.is_dir():
+        if not stat.S_ISDIR(root_stat.st_mode):
             self.errors.append(f"Root path is not a directory: {self.plan.root_dir}")
             return
 
@@ -73,7 +92,11 @@ class OperationValidator:
 
     def _validate_disk_space(self) -> None:
         """Validate sufficient disk space for operations."""
-        if not self.plan.operations:
+        if not self.plan.total_files:
+            return
+
+        # Moves within one filesystem are renames and need no free space
+        if self._moves_stay_on_root_device():
             return
 
         try:
@@ -103,32 +126,109 @@ class OperationValidator:
         Returns:
             Estimated bytes needed (conservative estimate)
         """
-        # For moves on same filesystem, no extra space needed
-        # For moves across filesystems, need space for all files
-        # We'll assume worst case (different filesystem) and add 10% buffer
+        # Only called when some move may leave the root's filesystem; we'll
+        # assume worst case (different filesystem) and add 10% buffer
 
-        total_size = sum(op.file_info.size_bytes for op in self.plan.operations)
+        total_size, _, _ = self._summarize_operations()
         return int(total_size * 0.1)  # 10% buffer for metadata and safety
 
     def _validate_permissions(self) -> None:
         """Validate write permissions for all destination directories."""
-        # Get unique destination directories
-        dest_dirs = {op.destination.parent for op in self.plan.operations}
-
+        # Get unique destination directories; they were deduplicated as strings, so
+        # only one Path is built per directory rather than a parent Path per operation
+        _, dest_dir_names, _ = self._summarize_operations()
+        dest_dirs = {Path(dest_dir) for dest_dir in dest_dir_names}
+
+        # Pick the directory to probe for each destination: the directory itself if
+        # it exists, otherwise its nearest existing ancestor
+        checks: List[Tuple[Path, str, Path]] = []
+        exists = self._exists
         for dest_dir in dest_dirs:
             # Check if directory exists
-            if dest_dir.exists():
-                # Check write permission
-                if not self._check_write_permission(dest_dir):
-                    self.errors.append(f"No write permission for directory: {dest_dir}")
+            if exists(dest_dir):
+                checks.append((dest_dir, "No write permission for directory", dest_dir))
             else:
                 # Check if we can create it (check parent permission)
                 parent = dest_dir.parent
-                while not parent.exists() and parent != parent.parent:
+                while not exists(parent) and parent != parent.parent:
                     parent = parent.parent
 
-                if parent.exists() and not self._check_write_permission(parent):
-                    self.errors.append(f"No permission to create directory: {dest_dir}")
+                if exists(parent):
+                    checks.append((parent, "No permission to create directory", dest_dir))
+
+        # Check each directory once, overlapping the checks on worker threads
+        probe_dirs = list({probe_dir for probe_dir, _, _ in checks})
+        if len(probe_dirs) > 1:
+            workers = min(self.MAX_PERMISSION_WORKERS, len(probe_dirs))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self._check_write_permission, probe_dirs))
+        else:
+            results = [self._check_write_permission(probe_dir) for probe_dir in probe_dirs]
+        writable = dict(zip(probe_dirs, results))
+
+        for probe_dir, problem, dest_dir in checks:
+            if not writable[probe_dir]:
+                self.errors.append(f"{problem}: {dest_dir}")
+
+    def _summarize_operations(self) -> Tuple[int, Set[str], Set[str]]:
+        """
+        Collect the total size, destination directories and source directories of
+        all operations.
+
+        All are gathered in one pass over the operations and reused for the rest of
+        the validation run, so a spilled plan is read back once for them.
+
+        Returns:
+            Tuple of (total bytes to move, destination directory strings,
+            source directory strings)
+        """
+        if self._operation_summary is None:
+            total_size = 0
+            dest_dirs: Set[str] = set()
+            source_dirs: Set[str] = set()
+            add_dest_dir = dest_dirs.add
+            add_source_dir = source_dirs.add
+            dirname = os.path.dirname
+
+            for op in self.plan.iter_operations():
+                total_size += op.file_info.size_bytes
+                add_dest_dir(dirname(str(op.destination)))
+                add_source_dir(dirname(str(op.source)))
+
+            self._operation_summary = (total_size, dest_dirs, source_dirs)
+
+        return self._operation_summary
+
+    def _moves_stay_on_root_device(self) -> bool:
+        """
+        Check whether every operation moves a file within the root's filesystem.
+
+        Devices are compared per source and destination directory rather than per
+        file, using the nearest existing ancestor of destinations not created yet.
+
+        Returns:
+            True if all source and destination directories share the root's device
+        """
+        root_stat = self._stat(self.plan.root_dir)
+        if root_stat is None:
+            return False
+
+        root_device = root_stat.st_dev
+        _, dest_dirs, source_dirs = self._summarize_operations()
+        for directory in chain(source_dirs, dest_dirs):
+            dir_stat = self._stat(directory)
+            while dir_stat is None:
+                # Directories are summarized as strings, so walk up without Path objects
+                parent = os.path.dirname(directory)  # noqa: PTH120
+                if parent == directory:
+                    return False
+                directory = parent
+                dir_stat = self._stat(directory)
+
+            if dir_stat.st_dev != root_device:
+                return False
+
+        return True
 
     def _check_write_permission(self, directory: Path) -> bool:
         """
@@ -140,74 +240,183 @@ class OperationValidator:
         Returns:
             True if writable
         """
+        # access() answers with one syscall; a denial is confirmed by creating a
+        # file, since ACLs and some network filesystems can make access() too strict
+        if os.access(directory, os.W_OK | os.X_OK):
+            return True
+
         try:
-            # Try to create a temporary file
-            test_file = directory / ".allsorted_test_write"
-            test_file.touch()
+            # Try to create a uniquely named temporary file
+            test_file = directory / f".allsorted_test_write.{uuid.uuid4().hex}"
+            fd = os.open(test_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600)
+            os.close(fd)
             test_file.unlink()
             return True
-        except (PermissionError, OSError):
+        except OSError:
             return False
 
     def _validate_no_circular_dependencies(self) -> None:
-        """Validate no operation moves a file to a subdirectory of itself."""
-        for op in self.plan.operations:
-            source_resolved = op.source.resolve()
-            dest_resolved = op.destination.resolve()
-
-            # Check if destination is under source
-            try:
-                dest_resolved.relative_to(source_resolved)
+        """
+        Validate no operation moves a file to a subdirectory of itself, and warn about
+        operations whose moves form a cycle (e.g. two files swapping places).
+        """
+        # Each source moves to one destination, so the moves form a graph with at
+        # most one outgoing edge per node
+        next_path: Dict[str, str] = {}
+        resolve_destination = self._resolve_destination
+        sep = os.sep
+
+        for op in self.plan.iter_operations():
+            # Resolved paths are compared as strings
+            source_path = op.resolved_source
+            source_resolved = str(source_path)
+            dest_resolved = resolve_destination(op.destination)
+
+            # Check if destination is (or is under) source
+            if dest_resolved == source_resolved or dest_resolved.startswith(
+                source_resolved.rstrip(sep) + sep
+            ):
                 self.errors.append(
                     f"Circular dependency detected: "
                     f"Cannot move {source_resolved} into its own subdirectory"
                 )
-            except ValueError:
-                # relative_to raises ValueError if not relative - that's good
-                pass
+
+            if dest_resolved != source_resolved:
+                next_path[source_resolved] = dest_resolved
 
             # Check for symlink loops
             if op.file_info.is_symlink:
                 try:
                     # Resolve symlink fully
-                    _ = source_resolved.resolve(strict=True)
+                    _ = source_path.resolve(strict=True)
                 except (RuntimeError, OSError):
                     self.warnings.append(f"Potential symlink loop detected: {op.source}")
 
+        self._warn_about_move_cycles(next_path)
+
+    def _warn_about_move_cycles(self, next_path: Dict[str, str]) -> None:
+        """
+        Warn about each cycle of moves once, in a single pass over the move graph.
+
+        Walks share one visited map, so every path is visited once overall. Each
+        cycle is reported starting from its smallest path, so it is reported once.
+
+        Args:
+            next_path: Resolved source path -> resolved destination path
+        """
+        on_walk, done = 1, 2
+        state: Dict[str, int] = {}
+
+        for start in next_path:
+            if start in state:
+                continue
+
+            walk: List[str] = []
+            node = start
+            while node in next_path and node not in state:
+                state[node] = on_walk
+                walk.append(node)
+                node = next_path[node]
+
+            # Reaching a path from this same walk closes a cycle
+            if state.get(node) == on_walk:
+                cycle = walk[walk.index(node) :]
+                first = cycle.index(min(cycle))
+                cycle = cycle[first:] + cycle[:first]
+                self.warnings.append(
+                    f"Moves form a cycle and will be resolved by renaming: "
+                    f"{' -> '.join(cycle + cycle[:1])}"
+                )
+
+            for node in walk:
+                state[node] = done
+
     def _validate_no_overwrites(self) -> None:
         """Validate that no operation will overwrite an existing file unexpectedly."""
-        # Track destination paths to detect conflicts within the plan
-        destinations: dict[Path, MoveOperation] = {}
+        # First operation targeting each resolved destination within the plan
+        first_by_destination: Dict[str, MoveOperation] = {}
+        resolve_destination = self._resolve_destination
 
-        for op in self.plan.operations:
-            dest = op.destination.resolve()
+        for op in self.plan.iter_operations():
+            dest = resolve_destination(op.destination)
 
             # Check if destination exists and is not the source
-            if dest.exists() and dest != op.source.resolve():
+            if self._exists(dest) and dest != str(op.resolved_source):
                 self.warnings.append(
                     f"File will be renamed due to existing file: "
                     f"{op.destination} (resolution: {op.conflict_resolution.value})"
                 )
 
             # Check for conflicts within the plan itself
-            if dest in destinations:
-                previous_op = destinations[dest]
+            previous_op = first_by_destination.setdefault(dest, op)
+            if previous_op is not op:
                 self.errors.append(
                     f"Multiple operations target same destination: {dest}\n"
                     f"  Source 1: {previous_op.source}\n"
                     f"  Source 2: {op.source}"
                 )
-            else:
-                destinations[dest] = op
+
+    def _resolve_destination(self, destination: Path) -> str:
+        """
+        Resolve a destination path, reusing the result for paths already resolved.
+
+        Args:
+            destination: Destination path to resolve
+
+        Returns:
+            Resolved absolute path, as a string
+        """
+        resolved = self._resolved_destinations.get(destination)
+        if resolved is None:
+            resolved = os.path.realpath(destination)
+            self._resolved_destinations[destination] = resolved
+        return resolved
 
     def _validate_source_files_exist(self) -> None:
         """Validate that all source files exist."""
-        for op in self.plan.operations:
-            if not op.source.exists():
+        for op in self.plan.iter_operations():
+            source_stat = self._stat(op.source)
+            if source_stat is None:
                 self.errors.append(f"Source file does not exist: {op.source}")
-            elif not op.source.is_file():
+            elif not stat.S_ISREG(source_stat.st_mode):
                 self.errors.append(f"Source is not a file: {op.source}")
 
+    def _stat(self, path: Union[str, Path]) -> Optional[os.stat_result]:
+        """
+        Stat a path (following symlinks), reusing results within a validation run.
+
+        Args:
+            path: Path to stat
+
+        Returns:
+            Stat result, or None if the path cannot be stat-ed
+        """
+        key = str(path)
+        try:
+            return self._stat_cache[key]
+        except KeyError:
+            pass
+
+        result: Optional[os.stat_result]
+        try:
+            result = os.stat(key)  # noqa: PTH116
+        except (OSError, ValueError):
+            result = None
+        self._stat_cache[key] = result
+        return result
+
+    def _exists(self, path: Union[str, Path]) -> bool:
+        """
+        Check whether a path exists, using the validation run's stat cache.
+
+        Args:
+            path: Path to check
+
+        Returns:
+            True if the path exists
+        """
+        return self._stat(path) is not None
+
     def get_summary(self) -> str:
         """
         Get a summary of validation results.
@@ -216,7 +425,7 @@ class OperationValidator:
             Human-readable summary string
         """
         lines = ["Validation Summary:"]
-        lines.append(f"  Total operations: {len(self.plan.operations)}")
+        lines.append(f"  Total operations: {self.plan.total_files}")
         lines.append(f"  Errors: {len(self.errors)}")
         lines.append(f"  Warnings: {len(self.warnings)}")
 
@@ -9,21 +9,39 @@ Dependencies:
     - watchdog (Apache-2.0 License) by Yesudeep Mangalapilly
 """
 
+import os
+import queue
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 try:
-    from watchdog.events import FileCreatedEvent, FileModifiedEvent, FileSystemEventHandler
+    from watchdog.events import (
+        FileCreatedEvent,
+        FileModifiedEvent,
+        FileSystemEvent,
+        FileSystemEventHandler,
+    )
     from watchdog.observers import Observer
 
     WATCHDOG_AVAILABLE = True
 except ImportError:
     WATCHDOG_AVAILABLE = False
 
+try:
+    import fcntl
+
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+from allsorted.analyzer import FileAnalyzer
 from allsorted.config import Config
 from allsorted.executor import OrganizationExecutor
 from allsorted.logging_config import get_logger
+from allsorted.models import FileInfo, OrganizationPlan
 from allsorted.planner import OrganizationPlanner
 
 logger = get_logger(__name__)
@@ -32,6 +50,12 @@ logger = get_logger(__name__)
 class FileOrganizeHandler(FileSystemEventHandler):  # type: ignore[misc]
     """Handles file system events and triggers organization."""
 
+    # Bounds on the recently processed files remembered to ignore repeat events
+    RECENT_MAX_ENTRIES = 4096
+    RECENT_TTL_SECONDS = 60.0
+    # Most files organized by one plan when many go quiet at once
+    BATCH_SIZE = 64
+
     def __init__(
         self,
         root_dir: Path,
@@ -49,116 +73,301 @@ class FileOrganizeHandler(FileSystemEventHandler):  # type: ignore[misc]
         self.root_dir = root_dir
         self.config = config
         self.organize_callback = organize_callback
+        self.analyzer = FileAnalyzer(config)
         self.planner = OrganizationPlanner(config)
         self.executor = OrganizationExecutor(dry_run=False, log_operations=True)
 
-        # Track recently processed files to avoid duplicates
-        self.recently_processed: set[str] = set()
-        self.process_delay = 2.0  # Wait 2 seconds after file creation before processing
+        # Recently processed files by (st_dev, st_ino), oldest first, to skip repeat
+        # events; bounded by RECENT_MAX_ENTRIES and RECENT_TTL_SECONDS
+        self.recently_processed: OrderedDict[Tuple[int, int], float] = OrderedDict()
+        # String forms for the per-event managed directory check, which only looks
+        # at path components below the watched root
+        self._root_prefix = os.path.join(str(root_dir), "")  # noqa: PTH118
+        self._managed_prefix = config.directory_prefix
+        self._managed_component = os.sep + config.directory_prefix
+
+        # Quiet period after a file's last event before it is processed
+        self.process_delay = 2.0
+
+        # Events are queued by the observer thread and debounced by a worker thread
+        self._events: queue.Queue[Optional[Tuple[Path, bool]]] = queue.Queue()
+        # Events waiting in the queue; repeats of these are dropped, so a burst
+        # queues one entry per file rather than one per event
+        self._queued: Set[Tuple[Path, bool]] = set()
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the worker thread that processes queued file events."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+
+        self._worker = threading.Thread(
+            target=self._process_events, name="allsorted-watch", daemon=True
+        )
+        self._worker.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the worker thread, dropping files still waiting for their quiet period.
+
+        Args:
+            timeout: Seconds to wait for the worker to finish
+        """
+        if self._worker is None:
+            return
+
+        self._events.put(None)
+        self._worker.join(timeout)
+        self._worker = None
+        self.analyzer.close()
+        self.planner.classifier.close()
 
     def on_created(self, event: FileCreatedEvent) -> None:  # type: ignore[override]
         """Handle file creation events."""
         if event.is_directory:
             return
 
-        file_path = Path(event.src_path)
-        self._handle_file(file_path)
+        self._queue_file(Path(os.fsdecode(event.src_path)))
 
     def on_modified(self, event: FileModifiedEvent) -> None:  # type: ignore[override]
         """Handle file modification events."""
         if event.is_directory:
             return
 
-        # Only process if file is newly modified and was stable
-        file_path = Path(event.src_path)
+        self._queue_file(Path(os.fsdecode(event.src_path)))
 
-        # Skip if recently processed
-        if str(file_path) in self.recently_processed:
+    def on_closed(self, event: FileSystemEvent) -> None:
+        """Handle a file being closed after writing (inotify IN_CLOSE_WRITE)."""
+        if event.is_directory:
             return
 
-        self._handle_file(file_path)
+        # The writer is done, so the file need not wait out the quiet period
+        self._queue_file(Path(os.fsdecode(event.src_path)), closed=True)
 
-    def _handle_file(self, file_path: Path) -> None:
+    def _queue_file(self, file_path: Path, closed: bool = False) -> None:
         """
-        Handle a new or modified file.
+        Queue a file event for the worker thread.
 
         Args:
             file_path: Path to the file
+            closed: Whether the event reports the file closed after writing
         """
         # Skip if already in an organized directory
-        if any(self.config.is_managed_directory(p) for p in file_path.parents):
+        if self._in_managed_directory(file_path):
             logger.debug(f"Skipping file in managed directory: {file_path}")
             return
 
-        # Wait for file to be fully written
-        time.sleep(self.process_delay)
-
-        # Check if file still exists and is stable
-        if not file_path.exists():
-            logger.debug(f"File disappeared: {file_path}")
+        # Check and add race with the worker's discard, which at worst queues a
+        # repeat that the worker's pending map absorbs
+        item = (file_path, closed)
+        if item in self._queued:
             return
+        self._queued.add(item)
+        self._events.put(item)
 
-        try:
-            # Quick check if file size is stable
-            initial_size = file_path.stat().st_size
-            time.sleep(0.5)
-            if not file_path.exists():
-                return
-            final_size = file_path.stat().st_size
+    def _in_managed_directory(self, file_path: Path) -> bool:
+        """
+        Check whether a file lies inside a managed directory below the watched root.
 
-            if initial_size != final_size:
-                logger.debug(f"File still being written: {file_path}")
-                return
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            True if any directory between the root and the file has the managed prefix
+        """
+        path = str(file_path)
+        if path.startswith(self._root_prefix):
+            path = path[len(self._root_prefix) :]
+
+        directory = path.rpartition(os.sep)[0]
+        return directory.startswith(self._managed_prefix) or self._managed_component in directory
+
+    def _process_events(self) -> None:
+        """Debounce queued events, processing each file once it has gone quiet."""
+        # Time of each pending file's last event; closed files are due immediately
+        pending: Dict[Path, float] = {}
+
+        while True:
+            timeout = None
+            if pending:
+                next_due = min(pending.values()) + self.process_delay
+                timeout = max(0.0, next_due - time.monotonic())
+
+            try:
+                item = self._events.get(timeout=timeout)
+            except queue.Empty:
+                pass
+            else:
+                if item is None:
+                    return
+                self._queued.discard(item)
+                file_path, closed = item
+                pending[file_path] = float("-inf") if closed else time.monotonic()
+
+            due_before = time.monotonic() - self.process_delay
+            due = [p for p, seen in pending.items() if seen <= due_before]
+            for file_path in due:
+                del pending[file_path]
+
+            # Files that went quiet together are organized together
+            for i in range(0, len(due), self.BATCH_SIZE):
+                self._handle_files(due[i : i + self.BATCH_SIZE])
+
+    def _was_recently_processed(self, key: Tuple[int, int]) -> bool:
+        """
+        Check whether a file was processed within the last RECENT_TTL_SECONDS.
+
+        Args:
+            key: (st_dev, st_ino) of the file
+
+        Returns:
+            True if the file was recently processed
+        """
+        processed_at = self.recently_processed.get(key)
+        return processed_at is not None and (
+            time.monotonic() - processed_at <= self.RECENT_TTL_SECONDS
+        )
+
+    def _mark_processed(self, key: Tuple[int, int]) -> None:
+        """
+        Remember a processed file, evicting expired and excess entries.
+
+        Args:
+            key: (st_dev, st_ino) of the file
+        """
+        now = time.monotonic()
+        recent = self.recently_processed
+        recent[key] = now
+        recent.move_to_end(key)
+
+        # Entries are kept oldest first, so eviction only ever looks at the front
+        expire_before = now - self.RECENT_TTL_SECONDS
+        while recent:
+            oldest_key, processed_at = next(iter(recent.items()))
+            if processed_at >= expire_before and len(recent) <= self.RECENT_MAX_ENTRIES:
+                break
+            del recent[oldest_key]
+
+    def _handle_files(self, file_paths: List[Path]) -> None:
+        """
+        Handle files whose events have gone quiet, organizing them as one plan.
+
+        Args:
+            file_paths: Paths to the files
+        """
+        batch: List[Tuple[Path, Tuple[int, int]]] = []
+        for file_path in file_paths:
+            # Check if file still exists and was not just processed
+            try:
+                st = file_path.stat()
+            except OSError:
+                logger.debug(f"File disappeared: {file_path}")
+                continue
+
+            key = (st.st_dev, st.st_ino)
+            if self._was_recently_processed(key):
+                continue
+
+            # A writer still holding a lock gets another quiet period
+            if not self._is_file_stable(file_path):
+                logger.debug(f"File still locked by a writer: {file_path}")
+                self._queue_file(file_path)
+                continue
 
-            # Organize the file
             logger.info(f"New file detected: {file_path.name}")
-            self._organize_file(file_path)
+            batch.append((file_path, key))
 
-            # Mark as processed
-            self.recently_processed.add(str(file_path))
+        if not batch:
+            return
 
-            # Trigger callback
-            if self.organize_callback:
-                self.organize_callback(file_path)
+        try:
+            # Organize the files
+            self._organize_files([file_path for file_path, _ in batch])
+
+            for file_path, key in batch:
+                # Mark as processed
+                self._mark_processed(key)
+
+                # Trigger callback
+                if self.organize_callback:
+                    self.organize_callback(file_path)
 
         except Exception as e:
-            logger.error(f"Error handling file {file_path}: {e}")
+            logger.error(f"Error handling {len(batch)} file(s): {e}")
 
-    def _organize_file(self, file_path: Path) -> None:
+    @staticmethod
+    def _is_file_stable(file_path: Path) -> bool:
         """
-        Organize a single file.
+        Check that no other process holds a lock on a file.
+
+        Takes and releases a non-blocking exclusive flock. Writers that do not lock
+        are covered by the quiet period alone, as are platforms without fcntl.
 
         Args:
-            file_path: Path to file to organize
+            file_path: Path to the file
+
+        Returns:
+            True if the file could be locked (or locks cannot be checked)
         """
+        if not FCNTL_AVAILABLE:
+            return True
+
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            # Let organizing report files that cannot be opened
+            return True
+
         try:
-            # Create a minimal plan for just this file
-            from allsorted.analyzer import FileAnalyzer
-            from allsorted.models import OrganizationPlan
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            return True
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+        finally:
+            os.close(fd)
+
+    def _organize_files(self, file_paths: List[Path]) -> None:
+        """
+        Organize a batch of files with a single plan and execution.
 
-            analyzer = FileAnalyzer(self.config)
+        Args:
+            file_paths: Paths to files to organize
+        """
+        try:
             plan = OrganizationPlan(root_dir=self.root_dir)
 
-            # Analyze just this file
-            try:
-                file_info = analyzer.analyze_single_file(file_path)
+            # Analyze just these files
+            file_infos: List[FileInfo] = []
+            for file_path in file_paths:
+                try:
+                    file_info = self.analyzer.analyze_single_file(file_path)
+                except Exception as e:
+                    logger.error(f"Failed to analyze {file_path}: {e}")
+                    continue
                 if file_info:
-                    # Create operation for this file
-                    self.planner._add_classification_operations(plan, [file_info])
+                    file_infos.append(file_info)
+
+            if not file_infos:
+                return
 
-                    # Execute if there are operations
-                    if plan.operations:
-                        result = self.executor.execute_plan(plan)
-                        if result.is_complete_success:
-                            logger.info(f"Successfully organized: {file_path.name}")
-                        else:
-                            logger.warning(f"Failed to organize: {file_path.name}")
+            # Create operations for these files; the planner's destination cache is
+            # only useful within one plan, so drop it rather than let it grow
+            self.planner._add_classification_operations(plan, file_infos)
+            self.planner._resolved_cache.clear()
 
-            except Exception as e:
-                logger.error(f"Failed to analyze {file_path}: {e}")
+            # Execute if there are operations
+            if plan.total_files:
+                result = self.executor.execute_plan(plan)
+                for op in result.successful_operations:
+                    logger.info(f"Successfully organized: {op.source.name}")
+                for op, _ in result.failed_operations:
+                    logger.warning(f"Failed to organize: {op.source.name}")
 
         except Exception as e:
-            logger.error(f"Failed to organize {file_path}: {e}")
+            logger.error(f"Failed to organize {len(file_paths)} file(s): {e}")
 
 
 class DirectoryWatcher:
@@ -192,13 +401,12 @@ class DirectoryWatcher:
             return
 
         self.event_handler = FileOrganizeHandler(self.root_dir, self.config, organize_callback)
+        self.event_handler.start()
         self.observer = Observer()
         self.observer.schedule(
             self.event_handler,
             str(self.root_dir),
-            recursive=(
-                self.config.watch_recursive if hasattr(self.config, "watch_recursive") else True
-            ),
+            recursive=self.config.watch_recursive,
         )
 
         self.observer.start()
@@ -211,6 +419,9 @@ class DirectoryWatcher:
             self.observer.join(timeout=5.0)
             logger.info("Stopped watching directory")
 
+        if self.event_handler:
+            self.event_handler.stop(timeout=5.0)
+
         self.observer = None
         self.event_handler = None
 
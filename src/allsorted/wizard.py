@@ -6,6 +6,8 @@ Provides a user-friendly way to set up allsorted through terminal prompts.
 Created by orpheus497
 """
 
+import os
+import sys
 from pathlib import Path
 from typing import Optional
 
@@ -34,6 +36,17 @@ def run_first_time_wizard() -> Config:
     Returns:
         Configured Config object
     """
+    if not _is_interactive():
+        # Every prompt would just take its default; skip straight to saving them
+        config = Config()
+        config_path = get_default_config_path()
+        try:
+            save_config(config, config_path)
+            console.print(f"Default configuration saved to: {config_path}", markup=False)
+        except Exception as e:
+            console.print(f"Failed to save configuration: {e}", markup=False)
+        return config
+
     console.print()
     console.print(
         Panel.fit(
@@ -80,6 +93,18 @@ def run_first_time_wizard() -> Config:
     return config
 
 
+def _is_interactive() -> bool:
+    """
+    Check whether the wizard can prompt the user.
+
+    Returns:
+        False when stdin is not a terminal or ALLSORTED_NONINTERACTIVE is set
+    """
+    if os.environ.get("ALLSORTED_NONINTERACTIVE", "").lower() in ("1", "true", "yes"):
+        return False
+    return sys.stdin is not None and sys.stdin.isatty()
+
+
 def _configure_strategy(config: Config) -> None:
     """Configure organization strategy."""
     console.print("[bold]Organization Strategy[/bold]")
@@ -165,11 +190,11 @@ def _configure_performance(config: Config) -> None:
     console.print("These options can speed up processing for large directories.\n")
 
     # Hash algorithm
-    algorithm = Prompt.ask("Hash algorithm", choices=["sha256", "xxhash"], default="sha256")
+    algorithm = Prompt.ask("Hash algorithm", choices=["sha256", "xxhash", "xxh3"], default="sha256")
 
     config.hash_algorithm = algorithm
 
-    if algorithm == "xxhash":
+    if algorithm in ("xxhash", "xxh3"):
         console.print("[cyan]ℹ[/cyan] xxHash is 3-5x faster but not cryptographically secure")
     else:
         console.print("[cyan]ℹ[/cyan] SHA256 is slower but cryptographically secure")
@@ -20,6 +20,12 @@ def temp_dir() -> Generator[Path, None, None]:
         yield Path(tmpdir)
 
 
+@pytest.fixture(scope="session")
+def shared_temp_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Create one temporary directory for tests that only build paths inside it."""
+    return tmp_path_factory.mktemp("allsorted-shared")
+
+
 @pytest.fixture
 def test_config() -> Config:
     """Create a test configuration with default settings."""
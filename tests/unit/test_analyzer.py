@@ -5,11 +5,12 @@ Created by orpheus497
 """
 
 import hashlib
+import os
 from pathlib import Path
 
 import pytest
 
-from allsorted.analyzer import FileAnalyzer
+from allsorted.analyzer import MMAP_HASH_MIN_SIZE, XXHASH_AVAILABLE, FileAnalyzer
 from allsorted.config import Config
 
 
@@ -88,6 +89,20 @@ class TestFileAnalyzer:
 
         assert analyzer.get_total_files() == 1
 
+    def test_ignore_patterns_relative_to_root(self, temp_dir: Path) -> None:
+        """Test that ignore patterns do not match directories above the root."""
+        root = temp_dir / "my_backup_root"
+        root.mkdir()
+        (root / "normal.txt").write_text("content")
+        (root / "old.backup").write_text("backup")
+
+        config = Config()
+        config.ignore_patterns = ["*backup*"]
+        analyzer = FileAnalyzer(config)
+        analyzer.analyze_directory(root)
+
+        assert analyzer.get_total_files() == 1
+
     def test_managed_directory_recursion(self, temp_dir: Path) -> None:
         """Test recursive scanning of managed directories."""
         # Create managed directory
@@ -111,6 +126,19 @@ class TestFileAnalyzer:
         assert len(analyzer.directories) == 1
         assert analyzer.directories[0].name == "MyFolder"
 
+    def test_ignored_directories_in_managed_dir_are_skipped(self, temp_dir: Path) -> None:
+        """Test that hidden directories inside managed directories are not descended into."""
+        project = temp_dir / "all_Folders" / "project"
+        objects = project / ".git" / "objects" / "ab"
+        objects.mkdir(parents=True)
+        (objects / "cdef").write_text("git object")
+        (project / "main.py").write_text("print('hello')")
+
+        analyzer = FileAnalyzer(Config())
+        analyzer.analyze_directory(temp_dir)
+
+        assert [f.name for f in analyzer.all_files] == ["main.py"]
+
     def test_analyze_single_file(self, temp_dir: Path) -> None:
         """Test analyzing a single file."""
         test_file = temp_dir / "test.txt"
@@ -125,19 +153,25 @@ class TestFileAnalyzer:
         assert file_info.size_bytes > 0
         assert file_info.hash is not None
 
-    def test_xxhash_algorithm(self, temp_dir: Path) -> None:
+    @pytest.mark.parametrize(("algorithm", "digest"), [("xxhash", "xxh64"), ("xxh3", "xxh3_64")])
+    def test_xxhash_algorithm(self, temp_dir: Path, algorithm: str, digest: str) -> None:
         """Test xxHash algorithm support."""
         test_file = temp_dir / "test.txt"
         test_file.write_text("test content for hashing")
 
         config = Config()
-        config.hash_algorithm = "xxhash"
+        config.hash_algorithm = algorithm
         analyzer = FileAnalyzer(config)
         file_info = analyzer.analyze_single_file(test_file)
 
         # Should work even if xxhash not available (fallback to sha256)
         assert file_info is not None
         assert file_info.hash is not None
+        if XXHASH_AVAILABLE:
+            import xxhash
+
+            expected = getattr(xxhash, digest)(b"test content for hashing").hexdigest()
+            assert file_info.hash == expected
 
     def test_sha256_algorithm(self, temp_dir: Path) -> None:
         """Test SHA256 algorithm (default)."""
@@ -155,6 +189,31 @@ class TestFileAnalyzer:
         assert file_info is not None
         assert file_info.hash == expected_hash
 
+    def test_large_file_hash(self, temp_dir: Path) -> None:
+        """Test that files hashed through a memory map get the same hash."""
+        test_file = temp_dir / "large.bin"
+        content = bytes(range(256)) * (MMAP_HASH_MIN_SIZE // 256 + 1)
+        test_file.write_bytes(content)
+
+        file_info = FileAnalyzer(Config()).analyze_single_file(test_file)
+
+        assert file_info is not None
+        assert file_info.hash == hashlib.sha256(content).hexdigest()
+
+    def test_blake3_algorithm(self, temp_dir: Path) -> None:
+        """Test BLAKE3 algorithm support."""
+        blake3 = pytest.importorskip("blake3")
+        test_file = temp_dir / "test.txt"
+        content = b"test content for hashing"
+        test_file.write_bytes(content)
+
+        config = Config()
+        config.hash_algorithm = "blake3"
+        file_info = FileAnalyzer(config).analyze_single_file(test_file)
+
+        assert file_info is not None
+        assert file_info.hash == blake3.blake3(content).hexdigest()
+
     def test_symlink_handling(self, temp_dir: Path) -> None:
         """Test symlink detection."""
         real_file = temp_dir / "real.txt"
@@ -219,3 +278,130 @@ class TestFileAnalyzer:
         duplicates = analyzer.get_duplicate_sets()
         assert len(duplicates) == 1
         assert duplicates[0].count == 3
+
+    def test_files_of_distinct_sizes_skip_full_hash(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that files which cannot be duplicates are never hashed in full."""
+        (temp_dir / "small.txt").write_text("a")
+        (temp_dir / "large.txt").write_text("a" * 10000)
+        (temp_dir / "head1.bin").write_bytes(b"1" + b"x" * 9999)
+        (temp_dir / "head2.bin").write_bytes(b"2" + b"x" * 9999)
+
+        analyzer = FileAnalyzer(Config())
+        hashed: list = []
+        monkeypatch.setattr(analyzer, "_calculate_hash", hashed.append)
+        analyzer.analyze_directory(temp_dir)
+
+        assert hashed == []
+        assert analyzer.get_total_files() == 4
+        assert len(analyzer.get_unique_files()) == 4
+        assert all(file_info.hash is None for file_info in analyzer.all_files)
+
+    def test_same_start_is_hashed_in_full(self, temp_dir: Path) -> None:
+        """Test that same-size files differing after the partial hash are not duplicates."""
+        (temp_dir / "tail1.bin").write_bytes(b"x" * 9999 + b"1")
+        (temp_dir / "tail2.bin").write_bytes(b"x" * 9999 + b"2")
+
+        analyzer = FileAnalyzer(Config())
+        analyzer.analyze_directory(temp_dir)
+
+        assert analyzer.get_duplicate_sets() == []
+        assert all(":" not in file_info.hash for file_info in analyzer.all_files)
+
+    @pytest.mark.parametrize("use_async", [False, True])
+    def test_parallel_hashing_matches_serial(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch, use_async: bool
+    ) -> None:
+        """Test that hashing on a worker pool gives the same results in the same order."""
+        for i in range(40):
+            (temp_dir / f"file{i:02d}.txt").write_text(f"content {i % 10}")
+
+        config = Config()
+        config.partial_hash_size = 0
+        serial = FileAnalyzer(config)
+        serial.analyze_directory(temp_dir)
+
+        config.parallel_processing = True
+        config.use_async = use_async
+        config.max_workers = 2
+        parallel = FileAnalyzer(config)
+        monkeypatch.setattr(parallel, "_calculate_hash", lambda path: pytest.fail("hashed inline"))
+        progress: list = []
+        parallel.analyze_directory(temp_dir, lambda current, total: progress.append(current))
+
+        assert [(f.path, f.hash) for f in parallel.all_files] == [
+            (f.path, f.hash) for f in serial.all_files
+        ]
+        assert progress == list(range(1, 41))
+        assert len(parallel.get_duplicate_sets()) == 10
+
+    def test_hash_cache_reused_across_runs(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that an unchanged file's hash is remembered between analyzers."""
+        file_path = temp_dir / "old.txt"
+        file_path.write_text("unchanged content")
+        os.utime(file_path, (1_000_000_000, 1_000_000_000))
+
+        config = Config()
+        config.hash_cache = True
+        config.hash_cache_path = str(temp_dir / "cache" / "hashes.sqlite")
+        first = FileAnalyzer(config).analyze_single_file(file_path)
+        assert first is not None
+
+        second = FileAnalyzer(config)
+        monkeypatch.setattr(second, "_calculate_hash", lambda path: pytest.fail("hashed again"))
+        cached = second.analyze_single_file(file_path)
+
+        assert cached is not None
+        assert cached.hash == first.hash
+
+    def test_hash_cache_closed_after_scan(self, temp_dir: Path) -> None:
+        """Test that a directory scan commits and closes the hash cache."""
+        (temp_dir / "file1.txt").write_text("same")
+        (temp_dir / "file2.txt").write_text("same")
+
+        config = Config()
+        config.hash_cache = True
+        config.hash_cache_path = str(temp_dir / "cache" / "hashes.sqlite")
+        analyzer = FileAnalyzer(config)
+        analyzer.analyze_directory(temp_dir)
+
+        assert analyzer._hash_cache is None
+        analyzer.reset()
+        analyzer.analyze_directory(temp_dir)
+        assert len(analyzer.get_duplicate_sets()) == 1
+
+    def test_async_io_hashes_on_threads(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that use_async overlaps hashing reads without parallel_processing."""
+        for i in range(40):
+            (temp_dir / f"file{i:02d}.txt").write_text(f"content {i % 10}")
+
+        config = Config()
+        config.partial_hash_size = 0
+        config.use_async = True
+        analyzer = FileAnalyzer(config)
+        monkeypatch.setattr(analyzer, "_calculate_hash", lambda path: pytest.fail("hashed inline"))
+        analyzer.analyze_directory(temp_dir)
+
+        assert analyzer.get_total_files() == 40
+        assert len(analyzer.get_duplicate_sets()) == 10
+
+    def test_unknown_algorithm_warns_once(
+        self, temp_dir: Path, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test that an unknown hash algorithm falls back to sha256 with one warning."""
+        for name in ("a.txt", "b.txt", "c.txt"):
+            (temp_dir / name).write_text("same content")
+
+        config = Config()
+        config.hash_algorithm = "md4"
+        analyzer = FileAnalyzer(config)
+        analyzer.analyze_directory(temp_dir)
+
+        warnings = [r for r in caplog.records if "Unknown hash algorithm" in r.message]
+        assert len(warnings) == 1
+        assert analyzer.all_files[0].hash == hashlib.sha256(b"same content").hexdigest()
@@ -0,0 +1,36 @@
+"""
+Tests for the perceptual hash index.
+
+Created by orpheus497
+"""
+
+import random
+
+from allsorted.bktree import BKTree, hamming_distance
+
+
+class TestBKTree:
+    """Test finding nearby hashes."""
+
+    def test_hamming_distance(self) -> None:
+        """Test counting differing bits."""
+        assert hamming_distance(0b1011, 0b1011) == 0
+        assert hamming_distance(0b1011, 0b0010) == 2
+        assert hamming_distance(0, (1 << 64) - 1) == 64
+
+    def test_query_matches_linear_scan(self) -> None:
+        """Test that queries return exactly the hashes a full scan would."""
+        rng = random.Random(497)
+        base = [rng.getrandbits(64) for _ in range(20)]
+        # Cluster hashes around a few bases so small thresholds find neighbours
+        values = [b ^ (1 << rng.randrange(64)) ^ (1 << rng.randrange(64)) for b in base * 10]
+
+        tree = BKTree()
+        for value in values:
+            tree.add(value)
+
+        assert len(tree) == len(set(values))
+        for query in base:
+            for threshold in (0, 3, 5):
+                expected = {v for v in values if hamming_distance(query, v) <= threshold}
+                assert set(tree.query(query, threshold)) == expected
@@ -96,6 +96,21 @@ class TestConfig:
         assert category == "Code"
         assert subcategory == "Rust"
 
+    def test_add_classification_rule_leaves_defaults(self) -> None:
+        """Test that adding a rule does not change other configurations."""
+        Config().add_classification_rule("Code", "Python", [".pyw"])
+
+        assert Config().get_category_for_extension(".py") == ("Code", "Python")
+
+    def test_add_classification_rule_after_lookup(self) -> None:
+        """Test that rules added after a lookup are used by later lookups."""
+        config = Config()
+        assert config.get_category_for_extension(".blend") == ("Misc", "Unsorted")
+
+        config.add_classification_rule("Apps", "Blender", [".blend"])
+
+        assert config.get_category_for_extension(".blend") == ("Apps", "Blender")
+
     def test_is_managed_directory(self) -> None:
         """Test managed directory detection."""
         config = Config()
@@ -0,0 +1,164 @@
+"""
+Tests for execution engine.
+
+Created by orpheus497
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from allsorted.config import Config
+from allsorted.executor import OrganizationExecutor
+from allsorted.planner import OrganizationPlanner
+
+
+class TestOperationLog:
+    """Test operation logging and undo."""
+
+    def test_execute_writes_operation_log(self, sample_files: Path) -> None:
+        """Test that executed moves are logged one per line."""
+        planner = OrganizationPlanner(Config())
+        plan = planner.create_plan(sample_files)
+
+        executor = OrganizationExecutor(dry_run=False, log_operations=True)
+        result = executor.execute_plan(plan)
+
+        assert executor.operation_log_path is not None
+        lines = executor.operation_log_path.read_text().splitlines()
+        header = json.loads(lines[0])
+
+        assert header["root_dir"] == str(plan.root_dir)
+        assert len(lines) - 1 == result.files_moved + len(plan.directory_operations)
+
+    def test_operation_log_closed_on_error(
+        self, sample_files: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the operation log is closed when execution fails midway."""
+        plan = OrganizationPlanner(Config()).create_plan(sample_files)
+        executor = OrganizationExecutor(dry_run=False, log_operations=True)
+
+        def fail(*args: object) -> None:
+            raise RuntimeError("interrupted")
+
+        monkeypatch.setattr(executor, "_execute_operations", fail)
+        with pytest.raises(RuntimeError):
+            executor.execute_plan(plan)
+
+        assert executor.operation_log_path is not None
+        assert executor._log_fp is None
+
+    def test_undo_restores_files(self, sample_files: Path) -> None:
+        """Test undoing operations from a newline-delimited log."""
+        planner = OrganizationPlanner(Config())
+        plan = planner.create_plan(sample_files)
+
+        executor = OrganizationExecutor(dry_run=False, log_operations=True)
+        executor.execute_plan(plan)
+        assert not (sample_files / "document.pdf").exists()
+
+        assert executor.operation_log_path is not None
+        successful, failed = OrganizationExecutor(log_operations=False).undo_operations(
+            executor.operation_log_path
+        )
+
+        assert failed == 0
+        assert successful > 0
+        assert (sample_files / "document.pdf").exists()
+        assert (sample_files / "subfolder" / "nested.txt").exists()
+
+    def test_undo_legacy_log(self, temp_dir: Path) -> None:
+        """Test undoing operations from a single-document JSON log."""
+        source = temp_dir / "file.txt"
+        destination = temp_dir / "moved.txt"
+        destination.write_text("content")
+
+        log_file = temp_dir / "operations.json"
+        log_file.write_text(
+            json.dumps(
+                {
+                    "version": "1.0",
+                    "timestamp": "20250101_000000",
+                    "root_dir": str(temp_dir),
+                    "operations": [
+                        {
+                            "timestamp": "2025-01-01T00:00:00",
+                            "source": str(source),
+                            "destination": str(destination),
+                        }
+                    ],
+                },
+                indent=2,
+            )
+        )
+
+        successful, failed = OrganizationExecutor(log_operations=False).undo_operations(log_file)
+
+        assert (successful, failed) == (1, 0)
+        assert source.exists()
+        assert not destination.exists()
+
+
+class TestParallelExecution:
+    """Test executing file operations on worker threads."""
+
+    def test_parallel_execution_moves_all_files(self, sample_files: Path) -> None:
+        """Test that parallel execution moves every file exactly once."""
+        config = Config()
+        config.parallel_processing = True
+        config.max_workers = 4
+
+        plan = OrganizationPlanner(config).create_plan(sample_files)
+        progress: list = []
+        executor = OrganizationExecutor(dry_run=False, log_operations=False, config=config)
+        result = executor.execute_plan(plan, progress_callback=lambda c, t: progress.append(c))
+
+        assert result.is_complete_success
+        assert result.files_moved == len(plan.operations)
+        assert sorted(progress) == list(range(1, len(progress) + 1))
+        for op in result.successful_operations:
+            assert op.destination.exists()
+            assert not op.source.exists()
+
+    def test_parallel_execution_streams_spilled_plan(self, sample_files: Path) -> None:
+        """Test that a spilled plan is executed in parallel one batch at a time."""
+        config = Config()
+        config.parallel_processing = True
+        config.max_workers = 4
+        config.plan_spill_threshold = 1
+
+        plan = OrganizationPlanner(config).create_plan(sample_files)
+        total_files = plan.total_files
+        assert plan.has_spilled_operations
+
+        executor = OrganizationExecutor(dry_run=False, log_operations=False, config=config)
+        executor.PARALLEL_BATCH_SIZE = 2
+        result = executor.execute_plan(plan)
+
+        assert result.is_complete_success
+        assert result.files_moved == total_files
+        for op in result.successful_operations:
+            assert op.destination.exists()
+            assert not op.source.exists()
+
+
+class TestCleanup:
+    """Test empty directory cleanup."""
+
+    def test_cleanup_removes_nested_empty_managed_dirs(self, temp_dir: Path) -> None:
+        """Test that nested empty directories inside managed folders are removed."""
+        (temp_dir / "all_Docs" / "Text" / "Old").mkdir(parents=True)
+        (temp_dir / "all_Pics" / "Photos").mkdir(parents=True)
+        (temp_dir / "all_Pics" / "Photos" / "keep.jpg").write_bytes(b"\xff\xd8\xff")
+        (temp_dir / "unmanaged" / "empty").mkdir(parents=True)
+
+        plan = OrganizationPlanner(Config()).create_plan(temp_dir)
+        plan.operations = []
+        plan.directory_operations = []
+        result = OrganizationExecutor(dry_run=False, log_operations=False).execute_plan(plan)
+
+        assert not (temp_dir / "all_Docs").exists()
+        assert (temp_dir / "all_Pics" / "Photos" / "keep.jpg").exists()
+        assert (temp_dir / "unmanaged" / "empty").exists()
+        assert len(result.directories_removed) == 3
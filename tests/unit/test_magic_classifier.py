@@ -0,0 +1,187 @@
+"""
+Tests for content-based classification.
+
+Created by orpheus497
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from allsorted import magic_classifier
+from allsorted.classifier import FileClassifier
+from allsorted.config import Config
+from allsorted.magic_classifier import MagicClassifier
+from allsorted.models import FileInfo
+
+pytestmark = pytest.mark.skipif(
+    not MagicClassifier().is_available(), reason="no magic backend installed"
+)
+
+
+class TestMimeCache:
+    """Test caching of detected MIME types."""
+
+    def test_unchanged_file_uses_cache(self, temp_dir: Path) -> None:
+        """Test that an unchanged file is not read again."""
+        file_path = temp_dir / "notes.txt"
+        file_path.write_text("plain text content\n")
+
+        classifier = MagicClassifier()
+        mime_type = classifier.get_mime_type(file_path)
+        assert mime_type == "text/plain"
+
+        classifier.magic = None
+        classifier.signature_backend = "unavailable"
+        assert classifier.get_mime_type(file_path) == mime_type
+
+    def test_cache_round_trip(self, temp_dir: Path) -> None:
+        """Test saving and reloading the cache from disk."""
+        file_path = temp_dir / "notes.txt"
+        file_path.write_text("plain text content\n")
+        cache_path = temp_dir / "cache" / "mime.json"
+
+        classifier = MagicClassifier()
+        classifier.get_mime_type(file_path)
+        classifier.save_cache(cache_path)
+
+        reloaded = MagicClassifier()
+        reloaded.load_cache(cache_path)
+        reloaded.magic = None
+        reloaded.signature_backend = "unavailable"
+        assert reloaded.get_mime_type(file_path) == "text/plain"
+
+    def test_file_classifier_saves_configured_cache(self, temp_dir: Path) -> None:
+        """Test that the mime_cache setting persists results when the classifier closes."""
+        file_path = temp_dir / "notes.bin"
+        file_path.write_text("plain text content\n")
+        cache_path = temp_dir / "cache" / "mime.json"
+
+        config = Config()
+        config.use_magic = True
+        config.mime_cache = True
+        config.mime_cache_path = str(cache_path)
+
+        classifier = FileClassifier(config)
+        file_info = FileInfo(
+            path=file_path, size_bytes=file_path.stat().st_size, hash=None, modified_time=0.0
+        )
+        assert classifier.classify_file(file_info) == ("Docs", "Text")
+        assert not cache_path.exists()
+
+        classifier.close()
+        assert cache_path.exists()
+
+        reloaded = FileClassifier(config)
+        assert reloaded._magic_classifier is not None
+        assert reloaded._magic_classifier.cache_path == cache_path
+        assert len(reloaded._magic_classifier._mime_cache) == 1
+
+
+class TestSignatureBackends:
+    """Test the pure-Python signature matchers and their libmagic fallback."""
+
+    @staticmethod
+    def _classifier(backend: str, libmagic_result: str) -> MagicClassifier:
+        classifier = MagicClassifier()
+        classifier.signature_backend = backend
+        classifier.magic = SimpleNamespace(from_buffer=lambda head: libmagic_result)
+        return classifier
+
+    def test_filetype_match_skips_libmagic(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a filetype match is used without asking libmagic."""
+        file_path = temp_dir / "image.bin"
+        file_path.write_bytes(b"\x89PNG\r\n\x1a\n")
+        fake = SimpleNamespace(guess_mime=lambda head: "image/png")
+        monkeypatch.setattr(magic_classifier, "filetype", fake, raising=False)
+
+        classifier = self._classifier("filetype", "application/octet-stream")
+        assert classifier.get_mime_type(file_path) == "image/png"
+
+    def test_filetype_miss_falls_back_to_libmagic(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that libmagic identifies files filetype does not recognise."""
+        file_path = temp_dir / "notes.bin"
+        file_path.write_text("plain text content\n")
+        fake = SimpleNamespace(guess_mime=lambda head: None)
+        monkeypatch.setattr(magic_classifier, "filetype", fake, raising=False)
+
+        classifier = self._classifier("filetype", "text/plain")
+        assert classifier.get_mime_type(file_path) == "text/plain"
+
+    def test_puremagic_unambiguous_match(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the best puremagic match is used when it names one MIME type."""
+        file_path = temp_dir / "archive.bin"
+        file_path.write_bytes(b"PK\x03\x04")
+        matches = [
+            SimpleNamespace(confidence=0.8, mime_type="application/zip"),
+            SimpleNamespace(confidence=0.4, mime_type="application/java-archive"),
+        ]
+        fake = SimpleNamespace(PureError=Exception, magic_string=lambda head: matches)
+        monkeypatch.setattr(magic_classifier, "puremagic", fake, raising=False)
+
+        classifier = self._classifier("puremagic", "application/octet-stream")
+        assert classifier.get_mime_type(file_path) == "application/zip"
+
+    def test_puremagic_ambiguous_match_falls_back_to_libmagic(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that equally confident matches with different MIME types go to libmagic."""
+        file_path = temp_dir / "document.bin"
+        file_path.write_bytes(b"PK\x03\x04")
+        matches = [
+            SimpleNamespace(confidence=0.8, mime_type="application/zip"),
+            SimpleNamespace(
+                confidence=0.8,
+                mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            ),
+        ]
+        fake = SimpleNamespace(PureError=Exception, magic_string=lambda head: matches)
+        monkeypatch.setattr(magic_classifier, "puremagic", fake, raising=False)
+
+        classifier = self._classifier("puremagic", "application/zip")
+        assert classifier.get_mime_type(file_path) == "application/zip"
+
+    def test_puremagic_error_falls_back_to_libmagic(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a PureError from puremagic falls back to libmagic."""
+        file_path = temp_dir / "notes.bin"
+        file_path.write_text("plain text content\n")
+
+        class PureError(Exception):
+            pass
+
+        def magic_string(head: bytes) -> List[SimpleNamespace]:
+            raise PureError("no match")
+
+        fake = SimpleNamespace(PureError=PureError, magic_string=magic_string)
+        monkeypatch.setattr(magic_classifier, "puremagic", fake, raising=False)
+
+        classifier = self._classifier("puremagic", "text/plain")
+        assert classifier.get_mime_type(file_path) == "text/plain"
+
+
+class TestClassifyFile:
+    """Test classifying files by content."""
+
+    def test_trusted_extension_skips_detection(self, temp_dir: Path) -> None:
+        """Test that well-known extensions are classified without reading the file."""
+        file_path = temp_dir / "photo.JPG"
+        file_path.write_bytes(b"not really a jpeg")
+
+        assert MagicClassifier().classify_file(file_path) == ("Pics", "Photos")
+
+    def test_ambiguous_extension_uses_content(self, temp_dir: Path) -> None:
+        """Test that files without a trusted extension are identified by content."""
+        file_path = temp_dir / "notes.bin"
+        file_path.write_text("plain text content\n")
+
+        assert MagicClassifier().classify_file(file_path) == ("Docs", "Text")
@@ -4,9 +4,14 @@ Tests for data models.
 Created by orpheus497
 """
 
+from dataclasses import FrozenInstanceError, replace
 from datetime import datetime
+from enum import Enum
+from itertools import islice
 from pathlib import Path
 
+import pytest
+
 from allsorted.models import (
     ConflictResolution,
     DuplicateSet,
@@ -17,36 +22,58 @@ from allsorted.models import (
     OrganizationStrategy,
 )
 
+# Fixed time for tests that need a timestamp but do not check it
+_NOW = datetime(2024, 1, 1)
+
+# Prototypes that tests copy with dataclasses.replace() instead of rebuilding
+_FILE_INFO = FileInfo(
+    path=Path("/path/to/file.txt"),
+    size_bytes=100,
+    hash="hash",
+    modified_time=0.0,
+    is_symlink=False,
+)
+_MOVE_OPERATION = MoveOperation(
+    source=Path("/source"),
+    destination=Path("/dest"),
+    file_info=None,  # type: ignore
+    reason="classify",
+    conflict_resolution=ConflictResolution.RENAME,
+)
+
 
 class TestEnums:
     """Test enumeration types."""
 
-    def test_organization_strategy_values(self) -> None:
-        """Test OrganizationStrategy enum values."""
-        assert OrganizationStrategy.BY_EXTENSION.value == "by-extension"
-        assert OrganizationStrategy.BY_DATE.value == "by-date"
-        assert OrganizationStrategy.BY_SIZE.value == "by-size"
-        assert OrganizationStrategy.HYBRID.value == "hybrid"
-
-    def test_conflict_resolution_values(self) -> None:
-        """Test ConflictResolution enum values."""
-        assert ConflictResolution.RENAME.value == "rename"
-        assert ConflictResolution.SKIP.value == "skip"
-        assert ConflictResolution.OVERWRITE.value == "overwrite"
-        assert ConflictResolution.ASK.value == "ask"
+    @pytest.mark.parametrize(
+        "member, value",
+        [
+            (OrganizationStrategy.BY_EXTENSION, "by-extension"),
+            (OrganizationStrategy.BY_DATE, "by-date"),
+            (OrganizationStrategy.BY_SIZE, "by-size"),
+            (OrganizationStrategy.HYBRID, "hybrid"),
+            (ConflictResolution.RENAME, "rename"),
+            (ConflictResolution.SKIP, "skip"),
+            (ConflictResolution.OVERWRITE, "overwrite"),
+            (ConflictResolution.ASK, "ask"),
+        ],
+    )
+    def test_enum_values(self, member: Enum, value: str) -> None:
+        """Test OrganizationStrategy and ConflictResolution enum values."""
+        assert member.value == value
 
 
 class TestFileInfo:
     """Test FileInfo dataclass."""
 
-    def test_file_info_creation(self, temp_dir: Path) -> None:
+    def test_file_info_creation(self, shared_temp_dir: Path) -> None:
         """Test creating FileInfo instance."""
-        file_path = temp_dir / "test.txt"
+        file_path = shared_temp_dir / "test.txt"
         file_info = FileInfo(
             path=file_path,
             size_bytes=1024,
             hash="abc123",
-            modified_time=datetime.now().timestamp(),
+            modified_time=_NOW.timestamp(),
             is_symlink=False,
         )
 
@@ -55,50 +82,64 @@ class TestFileInfo:
         assert file_info.hash == "abc123"
         assert not file_info.is_symlink
 
-    def test_file_info_extension(self, temp_dir: Path) -> None:
+    def test_file_info_extension(self) -> None:
         """Test FileInfo extension property."""
-        file_info = FileInfo(
-            path=Path("/path/to/file.txt"),
-            size_bytes=100,
-            hash="hash",
-            modified_time=0.0,
-            is_symlink=False,
-        )
-
-        assert file_info.extension == ".txt"
+        assert _FILE_INFO.extension == ".txt"
 
-    def test_file_info_extension_no_extension(self, temp_dir: Path) -> None:
+    def test_file_info_extension_no_extension(self) -> None:
         """Test FileInfo extension for file without extension."""
+        file_info = replace(_FILE_INFO, path=Path("/path/to/README"))
+
+        assert file_info.extension == ""
+
+    def test_file_info_equality_by_hash(self) -> None:
+        """Test that FileInfo instances with the same hash are equal and immutable."""
+        first = FileInfo(path=Path("/a/file.txt"), size_bytes=1, hash="same", modified_time=0.0)
+        second = FileInfo(path=Path("/b/copy.txt"), size_bytes=1, hash="same", modified_time=1.0)
+
+        assert first == second
+        assert len({first, second}) == 1
+        with pytest.raises(FrozenInstanceError):
+            first.hash = "other"  # type: ignore[misc]
+
+    def test_file_info_without_hash(self) -> None:
+        """Test that FileInfo instances without a hash are only equal to themselves."""
+        first = replace(_FILE_INFO, hash=None)
+        second = replace(_FILE_INFO, hash=None)
+
+        assert first == first
+        assert first != second
+        assert len({first, second}) == 2
+
+    def test_file_info_resolved_path(self, temp_dir: Path) -> None:
+        """Test that the resolved path is computed once and reused."""
+        (temp_dir / "test.txt").write_text("content")
         file_info = FileInfo(
-            path=Path("/path/to/README"),
-            size_bytes=100,
-            hash="hash",
+            path=temp_dir / "sub" / ".." / "test.txt",
+            size_bytes=7,
+            hash="abc123",
             modified_time=0.0,
-            is_symlink=False,
         )
 
-        assert file_info.extension == ""
+        resolved = file_info.resolved_path
+
+        assert resolved == (temp_dir / "test.txt").resolve()
+        assert file_info.resolved_path is resolved
 
 
 class TestDuplicateSet:
     """Test DuplicateSet dataclass."""
 
-    def test_duplicate_set_properties(self, temp_dir: Path) -> None:
+    def test_duplicate_set_properties(self, shared_temp_dir: Path) -> None:
         """Test DuplicateSet calculated properties."""
-        file1 = FileInfo(
-            path=temp_dir / "file1.txt",
+        file1 = replace(
+            _FILE_INFO,
+            path=shared_temp_dir / "file1.txt",
             size_bytes=1000,
             hash="hash123",
             modified_time=100.0,
-            is_symlink=False,
-        )
-        file2 = FileInfo(
-            path=temp_dir / "file2.txt",
-            size_bytes=1000,
-            hash="hash123",
-            modified_time=200.0,
-            is_symlink=False,
         )
+        file2 = replace(file1, path=shared_temp_dir / "file2.txt", modified_time=200.0)
 
         dup_set = DuplicateSet(hash="hash123", files=[file1, file2])
 
@@ -107,21 +148,18 @@ class TestDuplicateSet:
         assert dup_set.primary == file1  # Older file
         assert file2 in dup_set.extras
 
+        dup_set.primary = file2
+        assert len(dup_set.extras) == 1 and dup_set.extras[0] is file1
+
 
 class TestMoveOperation:
     """Test MoveOperation dataclass."""
 
-    def test_move_operation_creation(self, temp_dir: Path) -> None:
+    def test_move_operation_creation(self, shared_temp_dir: Path) -> None:
         """Test creating MoveOperation."""
-        source = temp_dir / "source.txt"
-        dest = temp_dir / "dest.txt"
-        file_info = FileInfo(
-            path=source,
-            size_bytes=100,
-            hash="hash",
-            modified_time=0.0,
-            is_symlink=False,
-        )
+        source = shared_temp_dir / "source.txt"
+        dest = shared_temp_dir / "dest.txt"
+        file_info = replace(_FILE_INFO, path=source)
 
         operation = MoveOperation(
             source=source,
@@ -138,25 +176,11 @@ class TestMoveOperation:
 
     def test_move_operation_is_classification(self) -> None:
         """Test is_classification property."""
-        operation = MoveOperation(
-            source=Path("/source"),
-            destination=Path("/dest"),
-            file_info=None,  # type: ignore
-            reason="classify",
-            conflict_resolution=ConflictResolution.RENAME,
-        )
-
-        assert operation.is_classification
+        assert _MOVE_OPERATION.is_classification
 
     def test_move_operation_is_duplicate(self) -> None:
         """Test is_duplicate property."""
-        operation = MoveOperation(
-            source=Path("/source"),
-            destination=Path("/dest"),
-            file_info=None,  # type: ignore
-            reason="duplicate",
-            conflict_resolution=ConflictResolution.RENAME,
-        )
+        operation = replace(_MOVE_OPERATION, reason="duplicate")
 
         assert operation.is_duplicate
 
@@ -164,21 +188,21 @@ class TestMoveOperation:
 class TestOrganizationPlan:
     """Test OrganizationPlan dataclass."""
 
-    def test_organization_plan_creation(self, temp_dir: Path) -> None:
+    def test_organization_plan_creation(self, shared_temp_dir: Path) -> None:
         """Test creating OrganizationPlan."""
-        plan = OrganizationPlan(root_dir=temp_dir)
+        plan = OrganizationPlan(root_dir=shared_temp_dir)
 
-        assert plan.root_dir == temp_dir
+        assert plan.root_dir == shared_temp_dir
         assert plan.operations == []
         assert plan.duplicate_sets == []
         assert plan.errors == []
 
-    def test_organization_plan_add_operation(self, temp_dir: Path) -> None:
+    def test_organization_plan_add_operation(self, shared_temp_dir: Path) -> None:
         """Test adding operation to plan."""
-        plan = OrganizationPlan(root_dir=temp_dir)
+        plan = OrganizationPlan(root_dir=shared_temp_dir)
         operation = MoveOperation(
-            source=temp_dir / "source.txt",
-            destination=temp_dir / "dest.txt",
+            source=shared_temp_dir / "source.txt",
+            destination=shared_temp_dir / "dest.txt",
             file_info=None,  # type: ignore
             reason="test",
             conflict_resolution=ConflictResolution.RENAME,
@@ -189,32 +213,117 @@ class TestOrganizationPlan:
         assert len(plan.operations) == 1
         assert plan.operations[0] == operation
 
-    def test_organization_plan_total_files(self, temp_dir: Path) -> None:
+    def test_organization_plan_total_files(self, shared_temp_dir: Path) -> None:
         """Test total_files property."""
-        plan = OrganizationPlan(root_dir=temp_dir)
+        plan = OrganizationPlan(root_dir=shared_temp_dir)
+
+        plan.set_operations(
+            [
+                replace(
+                    _MOVE_OPERATION,
+                    source=shared_temp_dir / f"source{i}.txt",
+                    destination=shared_temp_dir / f"dest{i}.txt",
+                )
+                for i in range(5)
+            ]
+        )
+
+        assert plan.total_files == 5
+
+    def test_organization_plan_spills_operations(self, shared_temp_dir: Path) -> None:
+        """Test that operations beyond the spill threshold are streamed back from disk."""
+        plan = OrganizationPlan(root_dir=shared_temp_dir, spill_threshold=2)
 
-        # Add some operations
         for i in range(5):
-            operation = MoveOperation(
-                source=temp_dir / f"source{i}.txt",
-                destination=temp_dir / f"dest{i}.txt",
-                file_info=None,  # type: ignore
-                reason="test",
-                conflict_resolution=ConflictResolution.RENAME,
+            plan.add_operation(
+                MoveOperation(
+                    source=shared_temp_dir / f"source{i}.txt",
+                    destination=shared_temp_dir / "all_Docs" / f"dest{i}.txt",
+                    file_info=FileInfo(
+                        path=shared_temp_dir / f"source{i}.txt",
+                        size_bytes=i,
+                        hash=f"hash{i}",
+                        modified_time=0.0,
+                    ),
+                    reason="classify",
+                )
             )
-            plan.add_operation(operation)
 
+        assert len(plan.operations) == 2
+        assert plan.total_files == 5
+        assert plan.categories_used == {"all_Docs"}
+
+        operations = list(plan.iter_operations())
+        assert [op.source.name for op in operations] == [f"source{i}.txt" for i in range(5)]
+        assert operations[4].file_info.size_bytes == 4
+        assert operations[4].conflict_resolution == ConflictResolution.RENAME
+        assert len(list(plan.iter_operations())) == 5
+
+        plan.close()
         assert plan.total_files == 5
+        with pytest.raises(ValueError):
+            list(plan.iter_operations())
+
+    def test_organization_plan_add_after_partial_iteration(self, shared_temp_dir: Path) -> None:
+        """Test that adding after a partial pass does not overwrite spilled operations."""
+        plan = OrganizationPlan(root_dir=shared_temp_dir, spill_threshold=1)
+
+        def operation(i: int) -> MoveOperation:
+            return MoveOperation(
+                source=shared_temp_dir / f"source{i}.txt",
+                destination=shared_temp_dir / "all_Docs" / f"dest{i}.txt",
+                file_info=FileInfo(
+                    path=shared_temp_dir / f"source{i}.txt",
+                    size_bytes=i,
+                    hash=f"hash{i}",
+                    modified_time=0.0,
+                ),
+                reason="classify",
+            )
+
+        for i in range(2000):
+            plan.add_operation(operation(i))
+
+        assert len(list(islice(plan.iter_operations(), 3))) == 3
+        plan.add_operation(operation(2000))
 
-    def test_organization_plan_categories_used(self, temp_dir: Path) -> None:
+        operations = list(plan.iter_operations())
+        assert [op.file_info.size_bytes for op in operations] == list(range(2001))
+        plan.close()
+
+    def test_organization_plan_duplicate_totals(self, shared_temp_dir: Path) -> None:
+        """Test that duplicate totals follow the duplicate sets."""
+        plan = OrganizationPlan(root_dir=shared_temp_dir)
+
+        for set_index, copies in enumerate((2, 3)):
+            files = [
+                FileInfo(
+                    path=shared_temp_dir / f"set{set_index}_copy{i}.txt",
+                    size_bytes=100,
+                    hash=f"hash{set_index}",
+                    modified_time=float(i),
+                )
+                for i in range(copies)
+            ]
+            plan.add_duplicate_set(DuplicateSet(hash=f"hash{set_index}", files=files))
+
+        assert len(plan.duplicate_sets) == 2
+        assert plan.total_duplicates == 3
+        assert plan.space_recoverable == 300
+
+        plan.duplicate_sets = plan.duplicate_sets[:1]
+        assert plan.total_duplicates == 1
+        assert plan.space_recoverable == 100
+
+    def test_organization_plan_categories_used(self, shared_temp_dir: Path) -> None:
         """Test categories_used property."""
-        plan = OrganizationPlan(root_dir=temp_dir)
+        plan = OrganizationPlan(root_dir=shared_temp_dir)
 
         # Add operations with different categories
         plan.add_operation(
             MoveOperation(
-                source=temp_dir / "file1.txt",
-                destination=temp_dir / "all_Docs" / "file1.txt",
+                source=shared_temp_dir / "file1.txt",
+                destination=shared_temp_dir / "all_Docs" / "file1.txt",
                 file_info=None,  # type: ignore
                 reason="test",
                 conflict_resolution=ConflictResolution.RENAME,
@@ -222,8 +331,8 @@ class TestOrganizationPlan:
         )
         plan.add_operation(
             MoveOperation(
-                source=temp_dir / "file2.txt",
-                destination=temp_dir / "all_Pics" / "file2.txt",
+                source=shared_temp_dir / "file2.txt",
+                destination=shared_temp_dir / "all_Pics" / "file2.txt",
                 file_info=None,  # type: ignore
                 reason="test",
                 conflict_resolution=ConflictResolution.RENAME,
@@ -234,16 +343,22 @@ class TestOrganizationPlan:
         assert "all_Docs" in categories
         assert "all_Pics" in categories
 
+        plan.set_operations(plan.operations[:1])
+        assert plan.categories_used == {"all_Docs"}
+
+        plan.operations = []
+        assert plan.categories_used == set()
+
 
 class TestOrganizationResult:
     """Test OrganizationResult dataclass."""
 
-    def test_organization_result_creation(self, temp_dir: Path) -> None:
+    def test_organization_result_creation(self, shared_temp_dir: Path) -> None:
         """Test creating OrganizationResult."""
-        plan = OrganizationPlan(root_dir=temp_dir)
+        plan = OrganizationPlan(root_dir=shared_temp_dir)
         result = OrganizationResult(
             plan=plan,
-            started=datetime.now(),
+            started=_NOW,
             dry_run=False,
         )
 
@@ -257,21 +372,14 @@ class TestOrganizationResult:
         plan = OrganizationPlan(root_dir=temp_dir)
         result = OrganizationResult(
             plan=plan,
-            started=datetime.now(),
+            started=_NOW,
             dry_run=False,
         )
 
         # Add successful operations
-        for i in range(3):
-            result.successful_operations.append(
-                MoveOperation(
-                    source=temp_dir / f"source{i}.txt",
-                    destination=temp_dir / f"dest{i}.txt",
-                    file_info=None,  # type: ignore
-                    reason="test",
-                    conflict_resolution=ConflictResolution.RENAME,
-                )
-            )
+        result.successful_operations = [
+            replace(_MOVE_OPERATION, source=temp_dir / f"source{i}.txt") for i in range(3)
+        ]
 
         assert result.files_moved == 3
 
@@ -280,35 +388,17 @@ class TestOrganizationResult:
         plan = OrganizationPlan(root_dir=temp_dir)
         result = OrganizationResult(
             plan=plan,
-            started=datetime.now(),
+            started=_NOW,
             dry_run=False,
         )
 
         # Add 7 successful and 3 failed operations
-        for i in range(7):
-            result.successful_operations.append(
-                MoveOperation(
-                    source=temp_dir / f"source{i}.txt",
-                    destination=temp_dir / f"dest{i}.txt",
-                    file_info=None,  # type: ignore
-                    reason="test",
-                    conflict_resolution=ConflictResolution.RENAME,
-                )
-            )
-
-        for i in range(3):
-            result.failed_operations.append(
-                (
-                    MoveOperation(
-                        source=temp_dir / f"fail{i}.txt",
-                        destination=temp_dir / f"dest{i}.txt",
-                        file_info=None,  # type: ignore
-                        reason="test",
-                        conflict_resolution=ConflictResolution.RENAME,
-                    ),
-                    "error",
-                )
-            )
+        result.successful_operations = [
+            replace(_MOVE_OPERATION, source=temp_dir / f"source{i}.txt") for i in range(7)
+        ]
+        result.failed_operations = [
+            (replace(_MOVE_OPERATION, source=temp_dir / f"fail{i}.txt"), "error") for i in range(3)
+        ]
 
         assert result.success_rate == 70.0
 
@@ -317,7 +407,7 @@ class TestOrganizationResult:
         plan = OrganizationPlan(root_dir=temp_dir)
         result = OrganizationResult(
             plan=plan,
-            started=datetime.now(),
+            started=_NOW,
             dry_run=False,
         )
 
@@ -0,0 +1,99 @@
+"""
+Tests for organization planning.
+
+Created by orpheus497
+"""
+
+from pathlib import Path
+
+import pytest
+
+from allsorted.config import Config
+from allsorted.models import FileInfo, MoveOperation, OrganizationPlan
+from allsorted.planner import OrganizationPlanner
+
+
+class TestParallelClassification:
+    """Test classifying files on worker threads."""
+
+    def test_parallel_plan_matches_serial_plan(self, temp_dir: Path) -> None:
+        """Test that parallel classification yields the same operations in the same order."""
+        for i in range(25):
+            (temp_dir / f"file{i}.{('txt', 'jpg', 'mp3', 'zip', 'py')[i % 5]}").write_text(str(i))
+
+        serial_plan = OrganizationPlanner(Config()).create_plan(temp_dir)
+
+        config = Config()
+        config.parallel_processing = True
+        config.max_workers = 4
+        planner = OrganizationPlanner(config)
+        planner.CLASSIFY_CHUNK_SIZE = 3
+        parallel_plan = planner.create_plan(temp_dir)
+
+        assert [(op.source, op.destination) for op in parallel_plan.operations] == [
+            (op.source, op.destination) for op in serial_plan.operations
+        ]
+        assert parallel_plan.total_files == 25
+
+
+class TestClassificationRules:
+    """Test that plans follow the configured classification rules."""
+
+    def test_rule_added_after_planner_creation(self, temp_dir: Path) -> None:
+        """Test that a rule added after the planner is built is used for new plans."""
+        (temp_dir / "scene.blend").write_text("blend")
+
+        config = Config()
+        planner = OrganizationPlanner(config)
+        config.add_classification_rule("Apps", "Blender", [".blend"])
+
+        plan = planner.create_plan(temp_dir)
+
+        assert [op.destination.parent.name for op in plan.operations] == ["Blender"]
+
+
+class TestRootResolution:
+    """Test that plans are built against the resolved root directory."""
+
+    def test_relative_root_is_resolved(
+        self, sample_files: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that file and directory operations derive from the resolved root."""
+        monkeypatch.chdir(sample_files.parent)
+
+        plan = OrganizationPlanner(Config()).create_plan(Path(sample_files.name))
+
+        assert plan.root_dir == sample_files.resolve()
+        for op in plan.iter_operations():
+            assert op.source.parent == plan.root_dir
+            assert op.resolved_source == op.source
+        for dir_op in plan.directory_operations:
+            assert dir_op.source.parent == plan.root_dir
+
+
+class TestOptimizePlan:
+    """Test removing redundant operations and resolving conflicts."""
+
+    def test_spilled_conflicts_are_renamed(self, temp_dir: Path) -> None:
+        """Test that renames of spilled operations are kept."""
+        # Conflicting operations are renamed past files already at the destination
+        (temp_dir / "all_Docs").mkdir()
+        (temp_dir / "all_Docs" / "same.txt").touch()
+        plan = OrganizationPlan(root_dir=temp_dir, spill_threshold=1)
+        for i in range(3):
+            source = temp_dir / f"source{i}.txt"
+            plan.add_operation(
+                MoveOperation(
+                    source=source,
+                    destination=temp_dir / "all_Docs" / "same.txt",
+                    file_info=FileInfo(path=source, size_bytes=0, hash=None, modified_time=0.0),
+                    reason="classify",
+                )
+            )
+
+        OrganizationPlanner(Config()).optimize_plan(plan)
+
+        destinations = [op.destination.name for op in plan.iter_operations()]
+        assert plan.has_spilled_operations
+        assert destinations[0] == "same.txt"
+        assert all(name != "same.txt" for name in destinations[1:])
@@ -10,6 +10,7 @@ import pytest
 
 from allsorted.utils import (
     calculate_directory_size,
+    compile_ignore_patterns,
     ensure_dir,
     format_duration,
     format_size,
@@ -22,43 +23,48 @@ from allsorted.utils import (
     truncate_path,
 )
 
+# Paths that leave the base directory once joined to it
+_ESCAPE_CASES = [
+    Path("../../etc/passwd"),
+    Path("subdir/../../outside.txt"),
+    Path("/etc/passwd"),
+]
 
-class TestFormatting:
-    """Test formatting functions."""
 
-    def test_format_size_bytes(self) -> None:
-        """Test formatting bytes."""
-        assert "B" in format_size(500)
+@pytest.fixture(scope="module")
+def populated_tree(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Create a directory tree once for tests that only read it."""
+    root = tmp_path_factory.mktemp("populated")
+    for name in ("file.txt", "file_1.txt", "file_2.txt"):
+        (root / name).write_bytes(b"content")
+    (root / ".hidden").touch()
+    (root / "normal.txt").touch()
 
-    def test_format_size_kilobytes(self) -> None:
-        """Test formatting kilobytes."""
-        result = format_size(2048)
-        assert "KB" in result
+    (root / "flat").mkdir()
+    (root / "flat" / "file1.txt").write_bytes(b"a" * 100)
+    (root / "flat" / "file2.txt").write_bytes(b"b" * 200)
 
-    def test_format_size_megabytes(self) -> None:
-        """Test formatting megabytes."""
-        result = format_size(1024 * 1024 * 5)
-        assert "MB" in result
+    (root / "nested" / "subdir").mkdir(parents=True)
+    (root / "nested" / "file1.txt").write_bytes(b"a" * 100)
+    (root / "nested" / "subdir" / "file2.txt").write_bytes(b"b" * 200)
+    return root
 
-    def test_format_size_gigabytes(self) -> None:
-        """Test formatting gigabytes."""
-        result = format_size(1024 * 1024 * 1024 * 2)
-        assert "GB" in result
 
-    def test_format_duration_seconds(self) -> None:
-        """Test formatting short duration."""
-        result = format_duration(45.3)
-        assert "s" in result
+class TestFormatting:
+    """Test formatting functions."""
 
-    def test_format_duration_minutes(self) -> None:
-        """Test formatting minutes."""
-        result = format_duration(125)
-        assert "m" in result
+    @pytest.mark.parametrize(
+        "size, unit",
+        [(500, "B"), (2048, "KB"), (1024 * 1024 * 5, "MB"), (1024 * 1024 * 1024 * 2, "GB")],
+    )
+    def test_format_size(self, size: int, unit: str) -> None:
+        """Test formatting sizes in each unit."""
+        assert unit in format_size(size)
 
-    def test_format_duration_hours(self) -> None:
-        """Test formatting hours."""
-        result = format_duration(3665)
-        assert "h" in result
+    @pytest.mark.parametrize("seconds, unit", [(45.3, "s"), (125, "m"), (3665, "h")])
+    def test_format_duration(self, seconds: float, unit: str) -> None:
+        """Test formatting durations in seconds, minutes and hours."""
+        assert unit in format_duration(seconds)
 
 
 class TestPathOperations:
@@ -98,17 +104,23 @@ class TestPathOperations:
         assert result.suffix == path.suffix
         assert "_1" in result.stem
 
-    def test_get_unique_path_multiple(self, temp_dir: Path) -> None:
+    def test_get_unique_path_multiple(self, populated_tree: Path) -> None:
         """Test get_unique_path with multiple existing files."""
-        path = temp_dir / "file.txt"
-        path.write_text("content")
-        (temp_dir / "file_1.txt").write_text("content")
-        (temp_dir / "file_2.txt").write_text("content")
+        path = populated_tree / "file.txt"
 
         result = get_unique_path(path)
 
         assert "_3" in result.stem
 
+    def test_get_unique_path_many_existing(self, temp_dir: Path) -> None:
+        """Test get_unique_path finds the first free number after a long run."""
+        path = temp_dir / "file.txt"
+        path.write_text("content")
+        for counter in range(1, 101):
+            (temp_dir / f"file_{counter}.txt").write_text("content")
+
+        assert get_unique_path(path) == temp_dir / "file_101.txt"
+
     def test_truncate_path_short(self) -> None:
         """Test truncating a short path."""
         path = Path("/short/path/file.txt")
@@ -124,56 +136,58 @@ class TestPathOperations:
         assert len(result) <= 50
         assert "..." in result
 
-    def test_is_hidden_unix(self, temp_dir: Path) -> None:
+    def test_is_hidden_unix(self, populated_tree: Path) -> None:
         """Test hidden file detection (Unix-style)."""
-        hidden_file = temp_dir / ".hidden"
-        hidden_file.touch()
+        hidden_file = populated_tree / ".hidden"
 
         assert is_hidden(hidden_file)
 
-    def test_is_hidden_normal(self, temp_dir: Path) -> None:
+    def test_is_hidden_normal(self, populated_tree: Path) -> None:
         """Test normal file is not hidden."""
-        normal_file = temp_dir / "normal.txt"
-        normal_file.touch()
+        normal_file = populated_tree / "normal.txt"
 
         assert not is_hidden(normal_file)
 
+    def test_compile_ignore_patterns(self) -> None:
+        """Test that ignore patterns match the end of a path."""
+        relative_re, absolute_re = compile_ignore_patterns(("**/.git/**", "*.tmp", "/abs/*.log"))
+
+        assert relative_re is not None
+        assert relative_re.search("repo/.git/objects/ab/cdef")
+        assert relative_re.search(".git/config")
+        assert relative_re.search("scratch.tmp")
+        assert not relative_re.search("repo/.gitignore")
+        assert absolute_re is not None
+        assert absolute_re.search("/abs/run.log")
+        assert not absolute_re.search("/home/abs/run.log")
+        assert compile_ignore_patterns(()) == (None, None)
+
 
 class TestFilesystemOperations:
     """Test filesystem operation functions."""
 
-    def test_calculate_directory_size(self, temp_dir: Path) -> None:
+    def test_calculate_directory_size(self, populated_tree: Path) -> None:
         """Test calculating directory size."""
-        (temp_dir / "file1.txt").write_text("a" * 100)
-        (temp_dir / "file2.txt").write_text("b" * 200)
-
-        size = calculate_directory_size(temp_dir)
+        size = calculate_directory_size(populated_tree / "flat")
 
         assert size >= 300
 
-    def test_calculate_directory_size_nested(self, temp_dir: Path) -> None:
+    def test_calculate_directory_size_nested(self, populated_tree: Path) -> None:
         """Test calculating size of nested directories."""
-        subdir = temp_dir / "subdir"
-        subdir.mkdir()
-        (temp_dir / "file1.txt").write_text("a" * 100)
-        (subdir / "file2.txt").write_text("b" * 200)
-
-        size = calculate_directory_size(temp_dir)
+        size = calculate_directory_size(populated_tree / "nested")
 
         assert size >= 300
 
-    def test_get_available_space(self, temp_dir: Path) -> None:
+    def test_get_available_space(self, shared_temp_dir: Path) -> None:
         """Test getting available disk space."""
-        space = get_available_space(temp_dir)
+        space = get_available_space(shared_temp_dir)
 
         assert space > 0
 
-    def test_is_same_filesystem(self, temp_dir: Path) -> None:
+    def test_is_same_filesystem(self, populated_tree: Path) -> None:
         """Test filesystem comparison."""
-        file1 = temp_dir / "file1.txt"
-        file2 = temp_dir / "file2.txt"
-        file1.touch()
-        file2.touch()
+        file1 = populated_tree / "flat" / "file1.txt"
+        file2 = populated_tree / "nested" / "subdir" / "file2.txt"
 
         assert is_same_filesystem(file1, file2)
 
@@ -214,11 +228,12 @@ class TestSecurityFunctions:
         assert result.is_absolute()
         assert temp_dir in result.parents or result.parent == temp_dir
 
-    def test_safe_path_resolve_escape_attempt(self, temp_dir: Path) -> None:
+    @pytest.mark.parametrize("escape", _ESCAPE_CASES, ids=str)
+    def test_safe_path_resolve_escape_attempt(self, shared_temp_dir: Path, escape: Path) -> None:
         """Test safe path resolution blocks escape attempts."""
-        # Try to escape the base directory
-        with pytest.raises(ValueError):
-            safe_path_resolve(Path("../../etc/passwd"), temp_dir)
+        # Joining an absolute path replaces the base, so each case ends up outside it
+        with pytest.raises(ValueError, match="escapes base directory"):
+            safe_path_resolve(shared_temp_dir / escape, shared_temp_dir)
 
     def test_safe_path_resolve_relative(self, temp_dir: Path) -> None:
         """Test safe path resolution with relative path."""
@@ -0,0 +1,154 @@
+"""
+Tests for plan validation.
+
+Created by orpheus497
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from allsorted.config import Config
+from allsorted.planner import OrganizationPlanner
+from allsorted.validator import OperationValidator
+
+
+class TestValidateAll:
+    """Test running every validation check on a plan."""
+
+    def test_valid_plan_passes(self, sample_files: Path) -> None:
+        """Test that a freshly created plan validates cleanly."""
+        plan = OrganizationPlanner(Config()).create_plan(sample_files)
+
+        is_valid, errors, warnings = OperationValidator(plan).validate_all()
+
+        assert is_valid
+        assert errors == []
+        assert warnings == []
+
+    def test_shared_destination_is_reported(self, sample_files: Path) -> None:
+        """Test that two operations targeting one destination are an error."""
+        plan = OrganizationPlanner(Config()).create_plan(sample_files)
+        first, second = plan.operations[:2]
+        second.destination = first.destination
+
+        is_valid, errors, _ = OperationValidator(plan).validate_all()
+
+        assert not is_valid
+        assert len(errors) == 1
+        assert "Multiple operations target same destination" in errors[0]
+        assert str(second.source) in errors[0]
+
+    def test_existing_destination_is_warned(self, sample_files: Path) -> None:
+        """Test that a destination that already exists produces a warning."""
+        plan = OrganizationPlanner(Config()).create_plan(sample_files)
+        op = plan.operations[0]
+        op.destination.parent.mkdir(parents=True)
+        op.destination.write_text("already here")
+
+        is_valid, _, warnings = OperationValidator(plan).validate_all()
+
+        assert is_valid
+        assert any(str(op.destination) in warning for warning in warnings)
+
+    def test_missing_and_non_file_sources_are_reported(self, sample_files: Path) -> None:
+        """Test that sources which vanished or are not regular files are errors."""
+        plan = OrganizationPlanner(Config()).create_plan(sample_files)
+        missing, replaced = plan.operations[:2]
+        missing.source.unlink()
+        replaced.source.unlink()
+        replaced.source.mkdir()
+
+        is_valid, errors, _ = OperationValidator(plan).validate_all()
+
+        assert not is_valid
+        assert f"Source file does not exist: {missing.source}" in errors
+        assert f"Source is not a file: {replaced.source}" in errors
+
+    def test_same_filesystem_moves_need_no_space(
+        self, sample_files: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that free space is only required when moves may leave the filesystem."""
+        plan = OrganizationPlanner(Config()).create_plan(sample_files)
+        monkeypatch.setattr("allsorted.validator.get_available_space", lambda path: 0)
+
+        is_valid, _, _ = OperationValidator(plan).validate_all()
+        assert is_valid
+
+        monkeypatch.setattr(OperationValidator, "_moves_stay_on_root_device", lambda self: False)
+        is_valid, errors, _ = OperationValidator(plan).validate_all()
+        assert not is_valid
+        assert errors[0].startswith("Insufficient disk space")
+
+    def test_messages_follow_check_order(self, sample_files: Path) -> None:
+        """Test that messages are reported in check order."""
+        plan = OrganizationPlanner(Config()).create_plan(sample_files)
+        first, second = plan.operations[:2]
+        second.destination = first.destination
+        first.source.unlink()
+
+        _, errors, _ = OperationValidator(plan).validate_all()
+
+        assert "Multiple operations target same destination" in errors[0]
+        assert errors[1] == f"Source file does not exist: {first.source}"
+
+    def test_spilled_plan_is_validated(self, sample_files: Path) -> None:
+        """Test that checks also run over operations spilled to disk."""
+        config = Config()
+        config.plan_spill_threshold = 1
+        plan = OrganizationPlanner(config).create_plan(sample_files)
+        assert plan.has_spilled_operations
+        last = list(plan.iter_operations())[-1]
+        last.source.unlink()
+
+        is_valid, errors, _ = OperationValidator(plan).validate_all()
+
+        assert not is_valid
+        assert errors == [f"Source file does not exist: {last.source}"]
+
+    def test_swapped_files_are_reported_once(self, sample_files: Path) -> None:
+        """Test that two operations swapping files are reported as one cycle."""
+        plan = OrganizationPlanner(Config()).create_plan(sample_files)
+        first, second = plan.operations[:2]
+        first.destination = second.source
+        second.destination = first.source
+
+        _, _, warnings = OperationValidator(plan).validate_all()
+
+        cycles = [warning for warning in warnings if "form a cycle" in warning]
+        assert len(cycles) == 1
+        start = min(first.source, second.source)
+        assert cycles[0].endswith(f"{start} -> {max(first.source, second.source)} -> {start}")
+
+    def test_chain_into_cycle_reports_only_the_cycle(self, sample_files: Path) -> None:
+        """Test that moves leading into a cycle are not reported as part of it."""
+        plan = OrganizationPlanner(Config()).create_plan(sample_files)
+        tail, entry, first, second = plan.operations[:4]
+        tail.destination = entry.source
+        entry.destination = first.source
+        first.destination = second.source
+        second.destination = first.source
+
+        _, _, warnings = OperationValidator(plan).validate_all()
+
+        cycles = [warning for warning in warnings if "form a cycle" in warning]
+        assert len(cycles) == 1
+        assert str(first.source) in cycles[0] and str(second.source) in cycles[0]
+        assert str(entry.source) not in cycles[0] and str(tail.source) not in cycles[0]
+
+
+class TestWritePermission:
+    """Test checking destination directories for write access."""
+
+    def test_access_denial_is_confirmed_by_probe(
+        self, sample_files: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a directory access() rejects is still writable if a file can be created."""
+        plan = OrganizationPlanner(Config()).create_plan(sample_files)
+        validator = OperationValidator(plan)
+        monkeypatch.setattr(os, "access", lambda path, mode: False)
+
+        assert validator._check_write_permission(sample_files)
+        assert not validator._check_write_permission(sample_files / "missing")
+        assert sorted(p.name for p in sample_files.iterdir() if p.name.startswith(".")) == []
@@ -0,0 +1,141 @@
+"""
+Tests for directory watching.
+
+Created by orpheus497
+"""
+
+import queue
+from pathlib import Path
+
+import pytest
+
+from allsorted.config import Config
+from allsorted.watcher import FCNTL_AVAILABLE, WATCHDOG_AVAILABLE, FileOrganizeHandler
+
+pytestmark = pytest.mark.skipif(not WATCHDOG_AVAILABLE, reason="watchdog not installed")
+
+
+class TestRecentlyProcessed:
+    """Test the bounded record of recently processed files."""
+
+    def test_entries_are_bounded(self, temp_dir: Path) -> None:
+        """Test that the oldest entries are evicted past the size limit."""
+        handler = FileOrganizeHandler(temp_dir, Config())
+        handler.RECENT_MAX_ENTRIES = 3
+
+        for inode in range(5):
+            handler._mark_processed((1, inode))
+
+        assert list(handler.recently_processed) == [(1, 2), (1, 3), (1, 4)]
+        assert handler._was_recently_processed((1, 4))
+        assert not handler._was_recently_processed((1, 0))
+
+    def test_entries_expire(self, temp_dir: Path) -> None:
+        """Test that entries older than the time limit are ignored and evicted."""
+        handler = FileOrganizeHandler(temp_dir, Config())
+        handler._mark_processed((1, 1))
+        handler.RECENT_TTL_SECONDS = -1.0
+
+        assert not handler._was_recently_processed((1, 1))
+
+        handler._mark_processed((1, 2))
+        assert (1, 1) not in handler.recently_processed
+
+
+class TestManagedDirectoryCheck:
+    """Test skipping events for files inside managed directories."""
+
+    def test_only_components_below_root_count(self, temp_dir: Path) -> None:
+        """Test that managed directories are recognised only below the watched root."""
+        root = temp_dir / "all_downloads"
+        handler = FileOrganizeHandler(root, Config())
+
+        assert not handler._in_managed_directory(root / "notes.txt")
+        assert not handler._in_managed_directory(root / "inbox" / "all_notes.txt")
+        assert handler._in_managed_directory(root / "all_Docs" / "notes.txt")
+        assert handler._in_managed_directory(root / "inbox" / "all_Docs" / "Text" / "notes.txt")
+
+
+class TestEventDebouncing:
+    """Test processing files once their events go quiet."""
+
+    def test_burst_of_events_is_processed_once(self, temp_dir: Path) -> None:
+        """Test that repeated events for one file organize it exactly once."""
+        organized: queue.Queue[Path] = queue.Queue()
+        handler = FileOrganizeHandler(temp_dir, Config(), organized.put)
+        handler.process_delay = 0.1
+        file_path = temp_dir / "notes.txt"
+        file_path.write_text("content")
+
+        handler.start()
+        try:
+            for _ in range(5):
+                handler._queue_file(file_path)
+            assert organized.get(timeout=5) == file_path
+        finally:
+            handler.stop(timeout=5)
+
+        assert organized.empty()
+        assert not file_path.exists()
+        assert (temp_dir / "all_Docs" / "Text" / "notes.txt").exists()
+
+    def test_repeat_events_are_queued_once(self, temp_dir: Path) -> None:
+        """Test that events for a file already waiting in the queue are coalesced."""
+        handler = FileOrganizeHandler(temp_dir, Config())
+        file_path = temp_dir / "notes.txt"
+        for _ in range(100):
+            handler._queue_file(file_path)
+        handler._queue_file(file_path, closed=True)
+
+        assert handler._events.qsize() == 2
+
+    def test_files_quiet_together_share_one_plan(self, temp_dir: Path) -> None:
+        """Test that files going quiet at the same time are executed as one plan."""
+        handler = FileOrganizeHandler(temp_dir, Config())
+        plans = []
+        execute_plan = handler.executor.execute_plan
+        handler.executor.execute_plan = lambda plan: plans.append(plan) or execute_plan(plan)
+        file_paths = [temp_dir / f"notes{i}.txt" for i in range(3)]
+        for file_path in file_paths:
+            file_path.write_text(file_path.name)
+
+        handler._handle_files(file_paths)
+
+        assert len(plans) == 1
+        assert plans[0].total_files == 3
+        assert not any(file_path.exists() for file_path in file_paths)
+
+    def test_closed_file_skips_quiet_period(self, temp_dir: Path) -> None:
+        """Test that a file closed after writing is processed without waiting."""
+        organized: queue.Queue[Path] = queue.Queue()
+        handler = FileOrganizeHandler(temp_dir, Config(), organized.put)
+        handler.process_delay = 60.0
+        file_path = temp_dir / "notes.txt"
+        file_path.write_text("content")
+
+        handler.start()
+        try:
+            handler._queue_file(file_path, closed=True)
+            assert organized.get(timeout=5) == file_path
+        finally:
+            handler.stop(timeout=5)
+
+
+class TestFileStability:
+    """Test detecting files still held by a writer."""
+
+    def test_locked_file_is_not_stable(self, temp_dir: Path) -> None:
+        """Test that a file under an exclusive lock is reported as unstable."""
+        if not FCNTL_AVAILABLE:
+            pytest.skip("fcntl not available")
+        import fcntl
+
+        file_path = temp_dir / "download.iso"
+        file_path.write_bytes(b"partial")
+        assert FileOrganizeHandler._is_file_stable(file_path)
+
+        with file_path.open("rb") as writer:
+            fcntl.flock(writer.fileno(), fcntl.LOCK_EX)
+            assert not FileOrganizeHandler._is_file_stable(file_path)
+
+        assert FileOrganizeHandler._is_file_stable(file_path)
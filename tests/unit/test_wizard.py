@@ -0,0 +1,35 @@
+"""
+Tests for the first-time configuration wizard.
+
+Created by orpheus497
+"""
+
+from pathlib import Path
+
+import pytest
+
+from allsorted import wizard
+from allsorted.config import Config, load_config
+
+
+class TestNonInteractive:
+    """Test running the wizard without a terminal."""
+
+    def test_defaults_are_saved_without_prompting(
+        self, temp_dir: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the wizard saves defaults when prompting is disabled."""
+        config_path = temp_dir / "config.yaml"
+        monkeypatch.setenv("ALLSORTED_NONINTERACTIVE", "1")
+        monkeypatch.setattr(wizard, "get_default_config_path", lambda: config_path)
+
+        def fail(*args: object, **kwargs: object) -> None:
+            raise AssertionError("wizard prompted in non-interactive mode")
+
+        monkeypatch.setattr(wizard.Confirm, "ask", fail)
+        monkeypatch.setattr(wizard.Prompt, "ask", fail)
+
+        config = wizard.run_first_time_wizard()
+
+        assert config_path.exists()
+        assert load_config(config_path).strategy == config.strategy == Config().strategy